@@ -0,0 +1,49 @@
+"""Measure the per-call latency of every available effect backend.
+
+Usage: python benchmarks/effect_backends.py [--num-recipes N] [--repeat R]
+"""
+
+import argparse
+import random
+from time import perf_counter
+
+from pokemon_gourmet.sandwich import Recipe, ingredient_data
+from pokemon_gourmet.sandwich.effect_backends import EFFECT_BACKENDS
+
+
+def random_recipe(rng: random.Random) -> Recipe:
+    """Return a random recipe of one to six fillings and one to four
+    condiments."""
+    fillings = [i for i in range(len(ingredient_data)) if ingredient_data.is_filling[i]]
+    condiments = [
+        i for i in range(len(ingredient_data)) if ingredient_data.is_condiment[i]
+    ]
+    return Recipe(
+        *rng.choices(fillings, k=rng.randint(1, 6)),
+        *rng.choices(condiments, k=rng.randint(1, 4)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-recipes", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    recipes = [random_recipe(rng) for _ in range(args.num_recipes)]
+
+    for name, backend_cls in EFFECT_BACKENDS.items():
+        backend = backend_cls()
+        backend(recipes[0])  # Warm up (triggers JIT compilation)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = perf_counter()
+            for recipe in recipes:
+                backend(recipe)
+            best = min(best, perf_counter() - start)
+        print(f"{name:>8}: {best / len(recipes) * 1e6:8.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
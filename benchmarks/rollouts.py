@@ -0,0 +1,52 @@
+"""Measure rollouts per second of the in-place rollout against a rollout that
+creates a new state at every step.
+
+Usage: python benchmarks/rollouts.py [--num-rollouts N] [--repeat R]
+"""
+
+import argparse
+import random
+from time import perf_counter
+
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts import MonteCarloTreeSearch, RecipeState
+from pokemon_gourmet.suggester.mcts.search import Node
+from pokemon_gourmet.suggester.mcts.state import RecipeManager
+
+
+def copying_rollout(mcts: MonteCarloTreeSearch, node: Node) -> float:
+    """Rollout that moves to a new state at every step."""
+    state = node.state
+    while not state.is_terminal:
+        state = state.move(mcts.rollout_policy(state))
+    return state.reward
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-rollouts", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    targets = parse_targets(
+        [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+    )
+    mcts = MonteCarloTreeSearch(RecipeState(targets), RecipeManager(), seed=0)
+    node = mcts.select_node(mcts.root)
+
+    for name, rollout in [("copying", copying_rollout), ("in-place", None)]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            random.seed(0)
+            start = perf_counter()
+            for _ in range(args.num_rollouts):
+                if rollout is None:
+                    mcts.rollout(node)
+                else:
+                    rollout(mcts, node)
+            best = min(best, perf_counter() - start)
+        print(f"{name:>8}: {args.num_rollouts / best:10.0f} rollouts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Measure the cost of a state transition (`RecipeState.move`) against a
+transition through `copy.deepcopy`.
+
+Usage: python benchmarks/state_transitions.py [--num-states N] [--repeat R]
+"""
+
+import argparse
+import random
+from copy import deepcopy
+from time import perf_counter
+
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+
+
+def random_state(rng: random.Random) -> RecipeState:
+    """Return a state reached by a random walk of two to eight steps."""
+    state = RecipeState(
+        parse_targets(
+            [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+        )
+    )
+    for _ in range(rng.randint(2, 8)):
+        actions = state.get_possible_actions()
+        state = state.move(rng.choice(actions))
+        if state.is_terminal:
+            break
+    return state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-states", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    states = [random_state(rng) for _ in range(args.num_states)]
+    actions = [rng.choice(state.get_possible_actions()) for state in states]
+
+    def deepcopy_move(state, action):
+        next_state = deepcopy(state)
+        action(next_state)
+        return next_state
+
+    for name, move in [
+        ("deepcopy", deepcopy_move),
+        ("move", lambda state, action: state.move(action)),
+    ]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = perf_counter()
+            for state, action in zip(states, actions):
+                move(state, action)
+            best = min(best, perf_counter() - start)
+        print(f"{name:>8}: {best / len(states) * 1e6:8.2f} µs/transition")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure the memory per node and the garbage collection pause of a search
+tree made of `Node` objects against an array-backed `TreeStore`.
+
+The memory of a `Node` includes its state, lists, and dictionaries (but not
+the computed effects, which are shared through a cache). The memory of a
+`TreeStore` node is the size of one entry in each array, plus its share of
+the pool of untried actions. Both searches also record every expanded recipe
+in the recipe manager, whose keys and children bitmasks are added to the
+memory per node. The pause is the time a full
+collection takes with the tree alive, minus the time it takes once the tree
+is freed.
+
+Usage: python benchmarks/tree_memory.py [--max-walltime MS]
+"""
+
+import argparse
+import gc
+from sys import getsizeof
+from time import perf_counter
+
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts import (
+    ArrayMonteCarloTreeSearch,
+    MonteCarloTreeSearch,
+    RecipeState,
+    recipe_manager,
+)
+from pokemon_gourmet.suggester.mcts.search import Node
+from pokemon_gourmet.suggester.mcts.state import RecipeManager
+
+
+def node_size(node: Node) -> int:
+    """Return the number of bytes taken by a node and its state."""
+    state = node.state
+    return sum(
+        getsizeof(obj)
+        for obj in [
+            node,
+            node.__dict__,
+            node.children,
+            node._untried_actions,
+            node._edge_visits,
+            state,
+            state._ingredient_list,
+            state._sums,
+        ]
+    )
+
+
+def manager_size(manager: RecipeManager) -> int:
+    """Return the number of bytes taken by the recipes of a recipe manager."""
+    children = manager._children
+    return (
+        getsizeof(manager._states)
+        + sum(map(getsizeof, manager._states))
+        + getsizeof(children)
+        + sum(getsizeof(key) + getsizeof(value) for key, value in children.items())
+    )
+
+
+def collect_time() -> float:
+    start = perf_counter()
+    gc.collect()
+    return perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-walltime", type=int, default=5000)
+    args = parser.parse_args()
+
+    targets = parse_targets(
+        [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+    )
+    for name, cls in [
+        ("nodes", MonteCarloTreeSearch),
+        ("arrays", ArrayMonteCarloTreeSearch),
+    ]:
+        mcts = cls(
+            RecipeState(targets), recipe_manager, seed=0, max_walltime=args.max_walltime
+        )
+        mcts.search(mcts.root)
+        if isinstance(mcts, ArrayMonteCarloTreeSearch):
+            tree = mcts.tree
+            num_nodes = len(tree)
+            pool = tree._untried
+            node_nbytes = (tree.nbytes - pool.nbytes) / tree.capacity
+            memory = node_nbytes * num_nodes + tree._pool_size * pool.itemsize
+        else:
+            stack, nodes = [mcts.root], []
+            while stack:
+                nodes.append(stack.pop())
+                stack.extend(nodes[-1])
+            num_nodes = len(nodes)
+            memory = sum(map(node_size, nodes))
+            del nodes, stack
+        tree_memory = memory
+        memory += manager_size(mcts.state_manager)
+        pause = collect_time()
+        del mcts
+        gc.collect()  # Free the tree (nodes reference each other)
+        pause -= collect_time()
+        print(
+            f"{name:>6}: {num_nodes:7d} nodes, {memory / num_nodes:6.0f} B/node "
+            f"({tree_memory / num_nodes:.0f} B in the tree), "
+            f"{pause * 1000:6.1f} ms GC pause"
+        )
+
+
+if __name__ == "__main__":
+    main()
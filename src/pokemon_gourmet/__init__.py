@@ -1,4 +1,17 @@
 __all__ = ["RecipeGenerator"]
 __version__ = (1, 0, 0)
 
-from pokemon_gourmet.suggester.generator import RecipeGenerator
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pokemon_gourmet.suggester.generator import RecipeGenerator
+
+
+def __getattr__(name: str) -> Any:
+    # Import the search stack on first use, so that importing a submodule
+    # (e.g., to compute effects) stays cheap
+    if name == "RecipeGenerator":
+        from pokemon_gourmet.suggester.generator import RecipeGenerator
+
+        return RecipeGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
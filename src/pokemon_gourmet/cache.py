@@ -0,0 +1,93 @@
+__all__ = ["CacheInfo", "LRUCache"]
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, NamedTuple, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[K, V]):
+    """A size-bounded mapping that discards the least recently used entries.
+
+    Lookups reorder the entries, so every access holds a lock and the cache
+    can be shared between threads.
+
+    Args:
+        maxsize: Maximum number of entries to keep
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.hits} hits, {self.misses} misses, "
+            f"{len(self)}/{self.maxsize} entries)"
+        )
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Return the value of a key (marking it as recently used) or the
+        default value if the key is missing."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Return the hit/miss statistics and the size of the cache."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def resize(self, maxsize: int) -> None:
+        """Change the capacity of the cache, discarding the least recently
+        used entries if needed."""
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative.")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
@@ -1,13 +1,37 @@
 __all__ = [
+    "calculate_batch_effects",
     "calculate_effects",
+    "compute_effects",
     "Effect",
+    "effect_cache",
+    "EffectDatabase",
     "EffectList",
+    "get_effect_backend",
+    "get_effect_database",
     "Ingredient",
     "ingredient_data",
     "Recipe",
+    "RecipeBatch",
+    "set_effect_backend",
+    "set_effect_database",
 ]
 
+from pokemon_gourmet.sandwich.batch import RecipeBatch
 from pokemon_gourmet.sandwich.effect import Effect, EffectList
-from pokemon_gourmet.sandwich.effect_calculation import calculate_effects
+from pokemon_gourmet.sandwich.effect_backends import (
+    get_effect_backend,
+    set_effect_backend,
+)
+from pokemon_gourmet.sandwich.effect_calculation import (
+    calculate_batch_effects,
+    calculate_effects,
+    compute_effects,
+    effect_cache,
+)
+from pokemon_gourmet.sandwich.effect_database import (
+    EffectDatabase,
+    get_effect_database,
+    set_effect_database,
+)
 from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
 from pokemon_gourmet.sandwich.recipe import Ingredient, Recipe
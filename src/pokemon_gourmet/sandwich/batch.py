@@ -0,0 +1,228 @@
+__all__ = ["compute_rewards", "RecipeBatch", "REWARD_GROWTH_FACTOR"]
+
+from collections.abc import Iterable, Iterator
+from math import log2
+from typing import Optional, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.sandwich.effect import EffectList
+from pokemon_gourmet.sandwich.effect_calculation import (
+    calculate_batch_effects_from_sums,
+)
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.sandwich.recipe import (
+    MAX_CONDIMENTS,
+    MAX_FILLINGS,
+    Recipe,
+)
+
+# Rate at which the score grows with the Levels of the target effects, so that
+# a full match at Level 3 scores 300
+REWARD_GROWTH_FACTOR = log2(300) / 2
+
+
+def compute_rewards(
+    effects: NDArray[np.intp], targets: EffectList
+) -> NDArray[np.float64]:
+    """Vectorized version of `RecipeState.get_reward` for legal recipes.
+
+    Args:
+        effects: Array of shape (N, 3, 3) with the computed effects of N recipes
+        targets: Desired effects
+
+    Returns:
+        Array with the score of each recipe
+    """
+    num_matches = np.zeros(len(effects), dtype=int)
+    for target in targets:
+        is_match = effects[:, :, 0] == target.power_idx
+        # Typeless targets (Egg Power) are matched on their Power alone
+        if target.pokemon_type_idx is not None:
+            is_match &= effects[:, :, 1] == target.pokemon_type_idx
+        num_matches += np.any(is_match, axis=1)
+    base_reward = num_matches / len(targets)
+    # Only use Levels of matching Meal Powers
+    level_sum = effects[:, : len(targets), 2].mean(axis=1) - 1
+    return np.where(
+        num_matches == len(targets),
+        2 ** (REWARD_GROWTH_FACTOR * level_sum),
+        base_reward,
+    )
+
+
+def _decode(ingredient_list: NDArray[np.integer]) -> list[str]:
+    ids = np.flatnonzero(ingredient_list)
+    counts = ingredient_list[ids].tolist()
+    return [
+        ingredient_data[i]
+        for i, count in zip(ids.tolist(), counts)
+        for _ in range(count)
+    ]
+
+
+class RecipeBatch:
+    """Many recipes stored as columns: one row of ingredient counts and one
+    number of players per recipe.
+
+    Counters, legality, effects, and scores are computed for every recipe at
+    once. Effects are computed on first access and kept.
+
+    Args:
+        ingredient_lists: Matrix of ingredient counts, one row per recipe
+        num_players: Number of players of each recipe (or of every recipe)
+    """
+
+    def __init__(
+        self,
+        ingredient_lists: NDArray[np.integer],
+        num_players: Union[int, NDArray[np.integer]] = 1,
+    ) -> None:
+        ingredient_lists = np.asarray(ingredient_lists, dtype=np.uint8)
+        if ingredient_lists.ndim != 2 or ingredient_lists.shape[1] != len(
+            ingredient_data
+        ):
+            raise ValueError(
+                f"Expected {len(ingredient_data)} ingredient counts per recipe."
+            )
+        self.ingredient_lists = ingredient_lists
+        self.num_players = np.broadcast_to(
+            np.asarray(num_players, dtype=np.intp), (len(ingredient_lists),)
+        )
+        self._effects: Optional[NDArray[np.intp]] = None
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Recipe]) -> "RecipeBatch":
+        """Gather the ingredient counts of some recipes into a batch."""
+        recipes = list(recipes)
+        if not recipes:
+            return cls(np.zeros((0, len(ingredient_data)), dtype=np.uint8))
+        return cls(
+            np.stack([recipe._ingredient_list for recipe in recipes]),
+            np.array([recipe.num_players for recipe in recipes]),
+        )
+
+    def __getitem__(
+        self, index: Union[int, slice, NDArray[np.integer], NDArray[np.bool_]]
+    ) -> Union[Recipe, "RecipeBatch"]:
+        if isinstance(index, (int, np.integer)):
+            indices = np.flatnonzero(self.ingredient_lists[index])
+            counts = self.ingredient_lists[index, indices]
+            return Recipe.from_sparse(indices, counts, int(self.num_players[index]))
+        batch = RecipeBatch(self.ingredient_lists[index], self.num_players[index])
+        if self._effects is not None:
+            batch._effects = self._effects[index]
+        return batch
+
+    def __iter__(self) -> Iterator[Recipe]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return len(self.ingredient_lists)
+
+    def __repr__(self) -> str:
+        s = "s" if len(self) != 1 else ""
+        return f"{self.__class__.__name__}({len(self)} recipe{s})"
+
+    @property
+    def sums(self) -> NDArray[np.intp]:
+        """Sums of Flavors, Powers, and Types of each recipe"""
+        return self.ingredient_lists @ ingredient_data.contribution_mat
+
+    @property
+    def effects(self) -> NDArray[np.intp]:
+        """Array of shape (N, 3, 3) with the effects of each recipe"""
+        if self._effects is None:
+            self._effects = calculate_batch_effects_from_sums(self.sums)
+            self._effects.flags.writeable = False
+        return self._effects
+
+    @property
+    def effect_lists(self) -> list[EffectList]:
+        return [EffectList(effects) for effects in self.effects]
+
+    @property
+    def condiments(self) -> list[list[str]]:
+        return [
+            _decode(ingredient_list)
+            for ingredient_list in self.ingredient_lists * ingredient_data.is_condiment
+        ]
+
+    @property
+    def fillings(self) -> list[list[str]]:
+        return [
+            _decode(ingredient_list)
+            for ingredient_list in self.ingredient_lists * ingredient_data.is_filling
+        ]
+
+    @property
+    def num_condiments(self) -> NDArray[np.intp]:
+        return self.ingredient_lists @ ingredient_data.is_condiment.astype(np.intp)
+
+    @property
+    def num_fillings(self) -> NDArray[np.intp]:
+        return self.ingredient_lists @ ingredient_data.is_filling.astype(np.intp)
+
+    @property
+    def num_herba_mystica(self) -> NDArray[np.intp]:
+        return self.ingredient_lists @ ingredient_data.is_herba_mystica.astype(np.intp)
+
+    @property
+    def total_pieces(self) -> NDArray[np.intp]:
+        return self.ingredient_lists @ (
+            ingredient_data.pieces * ingredient_data.is_filling
+        )
+
+    @property
+    def is_legal(self) -> NDArray[np.bool_]:
+        """Vectorized version of `Recipe.is_legal`"""
+        filling_pieces = self.ingredient_lists * (
+            ingredient_data.pieces * ingredient_data.is_filling
+        )
+        single_ingredient_limit = np.where(self.num_players > 1, 15, 12)
+        fillings = self.num_fillings / self.num_players
+        condiments = self.num_condiments / self.num_players
+        return (
+            (1 <= fillings)
+            & (fillings <= MAX_FILLINGS)
+            & (1 <= condiments)
+            & (condiments <= MAX_CONDIMENTS)
+            & np.all(filling_pieces <= single_ingredient_limit[:, np.newaxis], axis=1)
+        )
+
+    def rewards(self, targets: EffectList) -> NDArray[np.float64]:
+        """Score every recipe against some target effects (illegal recipes
+        score zero).
+
+        Args:
+            targets: Desired effects
+
+        Returns:
+            Array with the score of each recipe
+        """
+        if len(self) == 0:
+            return np.zeros(0)
+        return np.where(self.is_legal, compute_rewards(self.effects, targets), 0)
+
+    def rank(self, targets: EffectList) -> NDArray[np.intp]:
+        """Return the indices that sort the recipes from best to worst: highest
+        score first, then fewest fillings, pieces, and condiments."""
+        return np.lexsort(
+            (
+                self.num_condiments,
+                self.total_pieces,
+                self.num_fillings,
+                -self.rewards(targets),
+            )
+        )
+
+    def unique(self) -> "RecipeBatch":
+        """Return a batch without duplicate recipes (keeping first
+        occurrences in order)."""
+        if len(self) == 0:
+            return self
+        rows = np.hstack([self.ingredient_lists, self.num_players[:, np.newaxis]])
+        _, index = np.unique(rows, axis=0, return_index=True)
+        return self[np.sort(index)]
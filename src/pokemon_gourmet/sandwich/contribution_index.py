@@ -0,0 +1,89 @@
+__all__ = ["contribution_index"]
+
+from typing import Iterable, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Flavor, Power, Type
+from pokemon_gourmet.sandwich.effect import Effect
+from pokemon_gourmet.sandwich.effect_calculation import FLAVOR_COMBO_BONUS
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.singleton import Singleton
+
+
+class ContributionIndex(metaclass=Singleton):
+    """An index of the ingredients that raise or lower each Power, Type, and
+    flavor combo bonus.
+
+    Every mask has one entry per ingredient. An ingredient contributes to a
+    flavor combo (two Flavors, which grant a Power bonus when they are the
+    recipe's top Flavors, in order) positively if they are its own top two
+    Flavors, in the same order, and negatively if it has neither of them.
+    """
+
+    def __init__(self) -> None:
+        self.power_positive: NDArray[np.bool_] = ingredient_data.power_mat.T > 0
+        self.power_negative: NDArray[np.bool_] = ingredient_data.power_mat.T < 0
+        self.type_positive: NDArray[np.bool_] = ingredient_data.type_mat.T > 0
+        self.type_negative: NDArray[np.bool_] = ingredient_data.type_mat.T < 0
+
+        flavor_mat = ingredient_data.flavor_mat
+        top_flavors = np.argsort(-flavor_mat, axis=1, kind="stable")[:, :2]
+        has_flavor = flavor_mat > 0
+        num_flavors = len(Flavor)
+        self.flavor_combo_positive = np.zeros(
+            (num_flavors, num_flavors, len(ingredient_data)), dtype=bool
+        )
+        self.flavor_combo_negative = np.zeros_like(self.flavor_combo_positive)
+        # Flavor combos granting a bonus to each Power
+        self.bonus_positive = np.zeros((len(Power), len(ingredient_data)), dtype=bool)
+        for (flavor1, flavor2), power in FLAVOR_COMBO_BONUS.items():
+            i, j = flavor1.value - 1, flavor2.value - 1
+            self.flavor_combo_positive[i, j] = np.all(
+                top_flavors == (i, j), axis=1
+            ) & np.all(has_flavor[:, [i, j]], axis=1)
+            self.flavor_combo_negative[i, j] = ~np.any(has_flavor[:, [i, j]], axis=1)
+            self.bonus_positive[power.value - 1] |= self.flavor_combo_positive[i, j]
+
+        self._relevance_cache: dict[frozenset, NDArray[np.bool_]] = {}
+
+    def get_relevant_ingredients(self, targets: Iterable[Effect]) -> NDArray[np.bool_]:
+        """Return which ingredients raise a target Power or Type, or the
+        flavor combo that grants a bonus to a target Power.
+
+        Args:
+            targets: Desired sandwich effects
+
+        Returns:
+            Mask of the relevant ingredients
+        """
+        key = frozenset(
+            (effect.power_idx, effect.pokemon_type_idx) for effect in targets
+        )
+        is_relevant = self._relevance_cache.get(key)
+        if is_relevant is None:
+            is_relevant = np.zeros(len(ingredient_data), dtype=bool)
+            for power_idx, type_idx in key:
+                is_relevant |= self.power_positive[power_idx]
+                is_relevant |= self.bonus_positive[power_idx]
+                if type_idx is not None:
+                    is_relevant |= self.type_positive[type_idx]
+            is_relevant.flags.writeable = False
+            self._relevance_cache[key] = is_relevant
+        return is_relevant
+
+    def positive(self, value: Union[Power, Type]) -> NDArray[np.intp]:
+        """Return the indices of the ingredients that raise a Power or Type."""
+        if isinstance(value, Power):
+            return np.flatnonzero(self.power_positive[value.value - 1])
+        return np.flatnonzero(self.type_positive[value.value - 1])
+
+    def negative(self, value: Union[Power, Type]) -> NDArray[np.intp]:
+        """Return the indices of the ingredients that lower a Power or Type."""
+        if isinstance(value, Power):
+            return np.flatnonzero(self.power_negative[value.value - 1])
+        return np.flatnonzero(self.type_negative[value.value - 1])
+
+
+contribution_index = ContributionIndex()
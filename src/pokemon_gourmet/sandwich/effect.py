@@ -14,6 +14,8 @@ EffectTypeIndex = Optional[int]
 IncompleteEffectTuple = tuple[Power, EffectType]
 CompelteEffectTuple = tuple[Power, EffectType, EffectLevel]
 EffectTuple = Union[IncompleteEffectTuple, CompelteEffectTuple]
+# Egg Power is typeless in game, so it is matched on its Power alone
+EGG_IDX = Power.EGG.value - 1
 
 
 @dataclass(unsafe_hash=True)
@@ -104,3 +106,10 @@ class EffectList(AbstractSet):
             levels.append(self.tuples[i].level)
             self.tuples[i].level = None
         return levels
+
+    def remove_egg_type(self) -> None:
+        """Remove the Type of Egg Power, which is typeless in game."""
+        for effect in self.tuples:
+            if effect.power_idx == EGG_IDX:
+                effect.pokemon_type_idx = None
+        self.types = {effect.pokemon_type_idx for effect in self.tuples}
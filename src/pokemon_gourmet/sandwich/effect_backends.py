@@ -0,0 +1,234 @@
+__all__ = [
+    "EFFECT_BACKENDS",
+    "EffectBackend",
+    "get_effect_backend",
+    "NumbaBackend",
+    "NumpyBackend",
+    "PythonBackend",
+    "set_effect_backend",
+]
+
+import os
+from abc import ABCMeta, abstractmethod
+from importlib.util import find_spec
+from operator import add
+from typing import TYPE_CHECKING, Callable, ClassVar, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Power
+from pokemon_gourmet.sandwich.effect_calculation import (
+    BONUS_MAT,
+    calculate_effects,
+    compute_effects_from_sums,
+    compute_levels,
+    sort_types,
+)
+from pokemon_gourmet.sandwich.ingredient_data import (
+    FLAVOR_SLICE,
+    POWER_SLICE,
+    TYPE_SLICE,
+    ingredient_data,
+)
+
+if TYPE_CHECKING:
+    from pokemon_gourmet.sandwich.recipe import Recipe
+
+# Numba is slow to import, so only import it when its backend is selected
+HAS_NUMBA = find_spec("numba") is not None
+
+EFFECT_BACKENDS: dict[str, type["EffectBackend"]] = {}
+
+SPARKLING_IDX = Power.SPARKLING.value - 1
+
+
+class EffectBackend(metaclass=ABCMeta):
+    """A kernel that computes the effects of a single recipe"""
+
+    name: ClassVar[str]
+
+    @abstractmethod
+    def __call__(self, recipe: "Recipe") -> NDArray[np.intp]:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class NumpyBackend(EffectBackend):
+    """Compute effects with NumPy from the recipe's running sums"""
+
+    name = "numpy"
+
+    def __call__(self, recipe: "Recipe") -> NDArray[np.intp]:
+        return compute_effects_from_sums(recipe._sums)
+
+
+EFFECT_BACKENDS[NumpyBackend.name] = NumpyBackend
+
+
+def _top_indices(values: list[int], k: int) -> list[int]:
+    """Return the indices of the k greatest values (ties broken by index)."""
+    return sorted(range(len(values)), key=values.__getitem__, reverse=True)[:k]
+
+
+class PythonBackend(EffectBackend):
+    """Compute effects in pure Python, only visiting the rows of the
+    ingredients present in the recipe. Avoids the overhead of calling NumPy
+    on tiny arrays."""
+
+    name = "python"
+
+    def __init__(self) -> None:
+        self.contribution_rows: list[list[int]] = (
+            ingredient_data.contribution_mat.tolist()
+        )
+        self.zeros = [0] * len(self.contribution_rows[0])
+        self.bonus_rows: list[list[list[int]]] = BONUS_MAT.tolist()
+
+    def __call__(self, recipe: "Recipe") -> NDArray[np.intp]:
+        sums = self.zeros
+        indices, counts = recipe.to_sparse()
+        for i, count in zip(indices.tolist(), counts.tolist()):
+            row = self.contribution_rows[i]
+            sums = [*map(add, sums, row if count == 1 else [count * x for x in row])]
+
+        i, j = _top_indices(sums[FLAVOR_SLICE], 2)
+        power_sum = [
+            value + bonus
+            for value, bonus in zip(sums[POWER_SLICE], self.bonus_rows[i][j])
+        ]
+        # Force Sparkling Power to zero if there are less than two Herba Mystica
+        if power_sum[SPARKLING_IDX] < 2000:
+            power_sum[SPARKLING_IDX] = 0
+        power_ids = _top_indices(power_sum, 3)
+
+        type_sum = sums[TYPE_SLICE]
+        type_ids = _top_indices(type_sum, 3)
+        type_values = [type_sum[k] for k in type_ids]
+        sorted_types = [type_ids[k] for k in sort_types(type_values)]
+        levels = compute_levels(type_values)
+
+        return np.array([*zip(power_ids, sorted_types, levels)])
+
+
+EFFECT_BACKENDS[PythonBackend.name] = PythonBackend
+
+
+def _compile_numba_kernel() -> Callable[..., NDArray[np.intp]]:
+    """JIT-compile a kernel equivalent to `compute_effects_from_sums`."""
+    import numba
+
+    jit_sort_types = numba.njit(sort_types)
+    jit_compute_levels = numba.njit(compute_levels)
+    flavor_start, flavor_stop = FLAVOR_SLICE.start, FLAVOR_SLICE.stop
+    power_start, power_stop = POWER_SLICE.start, POWER_SLICE.stop
+    type_start, type_stop = TYPE_SLICE.start, TYPE_SLICE.stop
+
+    @numba.njit
+    def top_indices(values, k):
+        # Selection of the k greatest values (ties broken by index)
+        taken = np.zeros(len(values), dtype=np.bool_)
+        ids = np.empty(k, dtype=np.int64)
+        for n in range(k):
+            best = -1
+            for m in range(len(values)):
+                if not taken[m] and (best < 0 or values[m] > values[best]):
+                    best = m
+            taken[best] = True
+            ids[n] = best
+        return ids
+
+    @numba.njit
+    def kernel(ingredient_list, contribution_mat, bonus_mat):
+        sums = np.zeros(contribution_mat.shape[1], dtype=np.int64)
+        for i in range(len(ingredient_list)):
+            count = ingredient_list[i]
+            if count:
+                for k in range(contribution_mat.shape[1]):
+                    sums[k] += count * contribution_mat[i, k]
+
+        flavor_ids = top_indices(sums[flavor_start:flavor_stop], 2)
+        power_sum = (
+            sums[power_start:power_stop] + bonus_mat[flavor_ids[0], flavor_ids[1]]
+        )
+        # Force Sparkling Power to zero if there are less than two Herba Mystica
+        if power_sum[SPARKLING_IDX] < 2000:
+            power_sum[SPARKLING_IDX] = 0
+        power_ids = top_indices(power_sum, 3)
+
+        type_sum = sums[type_start:type_stop]
+        type_ids = top_indices(type_sum, 3)
+        type_values = type_sum[type_ids]
+        order = jit_sort_types(type_values)
+        levels = jit_compute_levels(type_values)
+
+        effects = np.empty((3, 3), dtype=np.int64)
+        for n in range(3):
+            effects[n, 0] = power_ids[n]
+            effects[n, 1] = type_ids[order[n]]
+            effects[n, 2] = levels[n]
+        return effects
+
+    return kernel
+
+
+class NumbaBackend(EffectBackend):
+    """Compute effects with a kernel compiled by numba (requires the optional
+    `numba` package)"""
+
+    name = "numba"
+
+    def __init__(self) -> None:
+        if not HAS_NUMBA:
+            raise ImportError("The numba backend requires the `numba` package.")
+        self.kernel = _compile_numba_kernel()
+        self.contribution_mat = ingredient_data.contribution_mat.astype(np.int64)
+        self.bonus_mat = BONUS_MAT.astype(np.int64)
+
+    def __call__(self, recipe: "Recipe") -> NDArray[np.intp]:
+        # Compiled code scans the dense counts faster than NumPy can gather
+        # the indices of the present ingredients
+        return self.kernel(
+            recipe._ingredient_list, self.contribution_mat, self.bonus_mat
+        )
+
+
+if HAS_NUMBA:
+    EFFECT_BACKENDS[NumbaBackend.name] = NumbaBackend
+
+
+def get_effect_backend() -> EffectBackend:
+    """Return the backend used to compute the effects of a recipe."""
+    return calculate_effects.backend
+
+
+def set_effect_backend(name: Optional[str] = None) -> EffectBackend:
+    """Select the backend used to compute the effects of a recipe.
+
+    Args:
+        name:
+            Name of the backend (`numpy`, `python`, or `numba`). If not given,
+            read it from the `POKEMON_GOURMET_EFFECT_BACKEND` environment
+            variable (defaults to `numpy`).
+
+    Raises:
+        ValueError: If the backend is unknown or unavailable.
+
+    Returns:
+        The selected backend
+    """
+    if name is None:
+        name = os.environ.get("POKEMON_GOURMET_EFFECT_BACKEND", NumpyBackend.name)
+    name = name.lower()
+    if name not in EFFECT_BACKENDS:
+        raise ValueError(
+            f"Unexpected effect backend ('{name}'). "
+            f"Available backends: {', '.join(EFFECT_BACKENDS)}."
+        )
+    calculate_effects.backend = EFFECT_BACKENDS[name]()
+    return calculate_effects.backend
+
+
+set_effect_backend()
@@ -1,17 +1,41 @@
-__all__ = ["calculate_effects"]
+__all__ = [
+    "BONUS_MAT",
+    "calculate_batch_effects",
+    "calculate_batch_effects_from_sums",
+    "calculate_effects",
+    "compute_batch_effects",
+    "compute_batch_effects_from_sparse",
+    "compute_batch_effects_from_sums",
+    "compute_effects",
+    "compute_effects_from_sparse",
+    "compute_effects_from_sums",
+    "effect_cache",
+    "EffectCalculator",
+]
 
-from typing import TYPE_CHECKING
+import os
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
 from numpy.typing import NDArray
 
+from pokemon_gourmet.cache import LRUCache
 from pokemon_gourmet.enums import Flavor, Power
-from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.sandwich.ingredient_data import (
+    FLAVOR_SLICE,
+    POWER_SLICE,
+    TYPE_SLICE,
+    ingredient_data,
+)
 from pokemon_gourmet.singleton import Singleton
 
 if TYPE_CHECKING:
+    from pokemon_gourmet.sandwich.effect_backends import EffectBackend
+    from pokemon_gourmet.sandwich.effect_database import EffectDatabase
     from pokemon_gourmet.sandwich.recipe import Recipe
 
+EFFECT_CACHE_SIZE = int(os.environ.get("POKEMON_GOURMET_EFFECT_CACHE_SIZE", 2**16))
+
 FLAVOR_COMBO_BONUS: dict[tuple[Flavor, Flavor], Power] = {
     (Flavor.SWEET, Flavor.SALTY): Power.EGG,
     (Flavor.SWEET, Flavor.SOUR): Power.CATCHING,
@@ -36,117 +60,343 @@ FLAVOR_COMBO_BONUS: dict[tuple[Flavor, Flavor], Power] = {
 }
 
 
-class EffectCalculator(metaclass=Singleton):
-    """Calculate the effects of a recipe, based on the formula derived
-    by @cecilbowen.
+def _make_bonus_mat() -> NDArray[np.intp]:
+    bonus_mat = np.zeros((len(Flavor), len(Flavor), len(Power)), dtype=int)
+    for (flavor1, flavor2), power in FLAVOR_COMBO_BONUS.items():
+        bonus_mat[flavor1.value - 1, flavor2.value - 1, power.value - 1] = 100
+    bonus_mat.flags.writeable = False
+    return bonus_mat
 
-    Check <https://github.com/cecilbowen/pokemon-sandwich-simulator>.
+
+# Power bonus granted by the top two Flavors (first and second)
+BONUS_MAT = _make_bonus_mat()
+NOT_SPARKLING = np.arange(len(Power)) != (Power.SPARKLING.value - 1)
+
+
+def sort_types(values: NDArray) -> tuple[int, int, int]:
+    """Return the indices that would sort the Type array.
+
+    Returns:
+        Tuple of indices that sort the Type array.
+    """
+    assert len(values) == 3
+    difference = values[0] - values[1]
+
+    if values[0] > 480:
+        return (0, 0, 0)
+    elif values[0] > 280:
+        return (0, 0, 2)
+    else:
+        split = False
+        if values[0] > 105 and difference > 105:
+            return (0, 0, 2)
+        elif 100 <= values[0] <= 105:
+            split = difference >= 80 and values[1] <= 21
+        elif 90 <= values[0] < 100:
+            split = difference >= 78 and values[1] <= 16
+        elif 80 <= values[0] < 90:
+            split = difference >= 74 and values[1] <= 9
+        elif 74 <= values[0] < 80:
+            split = difference >= 72 and values[1] <= 5
+        if split:
+            return (0, 2, 0)
+        return (0, 2, 1)
+
+
+def sort_batch_types(values: NDArray) -> NDArray[np.intp]:
+    """Vectorized version of `sort_types`.
 
     Args:
-        recipe: Recipe to calculate effects
+        values: Matrix of the three highest Type values of each recipe
+
+    Returns:
+        Matrix of indices that sort the Type array of each recipe.
     """
+    first, second = values[:, :1], values[:, 1:2]
+    difference = first - second
+    split = (
+        ((100 <= first) & (first <= 105) & (difference >= 80) & (second <= 21))
+        | ((90 <= first) & (first < 100) & (difference >= 78) & (second <= 16))
+        | ((80 <= first) & (first < 90) & (difference >= 74) & (second <= 9))
+        | ((74 <= first) & (first < 80) & (difference >= 72) & (second <= 5))
+    )
+    return np.select(
+        [
+            first > 480,
+            first > 280,
+            (first > 105) & (difference > 105),
+            split,
+        ],
+        [
+            np.array([0, 0, 0]),
+            np.array([0, 0, 2]),
+            np.array([0, 0, 2]),
+            np.array([0, 2, 0]),
+        ],
+        default=np.array([0, 2, 1]),
+    )
 
-    def __init__(self) -> None:
-        self.recipe = None
-        self.bonus_mat = np.zeros((len(Flavor), len(Flavor), len(Power)), dtype=int)
 
-        for (flavor1, flavor2), power in FLAVOR_COMBO_BONUS.items():
-            i = flavor1.value - 1
-            j = flavor2.value - 1
-            k = power.value - 1
-            self.bonus_mat[i, j, k] = 100
+def compute_levels(values: NDArray) -> tuple[int, int, int]:
+    """Calculate the Levels of each effect.
 
-    def __call__(self, recipe: "Recipe") -> NDArray[np.intp]:
-        self.recipe = recipe
-        return self.compute_effects()
+    Returns:
+        Three Levels associated with each recipe effect
+    """
+    if values[0] < 180:
+        return (1, 1, 1)
+    elif values[0] <= 280:
+        if values[1] >= 180 and values[2] >= 180:
+            return (2, 2, 1)
+        else:
+            return (2, 1, 1)
+    elif values[0] < 380:
+        if values[2] >= 180:
+            return (2, 2, 2)
+        else:
+            return (2, 2, 1)
+    elif values[0] < 460:
+        if values[1] >= 380 and values[2] >= 380:
+            return (3, 3, 3)
+        else:
+            return (3, 3, 2)
+    else:
+        return (3, 3, 3)
 
-    def compute_effects(self) -> NDArray[np.intp]:
-        """Compute the effects of a recipe.
 
-        Returns:
-            List of tuples containing a Power, a Pokémon Type, and a Level.
-        """
-        if self.recipe is None:
-            raise ValueError()
-        ingredient_counts = self.recipe._ingredient_list * ingredient_data.pieces
+def compute_batch_levels(values: NDArray) -> NDArray[np.intp]:
+    """Vectorized version of `compute_levels`.
+
+    Args:
+        values: Matrix of the three highest Type values of each recipe
+
+    Returns:
+        Matrix of the three Levels associated with each recipe's effects
+    """
+    first, second, third = values[:, :1], values[:, 1:2], values[:, 2:3]
+    return np.select(
+        [
+            first < 180,
+            (first <= 280) & (second >= 180) & (third >= 180),
+            first <= 280,
+            (first < 380) & (third >= 180),
+            first < 380,
+            (first < 460) & ((second < 380) | (third < 380)),
+        ],
+        [
+            np.array([1, 1, 1]),
+            np.array([2, 2, 1]),
+            np.array([2, 1, 1]),
+            np.array([2, 2, 2]),
+            np.array([2, 2, 1]),
+            np.array([3, 3, 2]),
+        ],
+        default=np.array([3, 3, 3]),
+    )
 
-        flavor_sum = ingredient_counts @ ingredient_data.flavor_mat
-        i, j = np.argsort(-1 * flavor_sum, kind="stable").tolist()[:2]
 
-        power_sum = ingredient_counts @ ingredient_data.power_mat
-        power_sum += self.bonus_mat[i, j, :]
+def compute_effects_from_sums(sums: NDArray[np.intp]) -> NDArray[np.intp]:
+    """Compute the effects of a recipe from the sums of its ingredients'
+    Flavors, Powers, and Types (weighted by their number of pieces).
 
-        # Force Sparkling Power to zero if there are less than two Herba Mystica
-        not_sparkling = np.arange(len(Power)) != (Power.SPARKLING.value - 1)
-        power_sum *= not_sparkling | (power_sum >= 2000)
+    Args:
+        sums: Row of the contribution matrix summed over the ingredients
 
-        power_ids = np.argsort(-1 * power_sum, kind="stable")[:3]
+    Returns:
+        List of tuples containing a Power, a Pokémon Type, and a Level.
+    """
+    flavor_sum = sums[FLAVOR_SLICE]
+    power_sum = sums[POWER_SLICE]
+    type_sum = sums[TYPE_SLICE]
 
-        type_sum = ingredient_counts @ ingredient_data.type_mat
-        types_ids = np.argsort(-1 * type_sum, kind="stable")[:3]
-        type_values = type_sum[types_ids]
+    i, j = np.argsort(-1 * flavor_sum, kind="stable").tolist()[:2]
 
-        sorted_types = np.take(types_ids, self.sort_types(type_values))
-        levels = self.compute_levels(type_values)
+    power_sum = power_sum + BONUS_MAT[i, j, :]
 
-        return np.column_stack([power_ids, sorted_types, levels])
+    # Force Sparkling Power to zero if there are less than two Herba Mystica
+    power_sum *= NOT_SPARKLING | (power_sum >= 2000)
 
-    @staticmethod
-    def sort_types(values: NDArray) -> tuple[int, int, int]:
-        """Return the indices that would sort the Type array.
+    power_ids = np.argsort(-1 * power_sum, kind="stable")[:3]
 
-        Returns:
-            Tuple of indices that sort the Type array.
-        """
-        assert len(values) == 3
-        difference = values[0] - values[1]
+    types_ids = np.argsort(-1 * type_sum, kind="stable")[:3]
+    type_values = type_sum[types_ids]
 
-        if values[0] > 480:
-            return (0, 0, 0)
-        elif values[0] > 280:
-            return (0, 0, 2)
-        else:
-            split = False
-            if values[0] > 105 and difference > 105:
-                return (0, 0, 2)
-            elif 100 <= values[0] <= 105:
-                split = difference >= 80 and values[1] <= 21
-            elif 90 <= values[0] < 100:
-                split = difference >= 78 and values[1] <= 16
-            elif 80 <= values[0] < 90:
-                split = difference >= 74 and values[1] <= 9
-            elif 74 <= values[0] < 80:
-                split = difference >= 72 and values[1] <= 5
-            if split:
-                return (0, 2, 0)
-            return (0, 2, 1)
-
-    @staticmethod
-    def compute_levels(values: NDArray) -> tuple[int, int, int]:
-        """Calculate the Levels of each effect.
+    sorted_types = np.take(types_ids, sort_types(type_values))
+    levels = compute_levels(type_values)
+
+    return np.column_stack([power_ids, sorted_types, levels])
+
+
+def compute_effects_from_sparse(
+    indices: NDArray[np.intp], counts: NDArray[np.intp]
+) -> NDArray[np.intp]:
+    """Compute the effects of a recipe from the indices and counts of its
+    ingredients, only summing the rows of the ingredients it contains.
+
+    Args:
+        indices: Indices of the ingredients in the recipe
+        counts: Count of each ingredient
+
+    Returns:
+        List of tuples containing a Power, a Pokémon Type, and a Level.
+    """
+    return compute_effects_from_sums(counts @ ingredient_data.contribution_mat[indices])
+
+
+def compute_batch_effects(ingredient_lists: NDArray[np.intp]) -> NDArray[np.intp]:
+    """Compute the effects of many recipes at once.
+
+    Args:
+        ingredient_lists:
+            Matrix of ingredient counts, one row per recipe and one column
+            per ingredient
+
+    Returns:
+        Array of shape (N, 3, 3), where each recipe has three effects
+        consisting of a Power, a Pokémon Type, and a Level.
+    """
+    ingredient_lists = np.atleast_2d(ingredient_lists)
+    if ingredient_lists.shape[1] != len(ingredient_data):
+        raise ValueError(
+            f"Expected {len(ingredient_data)} ingredient counts per recipe, "
+            f"got {ingredient_lists.shape[1]}."
+        )
+    sums = ingredient_lists @ ingredient_data.contribution_mat
+    return compute_batch_effects_from_sums(sums)
+
+
+def compute_batch_effects_from_sparse(
+    indices: NDArray[np.intp], counts: NDArray[np.intp]
+) -> NDArray[np.intp]:
+    """Compute the effects of many recipes at once from the indices and counts
+    of their ingredients (see `pokemon_gourmet.sandwich.sparse.to_sparse`).
+
+    Args:
+        indices: Matrix of ingredient indices, one row per recipe
+        counts: Matrix of the count of each ingredient index (zero for padding)
+
+    Returns:
+        Array of shape (N, 3, 3), where each recipe has three effects
+        consisting of a Power, a Pokémon Type, and a Level.
+    """
+    sums = np.einsum("nk,nkc->nc", counts, ingredient_data.contribution_mat[indices])
+    return compute_batch_effects_from_sums(sums)
+
+
+def compute_batch_effects_from_sums(sums: NDArray[np.intp]) -> NDArray[np.intp]:
+    """Compute the effects of many recipes at once from the sums of their
+    ingredients' Flavors, Powers, and Types (weighted by their number of
+    pieces).
+
+    Args:
+        sums:
+            Matrix of rows of the contribution matrix summed over each
+            recipe's ingredients
+
+    Returns:
+        Array of shape (N, 3, 3), where each recipe has three effects
+        consisting of a Power, a Pokémon Type, and a Level.
+    """
+    flavor_sum = sums[:, FLAVOR_SLICE]
+    flavor_ids = np.argsort(-1 * flavor_sum, axis=1, kind="stable")[:, :2]
+
+    power_sum = sums[:, POWER_SLICE] + BONUS_MAT[flavor_ids[:, 0], flavor_ids[:, 1], :]
+
+    # Force Sparkling Power to zero if there are less than two Herba Mystica
+    power_sum *= NOT_SPARKLING | (power_sum >= 2000)
+
+    power_ids = np.argsort(-1 * power_sum, axis=1, kind="stable")[:, :3]
+
+    type_sum = sums[:, TYPE_SLICE]
+    types_ids = np.argsort(-1 * type_sum, axis=1, kind="stable")[:, :3]
+    type_values = np.take_along_axis(type_sum, types_ids, axis=1)
+
+    sorted_types = np.take_along_axis(types_ids, sort_batch_types(type_values), axis=1)
+    levels = compute_batch_levels(type_values)
+
+    return np.stack([power_ids, sorted_types, levels], axis=2)
+
+
+def compute_effects(
+    recipe: "Recipe",
+    backend: Optional["EffectBackend"] = None,
+    database: Optional["EffectDatabase"] = None,
+) -> NDArray[np.intp]:
+    """Compute the effects of a recipe.
+
+    This function keeps no state between calls, so it can be called
+    concurrently (e.g., from a thread pool).
+
+    Args:
+        recipe: Recipe to calculate effects
+        backend: Kernel computing the effects (by default, NumPy)
+        database: Precomputed effects looked up before computing them
+
+    Returns:
+        List of tuples containing a Power, a Pokémon Type, and a Level.
+    """
+    if database is not None:
+        effects = database.get(recipe)
+        if effects is not None:
+            return effects
+    if backend is not None:
+        return backend(recipe)
+    return compute_effects_from_sums(recipe._sums)
+
+
+class EffectCalculator(metaclass=Singleton):
+    """Calculate the effects of a recipe, based on the formula derived
+    by @cecilbowen.
+
+    Check <https://github.com/cecilbowen/pokemon-sandwich-simulator>.
+
+    This is a thin wrapper around the module functions that holds the
+    process-wide backend and database. Calling it does not modify it, so it
+    is safe to share between threads.
+    """
+
+    bonus_mat = BONUS_MAT
+
+    compute_effects_from_sums = staticmethod(compute_effects_from_sums)
+    compute_effects_from_sparse = staticmethod(compute_effects_from_sparse)
+    compute_batch_effects = staticmethod(compute_batch_effects)
+    compute_batch_effects_from_sparse = staticmethod(compute_batch_effects_from_sparse)
+    compute_batch_effects_from_sums = staticmethod(compute_batch_effects_from_sums)
+    sort_types = staticmethod(sort_types)
+    sort_batch_types = staticmethod(sort_batch_types)
+    compute_levels = staticmethod(compute_levels)
+    compute_batch_levels = staticmethod(compute_batch_levels)
+
+    def __init__(self) -> None:
+        # Deprecated, only read by `compute_effects` when no recipe is given
+        self.recipe: Optional["Recipe"] = None
+        self.backend: Optional["EffectBackend"] = None
+        self.database: Optional["EffectDatabase"] = None
+
+    def __call__(self, recipe: "Recipe") -> NDArray[np.intp]:
+        return compute_effects(recipe, self.backend, self.database)
+
+    def compute_effects(self, recipe: Optional["Recipe"] = None) -> NDArray[np.intp]:
+        """Compute the effects of a recipe with the selected backend and
+        database.
+
+        Args:
+            recipe: Recipe to calculate effects (by default, the `recipe`
+                attribute)
 
         Returns:
-            Three Levels associated with each recipe effect
+            List of tuples containing a Power, a Pokémon Type, and a Level.
         """
-        if values[0] < 180:
-            return (1, 1, 1)
-        elif values[0] <= 280:
-            if values[1] >= 180 and values[2] >= 180:
-                return (2, 2, 1)
-            else:
-                return (2, 1, 1)
-        elif values[0] < 380:
-            if values[2] >= 180:
-                return (2, 2, 2)
-            else:
-                return (2, 2, 1)
-        elif values[0] < 460:
-            if values[1] >= 380 and values[2] >= 380:
-                return (3, 3, 3)
-            else:
-                return (3, 3, 2)
-        else:
-            return (3, 3, 3)
+        if recipe is None:
+            recipe = self.recipe
+        if recipe is None:
+            raise ValueError("No recipe to calculate effects.")
+        return compute_effects(recipe, self.backend, self.database)
 
 
 calculate_effects = EffectCalculator()
+calculate_batch_effects = compute_batch_effects
+calculate_batch_effects_from_sums = compute_batch_effects_from_sums
+
+# Effects shared by every recipe of the process, keyed by packed ingredient counts
+effect_cache: LRUCache[int, NDArray[np.intp]] = LRUCache(EFFECT_CACHE_SIZE)
@@ -0,0 +1,362 @@
+__all__ = [
+    "build_effect_database",
+    "EffectDatabase",
+    "get_effect_database",
+    "MAX_DATABASE_INGREDIENTS",
+    "pack_ingredients",
+    "set_effect_database",
+    "unpack_key",
+]
+
+import mmap
+import os
+import struct
+from itertools import combinations_with_replacement
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Power, Type
+from pokemon_gourmet.sandwich.effect_calculation import (
+    calculate_batch_effects_from_sums,
+    calculate_effects,
+)
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.sandwich.recipe import (
+    MAX_CONDIMENTS,
+    MAX_FILLINGS,
+    Recipe,
+)
+
+MAGIC = b"PGEFFDB\0"
+VERSION = 1
+# Magic, version, max. ingredients, number of recipes, and section offsets
+HEADER = struct.Struct("<8sIIQQQQQ")
+HEADER_SIZE = 64
+# Each ingredient index (plus one) takes six bits, so keys fit ten ingredients
+BITS_PER_INGREDIENT = 6
+MAX_KEY_INGREDIENTS = 64 // BITS_PER_INGREDIENT
+# Builds keep every recipe in memory (about 35 bytes each, or 2.4 GB for 67
+# million recipes of up to six ingredients), and recipe IDs are 32-bit
+MAX_DATABASE_INGREDIENTS = 6
+LEVELS_PER_CODE = 4
+
+
+def pack_ingredients(ingredient_list: NDArray[np.integer]) -> NDArray[np.uint64]:
+    """Pack ingredient counts into 64-bit keys.
+
+    Ingredient indices (plus one) are sorted and packed six bits each, lowest
+    first, so the key of a recipe is unique and independent of the order its
+    ingredients were added.
+
+    Args:
+        ingredient_list: Ingredient counts of one recipe, or a matrix of
+            ingredient counts (one recipe per row)
+
+    Raises:
+        ValueError: If a recipe has more than ten ingredients
+
+    Returns:
+        Key (or array of keys)
+    """
+    counts = np.asarray(ingredient_list)
+    if np.any(counts.sum(axis=-1) > MAX_KEY_INGREDIENTS):
+        raise ValueError(f"Keys only fit up to {MAX_KEY_INGREDIENTS} ingredients.")
+    if counts.ndim == 1:
+        # Looping over a single recipe's ingredients is faster than vectorizing
+        key = 0
+        for position, i in enumerate(np.repeat(np.arange(len(counts)), counts)):
+            key |= (i.item() + 1) << (BITS_PER_INGREDIENT * position)
+        return np.uint64(key)
+    counts = counts.astype(np.uint64)
+    # Sum of (i + 1) * 64 ** position over the positions taken by each count
+    starts = np.cumsum(counts, axis=-1) - counts
+    runs = (np.uint64(1) << (np.uint64(BITS_PER_INGREDIENT) * counts)) - np.uint64(1)
+    runs //= np.uint64((1 << BITS_PER_INGREDIENT) - 1)
+    ids = np.arange(1, counts.shape[-1] + 1, dtype=np.uint64)
+    shifted = runs << (np.uint64(BITS_PER_INGREDIENT) * starts)
+    return np.sum(ids * shifted, axis=-1, dtype=np.uint64)
+
+
+def unpack_key(key: int) -> NDArray[np.intp]:
+    """Return the ingredient counts packed into a key."""
+    ingredient_list = np.zeros(len(ingredient_data), dtype=int)
+    key = int(key)
+    mask = (1 << BITS_PER_INGREDIENT) - 1
+    while key:
+        ingredient_list[(key & mask) - 1] += 1
+        key >>= BITS_PER_INGREDIENT
+    return ingredient_list
+
+
+def encode_effects(effects: NDArray[np.integer]) -> NDArray[np.uint16]:
+    """Encode the Power, Type, and Level of effects into one number each.
+
+    Levels take the lowest digits, so the codes of an effect at every Level are
+    contiguous.
+    """
+    effects = np.asarray(effects, dtype=np.uint16)
+    power, pokemon_type, level = np.moveaxis(effects, -1, 0)
+    return (power * len(Type) + pokemon_type) * LEVELS_PER_CODE + level
+
+
+class EffectDatabase:
+    """A read-only, memory-mapped table of recipes and their effects.
+
+    The file holds the sorted keys of every recipe (see `pack_ingredients`),
+    their effects (as in `pokemon_gourmet.sandwich.Recipe.effects`), and a
+    secondary index of the recipes sorted by the code of each of their effects.
+    Sections are memory-mapped, so lookups only read the pages they touch and
+    processes opening the same file share them through the page cache.
+
+    The file stays mapped until `close` is called (or the database is used as
+    a context manager), after which its sections are empty.
+
+    Args:
+        path: Path of a database written by `build_effect_database`
+
+    Raises:
+        ValueError: If the file is not a database or has an incompatible version
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size or header[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not an effect database.")
+        (
+            _,
+            version,
+            self.max_ingredients,
+            num_recipes,
+            keys_offset,
+            effects_offset,
+            codes_offset,
+            recipe_ids_offset,
+        ) = HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"Unsupported effect database version in '{path}'.")
+
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        def view(dtype, offset, count):
+            # Plain (read-only) arrays index faster than `np.memmap` instances
+            return np.frombuffer(self._mmap, dtype, count, offset)
+
+        self.keys = view(np.uint64, keys_offset, num_recipes)
+        self.effects = view(np.int8, effects_offset, 9 * num_recipes).reshape(-1, 3, 3)
+        self.codes = view(np.uint16, codes_offset, 3 * num_recipes)
+        self.recipe_ids = view(np.uint32, recipe_ids_offset, 3 * num_recipes)
+
+    def __contains__(self, recipe: Recipe) -> bool:
+        return self.get(recipe) is not None
+
+    def __enter__(self) -> "EffectDatabase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}('{self.path}', {len(self)} recipes)"
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap.closed
+
+    def close(self) -> None:
+        """Unmap the file.
+
+        Raises:
+            BufferError: If views of the sections (e.g., `keys`) are still
+                referenced elsewhere
+        """
+        if self.closed:
+            return
+        # Views export the map's buffer, which must be released first
+        self.keys = self.keys[:0].copy()
+        self.effects = self.effects[:0].copy()
+        self.codes = self.codes[:0].copy()
+        self.recipe_ids = self.recipe_ids[:0].copy()
+        self._mmap.close()
+
+    def get(self, recipe: Recipe) -> Optional[NDArray[np.intp]]:
+        """Return the effects of a recipe, or None if it is not stored."""
+        if recipe._ingredient_list.sum() > self.max_ingredients:
+            return None
+        key = pack_ingredients(recipe._ingredient_list)
+        i = np.searchsorted(self.keys, key).item()
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.effects[i].astype(np.intp)
+        return None
+
+    def get_batch(
+        self, ingredient_lists: NDArray[np.integer]
+    ) -> tuple[NDArray[np.bool_], NDArray[np.intp]]:
+        """Return the effects of a batch of recipes.
+
+        Args:
+            ingredient_lists: Matrix of ingredient counts (one recipe per row)
+
+        Returns:
+            Whether each recipe is stored, and the effects of the stored ones
+        """
+        ingredient_lists = np.asarray(ingredient_lists)
+        if len(self.keys) == 0:
+            return np.zeros(len(ingredient_lists), dtype=bool), np.zeros((0, 3, 3), int)
+        is_small = ingredient_lists.sum(axis=1) <= self.max_ingredients
+        keys = np.zeros(len(ingredient_lists), dtype=np.uint64)
+        keys[is_small] = pack_ingredients(ingredient_lists[is_small])
+        idx = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        is_found = is_small & (self.keys[idx] == keys)
+        return is_found, self.effects[idx[is_found]].astype(np.intp)
+
+    def find(
+        self, power: Power, pokemon_type: Type, level: Optional[int] = None
+    ) -> NDArray[np.uint64]:
+        """Return the keys of the recipes with a given effect.
+
+        Args:
+            power: Power of the effect
+            pokemon_type: Pokémon Type of the effect
+            level: Level of the effect (any Level if not given)
+
+        Returns:
+            Sorted keys of the recipes (see `unpack_key`)
+        """
+        code = encode_effects([power.value - 1, pokemon_type.value - 1, 0])
+        if level is None:
+            lo, hi = code + 1, code + LEVELS_PER_CODE - 1
+        else:
+            lo = hi = code + level
+        start, stop = np.searchsorted(self.codes, [lo, hi + 1])
+        recipe_ids = np.sort(self.recipe_ids[start:stop])
+        return self.keys[recipe_ids]
+
+
+def iter_ingredient_lists(
+    max_ingredients: int, chunk_size: int
+) -> Iterable[NDArray[np.uint8]]:
+    """Yield every legal recipe (single player) with up to some number of
+    ingredients, as batches of ingredient counts."""
+
+    def to_counts(multisets):
+        counts = np.zeros((len(multisets), len(ingredient_data)), dtype=np.uint8)
+        for row, multiset in zip(counts, multisets):
+            np.add.at(row, list(multiset), 1)
+        return counts
+
+    filling_ids = np.flatnonzero(ingredient_data.is_filling).tolist()
+    condiment_ids = np.flatnonzero(ingredient_data.is_condiment).tolist()
+    max_fillings = min(MAX_FILLINGS, max_ingredients - 1)
+    condiment_lists = [
+        to_counts(list(combinations_with_replacement(condiment_ids, size)))
+        for size in range(MAX_CONDIMENTS + 1)
+    ]
+    for num_fillings in range(1, max_fillings + 1):
+        fillings = to_counts(
+            list(combinations_with_replacement(filling_ids, num_fillings))
+        )
+        # Skip fillings exceeding the max number of pieces
+        ingredient_counts = fillings * ingredient_data.pieces
+        fillings = fillings[
+            np.all(ingredient_counts <= Recipe().single_ingredient_limit, axis=1)
+        ]
+        max_condiments = min(MAX_CONDIMENTS, max_ingredients - num_fillings)
+        condiments = np.concatenate(condiment_lists[1 : max_condiments + 1])
+        step = max(1, chunk_size // len(condiments))
+        for i in range(0, len(fillings), step):
+            yield (
+                fillings[i : i + step, np.newaxis, :] + condiments[np.newaxis, :, :]
+            ).reshape(-1, len(ingredient_data))
+
+
+def build_effect_database(
+    path: Union[str, Path], max_ingredients: int = 4, chunk_size: int = 2**16
+) -> EffectDatabase:
+    """Compute the effects of every legal recipe (single player) with up to
+    some number of ingredients and write them to a database.
+
+    Args:
+        path: Path of the database
+        max_ingredients: Maximum number of ingredients (fillings and
+            condiments) per recipe
+        chunk_size: Number of recipes evaluated at once
+
+    Raises:
+        ValueError: If the number of ingredients is not between 2 and
+            `MAX_DATABASE_INGREDIENTS`
+
+    Returns:
+        Memory-mapped database
+    """
+    if not 2 <= max_ingredients <= MAX_DATABASE_INGREDIENTS:
+        raise ValueError(
+            "Number of ingredients should be between 2 and "
+            f"{MAX_DATABASE_INGREDIENTS}."
+        )
+    keys, effects = [], []
+    for ingredient_lists in iter_ingredient_lists(max_ingredients, chunk_size):
+        sums = ingredient_lists @ ingredient_data.contribution_mat
+        keys.append(pack_ingredients(ingredient_lists))
+        effects.append(calculate_batch_effects_from_sums(sums).astype(np.int8))
+    keys = np.concatenate(keys)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    effects = np.concatenate(effects)[order]
+    # Secondary index: every effect of every recipe, sorted by effect
+    codes = encode_effects(effects).ravel()
+    code_order = np.argsort(codes, kind="stable")
+    recipe_ids = (code_order // 3).astype(np.uint32)
+    codes = codes[code_order]
+
+    sections = (keys, effects, codes, recipe_ids)
+    offsets = [HEADER_SIZE]
+    for section in sections:
+        # Align sections to 8 bytes
+        offsets.append(offsets[-1] + -(-section.nbytes // 8) * 8)
+    with open(path, "wb") as file:
+        header = HEADER.pack(MAGIC, VERSION, max_ingredients, len(keys), *offsets[:-1])
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        for section, offset in zip(sections, offsets):
+            file.seek(offset)
+            file.write(np.ascontiguousarray(section).tobytes())
+        file.truncate(offsets[-1])
+    return EffectDatabase(path)
+
+
+def get_effect_database() -> Optional[EffectDatabase]:
+    """Return the database consulted before computing the effects of a recipe."""
+    return calculate_effects.database
+
+
+def set_effect_database(
+    path: Union[str, Path, None] = None,
+) -> Optional[EffectDatabase]:
+    """Select a database to consult before computing the effects of a recipe.
+
+    Args:
+        path:
+            Path of the database. If not given, read it from the
+            `POKEMON_GOURMET_EFFECT_DATABASE` environment variable (if unset,
+            effects are always computed).
+
+    Returns:
+        The selected database (if any). The previously selected one is closed.
+    """
+    if path is None:
+        path = os.environ.get("POKEMON_GOURMET_EFFECT_DATABASE") or None
+    if calculate_effects.database is not None:
+        calculate_effects.database.close()
+    calculate_effects.database = None if path is None else EffectDatabase(path)
+    return calculate_effects.database
+
+
+set_effect_database()
@@ -1,32 +1,137 @@
-__all__ = ["ingredient_data"]
+__all__ = [
+    "FLAVOR_SLICE",
+    "POWER_SLICE",
+    "TYPE_SLICE",
+    "build_ingredient_cache",
+    "ingredient_data",
+]
 
+import csv
+import hashlib
+import os
+import tempfile
 from pathlib import Path
+from typing import Optional, Union
 
 import numpy as np
-import pandas as pd
 from numpy.typing import NDArray
 
 from pokemon_gourmet.enums import Flavor, Power, Type
 from pokemon_gourmet.singleton import Singleton
 
+# Column ranges of Flavors, Powers, and Types in the contribution matrix
+FLAVOR_SLICE = slice(0, len(Flavor))
+POWER_SLICE = slice(FLAVOR_SLICE.stop, FLAVOR_SLICE.stop + len(Power))
+TYPE_SLICE = slice(POWER_SLICE.stop, POWER_SLICE.stop + len(Type))
+
+DATA_PATH = Path(__file__).parent / "ingredient_data.csv"
+# Precompiled tables, regenerated whenever the CSV file changes
+CACHE_PATH = DATA_PATH.with_suffix(".npz")
+
+
+def _hash_file(path: Union[str, Path]) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _parse_csv(path: Union[str, Path]) -> dict[str, NDArray]:
+    """Read the ingredient tables from a CSV file."""
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+
+    def column(names: list[str]) -> NDArray[np.intp]:
+        return np.array([[int(row[name]) for name in names] for row in rows])
+
+    def flag(name: str) -> NDArray[np.bool_]:
+        return np.array([row[name] == "True" for row in rows])
+
+    return dict(
+        names=np.array([row["name"] for row in rows]),
+        pieces=column(["pieces"])[:, 0],
+        is_condiment=flag("is_condiment"),
+        is_herba_mystica=flag("is_herba_mystica"),
+        flavor_mat=column(Flavor._member_names_),
+        power_mat=column(Power._member_names_),
+        type_mat=column(Type._member_names_),
+    )
+
+
+def build_ingredient_cache(
+    data_path: Union[str, Path] = DATA_PATH,
+    cache_path: Union[str, Path] = CACHE_PATH,
+) -> dict[str, NDArray]:
+    """Parse the ingredient CSV file and save its tables to a NumPy archive,
+    along with the hash of the CSV file.
+
+    The archive is written to a temporary file that then replaces the cache,
+    so processes loading the cache at the same time never read it partially
+    written.
+
+    Returns:
+        Ingredient tables keyed by name
+    """
+    tables = _parse_csv(data_path)
+    cache_path = Path(cache_path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{cache_path.name}.", suffix=".tmp", dir=cache_path.parent
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, csv_hash=np.array(_hash_file(data_path)), **tables)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tables
+
+
+def _load_tables(
+    data_path: Union[str, Path] = DATA_PATH,
+    cache_path: Union[str, Path] = CACHE_PATH,
+) -> dict[str, NDArray]:
+    """Load the ingredient tables from the cache, rebuilding it if it is
+    missing or stale (or parsing the CSV file if it cannot be written)."""
+    csv_hash = _hash_file(data_path)
+    tables: Optional[dict[str, NDArray]] = None
+    try:
+        with np.load(cache_path) as data:
+            if data["csv_hash"].item() == csv_hash:
+                tables = {key: data[key] for key in data.files if key != "csv_hash"}
+    except Exception:  # e.g., missing or corrupted (`zipfile.BadZipFile`)
+        pass
+    if tables is None:
+        try:
+            tables = build_ingredient_cache(data_path, cache_path)
+        except OSError:  # e.g., read-only installation
+            tables = _parse_csv(data_path)
+    return tables
+
 
 class IngredientData(metaclass=Singleton):
     def __init__(self) -> None:
-        data_path = Path(__file__).parent / "ingredient_data.csv"
-        data = pd.read_csv(data_path, index_col=0)
+        data = _load_tables()
+
+        self.num_ingredients = len(data["names"])
+        self.power_mat: NDArray[np.intp] = data["power_mat"]
+        self.flavor_mat: NDArray[np.intp] = data["flavor_mat"]
+        self.type_mat: NDArray[np.intp] = data["type_mat"]
 
-        self.num_ingredients = len(data)
-        self.power_mat: NDArray[np.intp] = data[Power._member_names_].to_numpy()
-        self.flavor_mat: NDArray[np.intp] = data[Flavor._member_names_].to_numpy()
-        self.type_mat: NDArray[np.intp] = data[Type._member_names_].to_numpy()
+        self.names: list[str] = data["names"].tolist()
 
-        self.names: list[str] = data.index.tolist()
+        self.pieces: NDArray[np.intp] = data["pieces"]
 
-        self.pieces: NDArray[np.intp] = data["pieces"].to_numpy()
+        # Flavors, Powers, and Types contributed by each ingredient (pieces
+        # included), so that a single matrix product yields every sum
+        self.contribution_mat: NDArray[np.intp] = np.ascontiguousarray(
+            np.hstack([self.flavor_mat, self.power_mat, self.type_mat])
+            * self.pieces[:, np.newaxis]
+        )
+        self.flavor_contribution = self.contribution_mat[:, FLAVOR_SLICE]
+        self.power_contribution = self.contribution_mat[:, POWER_SLICE]
+        self.type_contribution = self.contribution_mat[:, TYPE_SLICE]
 
-        self.is_condiment: NDArray[np.bool_] = data["is_condiment"].to_numpy()
+        self.is_condiment: NDArray[np.bool_] = data["is_condiment"]
         self.is_filling = ~self.is_condiment
-        self.is_herba_mystica: NDArray[np.bool_] = data["is_herba_mystica"].to_numpy()
+        self.is_herba_mystica: NDArray[np.bool_] = data["is_herba_mystica"]
 
     def __getitem__(self, idx: int) -> str:
         return self.names[idx]
@@ -1,12 +1,16 @@
 __all__ = ["Recipe"]
 
 from collections.abc import Collection, Hashable, Iterator
-from typing import Union, cast
+from typing import Optional, TypeVar, Union
 
 import numpy as np
+from numpy.typing import NDArray
 
 from pokemon_gourmet.sandwich.effect import EffectList
-from pokemon_gourmet.sandwich.effect_calculation import calculate_effects
+from pokemon_gourmet.sandwich.effect_calculation import (
+    calculate_effects,
+    effect_cache,
+)
 from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
 
 MAX_CONDIMENTS = 4
@@ -15,36 +19,72 @@ MAX_PLAYERS = 4
 
 RecipeTuple = tuple[int, ...]
 Ingredient = Union[int, str]
+RecipeT = TypeVar("RecipeT", bound="Recipe")
+
+# Ingredient attributes as lists, faster to index one element at a time
+_IS_CONDIMENT: list[bool] = ingredient_data.is_condiment.tolist()
+_IS_HERBA_MYSTICA: list[bool] = ingredient_data.is_herba_mystica.tolist()
+_PIECES: list[int] = ingredient_data.pieces.tolist()
+_FILLING_PIECES = ingredient_data.pieces * ingredient_data.is_filling
 
 
 class Recipe(Collection, Hashable):
-    """A collection of condiments and fillings"""
+    """A collection of condiments and fillings
+
+    Ingredient counts are stored in a `uint8` array and, packed one byte each,
+    in an integer key that is updated on every addition, so hashing and
+    comparing recipes does not touch the array. The number of condiments,
+    fillings, Herba Mystica, and pieces are also updated on every addition.
+    """
+
+    __slots__ = (
+        "num_players",
+        "_effects",
+        "_hash",
+        "_ingredient_list",
+        "_key",
+        "_sums",
+        "_num_condiments",
+        "_num_fillings",
+        "_num_herba_mystica",
+        "_total_pieces",
+        "_max_filling_pieces",
+    )
 
     def __init__(self, *ingredients: Ingredient, num_players: int = 1) -> None:
         self.num_players = max(min(num_players, MAX_PLAYERS), 1)
         self._effects = None
-        self._ingredient_list = np.zeros(len(ingredient_data), dtype=int)
+        self._hash: Optional[int] = None
+        self._ingredient_list = np.zeros(len(ingredient_data), dtype=np.uint8)
+        self._key = 0
+        self._num_condiments = 0
+        self._num_fillings = 0
+        self._num_herba_mystica = 0
+        self._total_pieces = 0
+        # Pieces of the filling with the most pieces
+        self._max_filling_pieces = 0
+        # Running sums of Flavors, Powers, and Types (weighted by pieces)
+        self._sums = np.zeros(ingredient_data.contribution_mat.shape[1], dtype=int)
         for ingredient in ingredients:
-            i = self._get_ingredient_index(ingredient)
-            self._ingredient_list[i] += 1
+            self.add_ingredient(ingredient)
 
     def __contains__(self, ingredient: Ingredient) -> bool:
         i = self._get_ingredient_index(ingredient)
         return self._ingredient_list[i] > 0
 
     def __eq__(self, other: "Recipe") -> bool:
-        return self.__class__ == other.__class__ and cast(
-            bool, np.all(self._ingredient_list == other._ingredient_list)
-        )
+        return self.__class__ == other.__class__ and self._key == other._key
 
     def __hash__(self) -> int:
-        return hash(self.astuple())
+        if self._hash is None:
+            self._hash = hash(self._key)
+        return self._hash
 
     def __iter__(self) -> Iterator[Ingredient]:
         return iter(self.ingredients)
 
     def __len__(self) -> int:
-        return self._ingredient_list.sum()
+        return self._num_condiments + self._num_fillings
 
     def __repr__(self) -> str:
         s = "s" if len(self) != 1 else ""
@@ -58,7 +98,12 @@ class Recipe(Collection, Hashable):
     @property
     def effects(self) -> EffectList:
         if self._effects is None:
-            self._effects = calculate_effects(self)
+            key = self.key
+            self._effects = effect_cache.get(key)
+            if self._effects is None:
+                self._effects = calculate_effects(self)
+                self._effects.flags.writeable = False
+                effect_cache[key] = self._effects
         return EffectList(self._effects)
 
     @property
@@ -85,45 +130,128 @@ class Recipe(Collection, Hashable):
             ingredient_data[i] for i, count in zip(ids, counts) for _ in range(count)
         ]
 
+    @property
+    def key(self) -> int:
+        """The ingredient counts packed into an integer (one byte each)."""
+        return self._key
+
     @property
     def is_legal(self) -> bool:
-        ingredient_counts = self._ingredient_list * ingredient_data.pieces
-        ingredient_limit = np.all(
-            ingredient_data.is_condiment
-            | (ingredient_counts <= self.single_ingredient_limit)
-        )
         return (
-            1 <= (self.num_fillings / self.num_players) <= MAX_FILLINGS
-            and 1 <= (self.num_condiments / self.num_players) <= MAX_CONDIMENTS
-            and cast(bool, ingredient_limit)
+            1 <= (self._num_fillings / self.num_players) <= MAX_FILLINGS
+            and 1 <= (self._num_condiments / self.num_players) <= MAX_CONDIMENTS
+            and self._max_filling_pieces <= self.single_ingredient_limit
         )
 
     @property
     def num_condiments(self) -> int:
-        return self._ingredient_list[ingredient_data.is_condiment].sum()
+        return self._num_condiments
 
     @property
     def num_fillings(self) -> int:
-        return self._ingredient_list[ingredient_data.is_filling].sum()
+        return self._num_fillings
 
     @property
     def total_pieces(self) -> int:
-        counts = self._ingredient_list * ingredient_data.pieces
-        return counts[ingredient_data.is_filling].sum()
+        return self._total_pieces
 
     @property
     def num_herba_mystica(self) -> int:
-        return self._ingredient_list[ingredient_data.is_herba_mystica].sum()
+        return self._num_herba_mystica
 
     @property
     def single_ingredient_limit(self) -> int:
         return 15 if self.num_players > 1 else 12
 
     def add_ingredient(self, ingredient: Ingredient) -> None:
-        """Add ingredient to recipe and reset its effects."""
+        """Add ingredient to recipe, update its running sums, and reset its
+        effects."""
         self._effects = None  # Reset effects
+        self._hash = None
         i = self._get_ingredient_index(ingredient)
         self._ingredient_list[i] += 1
+        self._key += 1 << (8 * i)
+        self._sums += ingredient_data.contribution_mat[i]
+        if _IS_CONDIMENT[i]:
+            self._num_condiments += 1
+            self._num_herba_mystica += _IS_HERBA_MYSTICA[i]
+        else:
+            self._num_fillings += 1
+            self._total_pieces += _PIECES[i]
+            self._max_filling_pieces = max(
+                self._max_filling_pieces,
+                int(self._ingredient_list[i]) * _PIECES[i],
+            )
+
+    def remove_ingredient(self, ingredient: Ingredient) -> None:
+        """Remove ingredient from recipe (undoing `add_ingredient`), update its
+        running sums, and reset its effects.
+
+        Raises:
+            ValueError: If the ingredient is not in the recipe
+        """
+        i = self._get_ingredient_index(ingredient)
+        count = int(self._ingredient_list[i])
+        if count == 0:
+            raise ValueError(f"Recipe does not contain {ingredient_data[i]}.")
+        self._effects = None  # Reset effects
+        self._hash = None
+        self._ingredient_list[i] = count - 1
+        self._key -= 1 << (8 * i)
+        self._sums -= ingredient_data.contribution_mat[i]
+        if _IS_CONDIMENT[i]:
+            self._num_condiments -= 1
+            self._num_herba_mystica -= _IS_HERBA_MYSTICA[i]
+        else:
+            self._num_fillings -= 1
+            self._total_pieces -= _PIECES[i]
+            if count * _PIECES[i] == self._max_filling_pieces:
+                # This filling may have had the most pieces
+                self._max_filling_pieces = int(
+                    np.max(
+                        self._ingredient_list * _FILLING_PIECES,
+                        initial=0,
+                    )
+                )
+
+    def copy(self: RecipeT) -> RecipeT:
+        """Return a copy of this recipe, much cheaper than `copy.deepcopy`.
+
+        Only the ingredient counts and running sums are copied; the computed
+        effects are read-only and shared.
+        """
+        other = self.__class__.__new__(self.__class__)
+        other.num_players = self.num_players
+        other._effects = self._effects
+        other._hash = self._hash
+        other._ingredient_list = self._ingredient_list.copy()
+        other._key = self._key
+        other._sums = self._sums.copy()
+        other._num_condiments = self._num_condiments
+        other._num_fillings = self._num_fillings
+        other._num_herba_mystica = self._num_herba_mystica
+        other._total_pieces = self._total_pieces
+        other._max_filling_pieces = self._max_filling_pieces
+        return other
+
+    @classmethod
+    def from_sparse(
+        cls,
+        indices: NDArray[np.integer],
+        counts: NDArray[np.integer],
+        num_players: int = 1,
+    ) -> "Recipe":
+        """Create a recipe from the indices and counts of its ingredients."""
+        recipe = cls(num_players=num_players)
+        for i, count in zip(np.asarray(indices).tolist(), np.asarray(counts).tolist()):
+            for _ in range(count):
+                recipe.add_ingredient(i)
+        return recipe
+
+    def to_sparse(self) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """Return the indices and counts of the ingredients in this recipe."""
+        indices = np.flatnonzero(self._ingredient_list)
+        return indices, self._ingredient_list[indices].astype(np.intp)
 
     def astuple(self) -> RecipeTuple:
         """Return the list of ingredient indices as a tuple."""
@@ -132,10 +260,10 @@ class Recipe(Collection, Hashable):
     def count(self, ingredient: Ingredient) -> int:
         """Return the count of the given ingredient."""
         i = self._get_ingredient_index(ingredient)
-        return cast(int, self._ingredient_list[i])
+        return int(self._ingredient_list[i])
 
     @staticmethod
     def _get_ingredient_index(ingredient: Ingredient) -> int:
         if isinstance(ingredient, str):
             return ingredient_data.index(ingredient)
-        return ingredient
+        return int(ingredient)
@@ -0,0 +1,62 @@
+__all__ = ["to_dense", "to_sparse"]
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+
+
+def to_sparse(
+    ingredient_lists: NDArray[np.integer],
+) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Convert ingredient counts to the indices and counts of the ingredients
+    present in each recipe.
+
+    Recipes with fewer distinct ingredients than the widest recipe are padded
+    with index zero and count zero, which contribute nothing to the sums.
+
+    Args:
+        ingredient_lists: Ingredient counts of one recipe, or a matrix of
+            ingredient counts (one recipe per row)
+
+    Returns:
+        Matrices of ingredient indices and counts, one row per recipe (or
+        vectors if a single recipe was given)
+    """
+    ingredient_lists = np.asarray(ingredient_lists)
+    if ingredient_lists.ndim == 1:
+        indices = np.flatnonzero(ingredient_lists)
+        return indices, ingredient_lists[indices].astype(np.intp)
+    is_present = ingredient_lists > 0
+    width = is_present.sum(axis=1).max(initial=0)
+    # Stable sort moves the indices of present ingredients to the front
+    indices = np.argsort(~is_present, axis=1, kind="stable")[:, :width]
+    counts = np.take_along_axis(ingredient_lists, indices, axis=1).astype(np.intp)
+    indices[counts == 0] = 0
+    return indices, counts
+
+
+def to_dense(
+    indices: NDArray[np.integer], counts: NDArray[np.integer]
+) -> NDArray[np.intp]:
+    """Convert ingredient indices and counts back to ingredient counts.
+
+    Args:
+        indices: Ingredient indices of one recipe, or a matrix of ingredient
+            indices (one recipe per row)
+        counts: Count of each ingredient index
+
+    Returns:
+        Ingredient counts of the recipe, or a matrix of ingredient counts (one
+        recipe per row)
+    """
+    indices, counts = np.asarray(indices), np.asarray(counts)
+    ingredient_lists = np.zeros(
+        (*indices.shape[:-1], len(ingredient_data)), dtype=np.intp
+    )
+    if indices.ndim == 1:
+        np.add.at(ingredient_lists, indices, counts)
+    else:
+        rows = np.broadcast_to(np.arange(len(indices))[:, np.newaxis], indices.shape)
+        np.add.at(ingredient_lists, (rows, indices), counts)
+    return ingredient_lists
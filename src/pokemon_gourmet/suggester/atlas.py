@@ -0,0 +1,339 @@
+__all__ = [
+    "build_atlas",
+    "iter_target_combinations",
+    "search_params",
+    "target_key",
+    "TargetAtlas",
+]
+
+import json
+from itertools import combinations, product
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Power, Type
+from pokemon_gourmet.sandwich.batch import REWARD_GROWTH_FACTOR
+from pokemon_gourmet.sandwich.effect import EffectList
+from pokemon_gourmet.sandwich.recipe import MAX_CONDIMENTS, MAX_FILLINGS
+from pokemon_gourmet.suggester.exceptions import InvalidEffects
+from pokemon_gourmet.suggester.generator import (
+    CouldBeTarget,
+    RecipeGenerator,
+    parse_targets,
+    validate_targets,
+)
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+
+ATLAS_VERSION = 2
+# Marks the unused slots of a recipe's ingredient indices
+EMPTY_SLOT = np.iinfo(np.uint8).max
+RECIPE_WIDTH = MAX_FILLINGS + MAX_CONDIMENTS
+# Number of Power-Type codes (plus one for a missing target)
+NUM_CODES = len(Power) * (len(Type) + 1) + 1
+
+
+def target_key(targets: EffectList) -> int:
+    """Return an integer identifying a combination of targets regardless of
+    their order.
+
+    Each target is encoded as a number from its Power and Type (if any) and
+    the sorted codes are packed in base `NUM_CODES`.
+    """
+    codes = sorted(
+        1
+        + effect.power_idx * (len(Type) + 1)
+        + (0 if effect.pokemon_type_idx is None else effect.pokemon_type_idx + 1)
+        for effect in targets
+    )
+    key = 0
+    for code in codes:
+        key = key * NUM_CODES + code
+    return key
+
+
+def iter_target_combinations(max_targets: int = 3) -> Iterator[EffectList]:
+    """Yield every valid combination of (up to three) target effects once.
+
+    Args:
+        max_targets: Maximum number of targets in a combination
+
+    Yields:
+        Effect list that passes
+        `pokemon_gourmet.suggester.generator.validate_targets`
+    """
+    for num_targets in range(1, max_targets + 1):
+        for powers in combinations(Power, num_targets):
+            type_choices = [
+                [None] if power == Power.EGG else list(Type) for power in powers
+            ]
+            for types in product(*type_choices):
+                targets = parse_targets(zip(powers, types))
+                try:
+                    validate_targets(targets)
+                except InvalidEffects:
+                    continue
+                yield targets
+
+
+def search_params(
+    engine: str = "mcts",
+    max_fillings: int = MAX_FILLINGS,
+    max_condiments: int = MAX_CONDIMENTS,
+    min_level: int = 1,
+) -> dict[str, Any]:
+    """Return the parameters of a search that determine which recipes it
+    finds, as stored in an atlas.
+
+    Args:
+        engine: Search engine (see
+            `pokemon_gourmet.suggester.generator.RecipeGenerator`)
+        max_fillings: Maximum number of fillings to include in recipe
+        max_condiments: Maximum number of condiments to include in recipe
+            (exact solvers only)
+        min_level: Minimum (average) Level of the target effects (exact
+            solvers only)
+
+    Returns:
+        Parameters keyed by name
+    """
+    return dict(
+        engine=engine,
+        max_fillings=max_fillings,
+        max_condiments=max_condiments,
+        min_level=min_level,
+    )
+
+
+class TargetAtlas:
+    """An index of precomputed recipes for combinations of target effects.
+
+    Recipes are stored as rows of (up to ten) ingredient indices, grouped by
+    target combination. Combinations are identified by `target_key` and kept
+    sorted, so a lookup is a binary search.
+
+    The parameters of the search that found the recipes are stored alongside
+    them (see `search_params`). Recipes are only the best ones for these
+    parameters, so a query with other limits should search instead.
+
+    Args:
+        keys: Sorted keys of the target combinations
+        offsets: Position of the first recipe of each target combination (plus
+            the total number of recipes)
+        recipes: Ingredient indices of each recipe (padded with `EMPTY_SLOT`)
+        params: Parameters of the search that found the recipes (if known)
+    """
+
+    def __init__(
+        self,
+        keys: Optional[NDArray[np.int64]] = None,
+        offsets: Optional[NDArray[np.int64]] = None,
+        recipes: Optional[NDArray[np.uint8]] = None,
+        params: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.keys = np.zeros(0, dtype=np.int64) if keys is None else keys
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+        if recipes is None:
+            recipes = np.zeros((0, RECIPE_WIDTH), dtype=np.uint8)
+        self.recipes = recipes
+        self.params = params
+
+    def __contains__(self, targets: Iterable[CouldBeTarget]) -> bool:
+        return self._find(parse_targets(targets)) is not None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({len(self)} target combinations, "
+            f"{len(self.recipes)} recipes)"
+        )
+
+    def _find(self, targets: EffectList) -> Optional[int]:
+        key = target_key(targets)
+        i = np.searchsorted(self.keys, key).item()
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def lookup(
+        self,
+        targets: Iterable[CouldBeTarget],
+        max_fillings: int = MAX_FILLINGS,
+        max_condiments: int = MAX_CONDIMENTS,
+        min_level: int = 1,
+    ) -> Optional[list[RecipeState]]:
+        """Return the precomputed recipes for some target effects.
+
+        Recipes exceeding the given limits are left out.
+
+        Args:
+            targets: Desired effects on the sandwich recipes
+            max_fillings: Maximum number of fillings to include in recipe
+            max_condiments: Maximum number of condiments to include in recipe
+            min_level: Minimum (average) Level of the target effects
+
+        Returns:
+            List of finished recipe states, or None if the combination of
+            targets is not in the atlas
+        """
+        targets = parse_targets(targets)
+        i = self._find(targets)
+        if i is None:
+            return None
+        min_reward = (
+            0 if min_level == 1 else 2 ** (REWARD_GROWTH_FACTOR * (min_level - 1))
+        )
+        states = []
+        for row in self.recipes[self.offsets[i] : self.offsets[i + 1]]:
+            state = RecipeState(targets, max_fillings=max_fillings)
+            for ingredient in row[row != EMPTY_SLOT].tolist():
+                state.add_ingredient(ingredient)
+            state.is_finished = True
+            if (
+                state.num_fillings <= max_fillings
+                and state.num_condiments <= max_condiments
+                and state.reward >= min_reward
+            ):
+                states.append(state)
+        return states
+
+    def update(self, entries: dict[int, list[RecipeState]]) -> None:
+        """Add (or replace) the recipes of some target combinations.
+
+        Args:
+            entries: Recipe states keyed by `target_key`
+        """
+        groups = {
+            key.item(): self.recipes[start:stop]
+            for key, start, stop in zip(self.keys, self.offsets[:-1], self.offsets[1:])
+        }
+        for key, states in entries.items():
+            rows = np.full((len(states), RECIPE_WIDTH), EMPTY_SLOT, dtype=np.uint8)
+            for row, state in zip(rows, states):
+                ingredients = np.repeat(
+                    np.arange(len(state._ingredient_list)), state._ingredient_list
+                )
+                row[: len(ingredients)] = ingredients
+            groups[key] = rows
+        self.keys = np.array(sorted(groups), dtype=np.int64)
+        sizes = [len(groups[key]) for key in self.keys.tolist()]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.recipes = np.concatenate(
+            [groups[key] for key in self.keys.tolist()]
+            or [np.zeros((0, RECIPE_WIDTH), dtype=np.uint8)]
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TargetAtlas":
+        """Load an atlas from a NumPy archive.
+
+        Raises:
+            ValueError: If the archive was written by an incompatible version
+        """
+        with np.load(path) as data:
+            if data["version"].item() != ATLAS_VERSION:
+                raise ValueError(f"Unsupported atlas version in '{path}'.")
+            params = json.loads(data["params"].item())
+            return cls(data["keys"], data["offsets"], data["recipes"], params)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Save this atlas to a compressed NumPy archive."""
+        with open(path, "wb") as file:
+            np.savez_compressed(
+                file,
+                version=np.array(ATLAS_VERSION),
+                keys=self.keys,
+                offsets=self.offsets,
+                recipes=self.recipes,
+                params=np.array(json.dumps(self.params)),
+            )
+
+
+def build_atlas(
+    path: Union[str, Path],
+    target_combinations: Optional[Iterable[Iterable[CouldBeTarget]]] = None,
+    top_k: int = 10,
+    num_iter: int = 10,
+    max_fillings: int = MAX_FILLINGS,
+    engine: str = "mcts",
+    checkpoint_every: int = 100,
+    **engine_kwargs: Any,
+) -> TargetAtlas:
+    """Search recipes for every combination of targets and save the best ones
+    to an atlas.
+
+    If the atlas already exists, the combinations it contains are skipped, so
+    an interrupted build can be resumed. The search parameters are saved in
+    the atlas (see `search_params`).
+
+    Args:
+        path: Path of the atlas
+        target_combinations: Combinations of target effects to search (by
+            default, every valid combination)
+        top_k: Maximum number of recipes kept per combination
+        num_iter: Number of search iterations per combination
+        max_fillings: Maximum number of fillings to include in recipe
+        engine: Search engine (see
+            `pokemon_gourmet.suggester.generator.RecipeGenerator`)
+        checkpoint_every: Number of combinations searched between saves
+        engine_kwargs: Keyword arguments passed to the search engine
+
+    Returns:
+        Updated atlas
+
+    Raises:
+        ValueError: If the atlas exists and was built with other search
+            parameters
+    """
+    path = Path(path)
+    params = search_params(
+        engine,
+        max_fillings,
+        engine_kwargs.get("max_condiments", MAX_CONDIMENTS),
+        engine_kwargs.get("min_level", 1),
+    )
+    atlas = TargetAtlas.load(path) if path.exists() else TargetAtlas(params=params)
+    if atlas.params != params:
+        raise ValueError(
+            f"Atlas '{path}' was built with other search parameters "
+            f"({atlas.params})."
+        )
+    if target_combinations is None:
+        target_combinations = iter_target_combinations()
+
+    entries: dict[int, list[RecipeState]] = {}
+    for targets in target_combinations:
+        targets = parse_targets(targets)
+        key = target_key(targets)
+        if key in entries or atlas._find(targets) is not None:
+            continue
+        recipe_gen = RecipeGenerator(
+            targets,
+            num_iter,
+            max_fillings=max_fillings,
+            engine=engine,
+            **engine_kwargs,
+        )
+        states = set()
+        for recipes in recipe_gen:
+            states.update(recipes)
+        entries[key] = sorted(
+            states,
+            key=lambda state: (
+                -state.reward,
+                state.num_fillings,
+                state.total_pieces,
+                state.num_condiments,
+            ),
+        )[:top_k]
+        if len(entries) >= checkpoint_every:
+            atlas.update(entries)
+            atlas.save(path)
+            entries = {}
+    atlas.update(entries)
+    atlas.save(path)
+    return atlas
@@ -4,18 +4,21 @@ import inspect
 from functools import partial
 from math import sqrt
 from pathlib import Path
+from typing import Optional
 
 import click
 import numpy as np
-import pandas as pd
 
 from pokemon_gourmet.enums import Power, Type
 from pokemon_gourmet.sandwich.effect import EffectTuple
 from pokemon_gourmet.sandwich.recipe import MAX_CONDIMENTS, MAX_FILLINGS
-from pokemon_gourmet.suggester.generator import RecipeGenerator
 from pokemon_gourmet.suggester.mcts import policies as p
 from pokemon_gourmet.suggester.mcts.state import RecipeState
 
+# Search engines: MCTS and the exact solvers of
+# `pokemon_gourmet.suggester.solvers.SOLVERS` (only imported to search)
+ENGINES = ["mcts", "branch_and_bound", "exhaustive", "meet_in_the_middle"]
+
 
 def parse_targets(targets_str: tuple[str, ...]) -> list[EffectTuple]:
     """Parse and validate a string of target effects.
@@ -53,6 +56,16 @@ def parse_targets(targets_str: tuple[str, ...]) -> list[EffectTuple]:
     return targets
 
 
+def get_max_fillings(engine: str, max_fillings: Optional[int]) -> int:
+    """Return the maximum number of fillings, defaulting to the largest one
+    that the search engine handles with its default settings."""
+    from pokemon_gourmet.suggester.solvers import SOLVERS
+
+    if max_fillings is not None:
+        return max_fillings
+    return MAX_FILLINGS if engine == "mcts" else SOLVERS[engine].default_max_fillings
+
+
 def parse_rollout_policy(func_name: str, ctxt_args: list[str]) -> p.RolloutPolicy:
     """Parse rollout policy and its corresponding keyword arguments from
     click's context."""
@@ -108,6 +121,54 @@ def parse_rollout_policy(func_name: str, ctxt_args: list[str]) -> p.RolloutPolic
     type=int,
     help="Maximum time (in ms) to select an ingredient",
 )
+@click.option(
+    "-e",
+    "--engine",
+    default="mcts",
+    type=click.Choice(ENGINES),
+    help="Search engine (exact solvers are only practical for small recipes)",
+)
+@click.option(
+    "--max-fillings",
+    type=int,
+    help=(
+        "Maximum number of fillings to include in recipe (default: "
+        f"{MAX_FILLINGS} for MCTS, fewer for some exact solvers)"
+    ),
+)
+@click.option(
+    "--max-condiments",
+    default=MAX_CONDIMENTS,
+    type=int,
+    help="Maximum number of condiments to include in recipe (exact solvers only)",
+)
+@click.option(
+    "--min-level",
+    default=1,
+    type=click.IntRange(1, 3),
+    help="Minimum Level of the target effects (exact solvers only)",
+)
+@click.option(
+    "--prune-actions",
+    is_flag=True,
+    help="Only explore ingredients relevant to the target effects (MCTS only)",
+)
+@click.option(
+    "--transpositions",
+    is_flag=True,
+    help="Share statistics between identical recipes (MCTS only)",
+)
+@click.option(
+    "--array-tree",
+    is_flag=True,
+    help="Store the search tree in arrays to save memory (MCTS only)",
+)
+@click.option(
+    "--atlas",
+    "atlas_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Atlas of precomputed recipes to look up before searching",
+)
 @click.pass_context
 def main(
     ctxt: click.Context,
@@ -116,61 +177,210 @@ def main(
     rollout_policy: str,
     exploration_constant: float,
     max_walltime: int,
+    engine: str,
+    max_fillings: Optional[int],
+    max_condiments: int,
+    min_level: int,
+    prune_actions: bool,
+    transpositions: bool,
+    array_tree: bool,
+    atlas_path: Optional[Path],
 ):
+    if array_tree and transpositions:
+        raise click.BadOptionUsage(
+            "array_tree", "--array-tree cannot be combined with --transpositions."
+        )
     targets = parse_targets(targets_str)
-    rollout_policy_func = parse_rollout_policy(rollout_policy, ctxt.args)
+    max_fillings = get_max_fillings(engine, max_fillings)
 
-    print("Looking for sandwiches, please wait…\n")
-    mcts_kwargs = dict(
-        rollout_policy=rollout_policy_func,
-        exploration_constant=exploration_constant / sqrt(2),
-        max_walltime=max_walltime,
+    # Only needed to search and rank recipes, and slow to import
+    from pokemon_gourmet.sandwich.batch import RecipeBatch
+    from pokemon_gourmet.suggester.generator import RecipeGenerator
+    from pokemon_gourmet.suggester.generator import (
+        parse_targets as parse_target_effects,
     )
-    recipe_gen = RecipeGenerator(targets, num_iter, **mcts_kwargs)
 
     unique_recipes: set[RecipeState] = set()
-    for recipes in recipe_gen:
-        if not recipes:
-            continue
-        unique_recipes.update(recipes)
+    if atlas_path is not None:
+        from pokemon_gourmet.suggester.atlas import TargetAtlas, search_params
 
+        atlas = TargetAtlas.load(atlas_path)
+        params = search_params(engine, max_fillings, max_condiments, min_level)
+        # Recipes of an atlas are the best ones for its own search parameters
+        if atlas.params != params:
+            print(f"Atlas was built with other search parameters ({atlas.params}).")
+        else:
+            recipes = atlas.lookup(targets, max_fillings, max_condiments, min_level)
+            if recipes is not None:
+                unique_recipes.update(recipes)
+            else:
+                print("Target effects not found in atlas.")
+    if not unique_recipes:
+        print("Looking for sandwiches, please wait…\n")
+        if engine == "mcts":
+            engine_kwargs = dict(
+                rollout_policy=parse_rollout_policy(rollout_policy, ctxt.args),
+                exploration_constant=exploration_constant / sqrt(2),
+                max_walltime=max_walltime,
+                prune_actions=prune_actions,
+                array_tree=array_tree,
+            )
+            if transpositions:
+                engine_kwargs["transpositions"] = True
+        else:
+            engine_kwargs = dict(max_condiments=max_condiments, min_level=min_level)
+        try:
+            recipe_gen = RecipeGenerator(
+                targets,
+                num_iter,
+                max_fillings=max_fillings,
+                engine=engine,
+                **engine_kwargs,
+            )
+            for recipes in recipe_gen:
+                if not recipes:
+                    continue
+                unique_recipes.update(recipes)
+        except ValueError as e:
+            # Exact solvers reject searches too large for their budget
+            raise click.ClickException(
+                f"{e} Use --max-fillings, --max-condiments, or --min-level to "
+                "change the search limits."
+            ) from e
+
+    # Best recipes first (highest score, then fewest fillings, pieces, and
+    # condiments)
+    target_effects = parse_target_effects(targets)
+    batch = RecipeBatch.from_recipes(unique_recipes).unique()
+    batch = batch[batch.rank(target_effects)]
     rows = []
-    for recipe in unique_recipes:
-        condiments = recipe.condiments
-        fillings = recipe.fillings
-        effects = recipe.effects.tuples
+    for effects, fillings, condiments in zip(
+        batch.effect_lists, batch.fillings, batch.condiments
+    ):
         rows.append(
             (
-                *effects,
+                *effects.tuples,
                 *fillings,
-                *[""] * (recipe.max_fillings - len(fillings)),
+                *[""] * (MAX_FILLINGS - len(fillings)),
                 *condiments,
-                *[""] * (recipe.max_condiments - len(condiments)),
-                recipe.reward,
-                -len(fillings),
-                -len(condiments),
-                -recipe.total_pieces,
+                *[""] * (MAX_CONDIMENTS - len(condiments)),
             )
         )
 
+    # Only needed to write the results, and slow to import
+    import pandas as pd
+
     save_path = Path.cwd() / "recipes.csv"
-    sorting_columns = ["score", "num_fillings", "total_pieces", "num_condiments"]
     df = pd.DataFrame(
         rows,
         columns=[
             *[f"effect{i + 1}" for i in range(3)],
             *[f"filling{i + 1}" for i in range(MAX_FILLINGS)],
             *[f"condiment{i + 1}" for i in range(MAX_CONDIMENTS)],
-            *sorting_columns,
         ],
-    ).sort_values(sorting_columns, ascending=False)
-    df["score"] = np.round(df["score"], 3)
-    df.drop(sorting_columns[1:], axis=1, inplace=True)
+    )
+    df["score"] = np.round(batch.rewards(target_effects), 3)
     df.to_csv(save_path, index=False)
 
     s = "s" if len(df) != 1 else ""
     print(f"Found {len(df)} recipe{s}!\nSaved results to: {save_path}")
 
 
+@click.command()
+@click.argument("atlas_path", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "--max-targets",
+    default=3,
+    type=click.IntRange(1, 3),
+    help="Maximum number of target effects per combination",
+)
+@click.option(
+    "-k",
+    "--top-k",
+    default=10,
+    type=int,
+    help="Maximum number of recipes saved per combination",
+)
+@click.option(
+    "-n",
+    "--num-iter",
+    default=10,
+    type=int,
+    help="Number of times to explore the search tree",
+)
+@click.option(
+    "-e",
+    "--engine",
+    default="mcts",
+    type=click.Choice(ENGINES),
+    help="Search engine (exact solvers are only practical for small recipes)",
+)
+@click.option(
+    "--max-fillings",
+    type=int,
+    help=(
+        "Maximum number of fillings to include in recipe (default: "
+        f"{MAX_FILLINGS} for MCTS, fewer for some exact solvers)"
+    ),
+)
+@click.option(
+    "--max-condiments",
+    default=MAX_CONDIMENTS,
+    type=int,
+    help="Maximum number of condiments to include in recipe (exact solvers only)",
+)
+def build_atlas_main(
+    atlas_path: Path,
+    max_targets: int,
+    top_k: int,
+    num_iter: int,
+    engine: str,
+    max_fillings: Optional[int],
+    max_condiments: int,
+):
+    """Search recipes for every valid combination of target effects and save
+    them to an atlas (resuming the build if the atlas exists)."""
+    from pokemon_gourmet.suggester.atlas import (
+        build_atlas,
+        iter_target_combinations,
+    )
+
+    engine_kwargs = {} if engine == "mcts" else dict(max_condiments=max_condiments)
+    try:
+        atlas = build_atlas(
+            atlas_path,
+            iter_target_combinations(max_targets),
+            top_k=top_k,
+            num_iter=num_iter,
+            max_fillings=get_max_fillings(engine, max_fillings),
+            engine=engine,
+            **engine_kwargs,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    print(f"Saved {atlas} to: {atlas_path}")
+
+
+@click.command()
+@click.argument("database_path", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "-k",
+    "--max-ingredients",
+    default=4,
+    type=click.IntRange(2),
+    help="Maximum number of ingredients per recipe (at most six)",
+)
+def build_effect_database_main(database_path: Path, max_ingredients: int):
+    """Compute the effects of every legal recipe with up to some number of
+    ingredients and save them to a memory-mapped database."""
+    from pokemon_gourmet.sandwich.effect_database import build_effect_database
+
+    try:
+        database = build_effect_database(database_path, max_ingredients)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--max-ingredients'") from e
+    print(f"Saved {len(database)} recipes to: {database_path}")
+
+
 if __name__ == "__main__":
     main()
@@ -9,6 +9,8 @@ from pokemon_gourmet.sandwich.recipe import MAX_FILLINGS
 from pokemon_gourmet.suggester.exceptions import InvalidEffects
 from pokemon_gourmet.suggester.mcts.search import MonteCarloTreeSearch
 from pokemon_gourmet.suggester.mcts.state import RecipeManager, RecipeState
+from pokemon_gourmet.suggester.mcts.tree import ArrayMonteCarloTreeSearch
+from pokemon_gourmet.suggester.solvers import SOLVERS
 
 CouldBeTarget = Union[Effect, EffectTuple, Iterable[str]]
 
@@ -28,6 +30,8 @@ def parse_targets(putative_targets: Iterable[CouldBeTarget]) -> EffectList:
     """
     targets = []
     for effect in putative_targets:
+        if isinstance(effect, Effect):
+            effect = (effect.power, effect.pokemon_type)
         power, type_, *_ = effect
         if isinstance(power, str):
             power = Power[power.upper()]
@@ -77,20 +81,30 @@ def validate_targets(targets: EffectList) -> None:
             "Sparkling Power is required for all Powers to share Type."
         )
     if any(
-        effect.pokemon_type is None for effect in targets if effect.power == Power.EGG
+        effect.pokemon_type is None for effect in targets if effect.power != Power.EGG
     ):
         raise InvalidEffects("No effect (other than Egg Power) should be typeless.")
 
 
 class RecipeGenerator(Iterator[list[RecipeState]]):
-    """Use Monte Carlo tree search to explore ingredient combinations and
-    generate recipes that match the target effects.
+    """Use Monte Carlo tree search (or an exact solver) to explore ingredient
+    combinations and generate recipes that match the target effects.
 
     Args:
         targets: Desired effects on the output sandwich recipes
         num_iter: Number of times to explore the search tree
         min_fillings: Minimum number of fillings to include in recipe
         max_fillings: Maximum number of fillings to include in recipe
+        engine:
+            Search engine, either `mcts` or the name of a solver from
+            `pokemon_gourmet.suggester.solvers.SOLVERS`. Solvers are exact, so
+            they generate all their recipes in the first iteration.
+        prune_actions: Whether to restrict the ingredients explored by Monte
+            Carlo tree search to those relevant to the targets
+        array_tree: Whether Monte Carlo tree search stores its tree in arrays
+            (see `pokemon_gourmet.suggester.mcts.tree`) rather than as node
+            objects
+        engine_kwargs: Keyword arguments passed to the search engine
     """
 
     def __init__(
@@ -99,20 +113,41 @@ class RecipeGenerator(Iterator[list[RecipeState]]):
         num_iter: int,
         min_fillings: int = 1,
         max_fillings: int = MAX_FILLINGS,
-        **mcts_kwargs: Any,
+        engine: str = "mcts",
+        prune_actions: bool = False,
+        array_tree: bool = False,
+        **engine_kwargs: Any,
     ) -> None:
         self.targets = parse_targets(targets)
         validate_targets(self.targets)
         self.it = 0
         self.num_iter = num_iter
-        self.mcts_kwargs = mcts_kwargs
-        initial_state = RecipeState(self.targets, min_fillings, max_fillings)
-        self.mcts = MonteCarloTreeSearch(
-            initial_state, RecipeManager(), **self.mcts_kwargs
+        self.engine_kwargs = engine_kwargs
+        initial_state = RecipeState(
+            self.targets, min_fillings, max_fillings, prune_actions=prune_actions
         )
+        self.mcts = None
+        self.array_mcts = None
+        self.solver = None
+        if engine == "mcts" and array_tree:
+            self.array_mcts = ArrayMonteCarloTreeSearch(
+                initial_state, RecipeManager(), **self.engine_kwargs
+            )
+        elif engine == "mcts":
+            self.mcts = MonteCarloTreeSearch(
+                initial_state, RecipeManager(), **self.engine_kwargs
+            )
+        elif engine in SOLVERS:
+            self.solver = SOLVERS[engine](initial_state, **self.engine_kwargs)
+        else:
+            raise ValueError(
+                f"Unexpected search engine ('{engine}'). "
+                f"Available engines: mcts, {', '.join(SOLVERS)}."
+            )
         self.saved_results = set()
 
     def _search(self) -> None:
+        assert self.mcts is not None
         node = self.mcts.root
         if node._num_visits > 0:
             node.reset_node()
@@ -121,17 +156,45 @@ class RecipeGenerator(Iterator[list[RecipeState]]):
             assert node.parent_action is not None
             node.state.move(node.parent_action)
 
+    def _search_array(self) -> list[RecipeState]:
+        assert self.array_mcts is not None
+        tree = self.array_mcts.tree
+        node = self.array_mcts.root
+        if tree.num_visits[node] > 0:
+            tree.reset()
+        while not tree.is_terminal[node]:
+            node = self.array_mcts.search(node)
+        # Filter recipes (a recipe state evaluates to True if it's a match)
+        states = map(self.array_mcts.get_state, tree.get_leaves())
+        return [state for state in states if state]
+
     def __next__(self) -> list[RecipeState]:
         if self.it >= self.num_iter:
             raise StopIteration
         self.it += 1
-        self._search()
-        # Filter recipes (a recipe state evaluates to True if it's a match)
-        states = [
-            node.state
-            for node in self.mcts.root.get_leaves(attrgetter("state"))
-            if node.state not in self.saved_results
-        ]
+        if self.solver is not None:
+            if self.it > 1:
+                raise StopIteration  # An exact solver finds every recipe at once
+            states = [
+                state
+                for state in self.solver.solve()
+                if state not in self.saved_results
+            ]
+        elif self.array_mcts is not None:
+            states = [
+                state
+                for state in self._search_array()
+                if state not in self.saved_results
+            ]
+        else:
+            self._search()
+            assert self.mcts is not None
+            # Filter recipes (a recipe state evaluates to True if it's a match)
+            states = [
+                node.state
+                for node in self.mcts.root.get_leaves(attrgetter("state"))
+                if node.state not in self.saved_results
+            ]
         self.saved_results.update(states)
         return cast(list[RecipeState], states)
 
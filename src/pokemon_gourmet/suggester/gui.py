@@ -6,17 +6,13 @@ from math import sqrt
 from numbers import Number
 from pathlib import Path
 from time import time
-from typing import Callable, Optional, cast
+from typing import TYPE_CHECKING, Callable, Optional, cast
 
 import numpy as np
-import pandas as pd
 import streamlit as st
-from griffe.dataclasses import Docstring
-from griffe.docstrings.dataclasses import DocstringSectionParameters
-from griffe.docstrings.parsers import Parser
-from pandas.io.formats.style_render import CSSStyles
 
 from pokemon_gourmet.enums import Power, Type
+from pokemon_gourmet.sandwich.batch import RecipeBatch
 from pokemon_gourmet.sandwich.effect import Effect, EffectList, EffectTuple
 from pokemon_gourmet.sandwich.recipe import MAX_CONDIMENTS, MAX_FILLINGS
 from pokemon_gourmet.suggester import exceptions as e
@@ -24,6 +20,9 @@ from pokemon_gourmet.suggester.generator import RecipeGenerator
 from pokemon_gourmet.suggester.mcts import policies as p
 from pokemon_gourmet.suggester.mcts.state import RecipeState
 
+if TYPE_CHECKING:
+    from pandas.io.formats.style_render import CSSStyles
+
 POWERS = [""] + Power._member_names_
 TYPES = [""] + Type._member_names_
 TYPE_COLORS = {
@@ -47,7 +46,7 @@ TYPE_COLORS = {
     Type.FAIRY: (240, 118, 220),
 }
 
-TABLE_STYLES = cast(CSSStyles, [dict(selector="", props=[("width", "100%")])])
+TABLE_STYLES = cast("CSSStyles", [dict(selector="", props=[("width", "100%")])])
 
 
 def get_target_attr(attr_name: str) -> list[str]:
@@ -85,6 +84,9 @@ def slugify_rollout_policy_name(func_name: Optional[str]) -> str:
 
 def change_rollout_policy_desc() -> None:
     """Change the caption describing what each rollout policy does."""
+    from griffe.dataclasses import Docstring
+    from griffe.docstrings.parsers import Parser
+
     key = slugify_rollout_policy_name(st.session_state.rollout_policy)
     doc = p.ROLLOUT_POLICIES[key].__doc__
     if doc is not None:
@@ -106,6 +108,12 @@ def get_rollout_policy_func(func_name: Optional[str]) -> p.RolloutPolicy:
         # A rollout policy that takes additional parameters
         func_doc = func.__doc__
         if func_doc is not None:
+            from griffe.dataclasses import Docstring
+            from griffe.docstrings.dataclasses import (
+                DocstringSectionParameters,
+            )
+            from griffe.docstrings.parsers import Parser
+
             func_doc = Docstring(func_doc, parser=Parser.google)
             param_docs = []
             for section in func_doc.parsed:
@@ -368,45 +376,31 @@ def main() -> None:
                 else:
                     recipes.extend(new_recipes)
 
-                rows = []
-                for i, recipe in enumerate(recipes):
-                    if i == num_results:
-                        break
-
-                    effects_html = style_effects(recipe.effects)
-                    ingredients_html = style_ingredients(
-                        recipe.condiments, recipe.fillings
+                # Best recipes first (highest score, then fewest fillings,
+                # pieces, and condiments)
+                batch = RecipeBatch.from_recipes(recipes).unique()
+                batch = batch[batch.rank(recipe_gen.targets)[:num_results]]
+                rows = [
+                    (
+                        style_effects(effects),
+                        style_ingredients(condiments, fillings),
+                        reward,
                     )
-                    rows.append(
-                        (
-                            effects_html,
-                            ingredients_html,
-                            recipe.reward,
-                            -recipe.num_fillings,
-                            -recipe.total_pieces,
-                            -recipe.num_condiments,
-                        )
+                    for effects, condiments, fillings, reward in zip(
+                        batch.effect_lists,
+                        batch.condiments,
+                        batch.fillings,
+                        batch.rewards(recipe_gen.targets),
                     )
+                ]
 
-                df = pd.DataFrame(
-                    rows,
-                    columns=[
-                        "Effects",
-                        "Ingredients",
-                        "Score",
-                        "Fillings",
-                        "Pieces",
-                        "Condiments",
-                    ],
-                ).sort_values(
-                    ["Score", "Fillings", "Pieces", "Condiments"], ascending=False
-                )
-                df.reset_index(drop=True, inplace=True)
+                import pandas as pd
+
+                df = pd.DataFrame(rows, columns=["Effects", "Ingredients", "Score"])
                 df.index += 1
                 df_html = (
                     df.style.set_table_styles(TABLE_STYLES)
                     .format(precision=3)
-                    .hide(["Condiments", "Fillings", "Pieces"], axis="columns")
                     .to_html()
                 )
                 num_recipes = len(recipes)
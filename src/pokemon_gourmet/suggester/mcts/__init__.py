@@ -1,22 +1,30 @@
 __all__ = [
     "Action",
+    "ArrayMonteCarloTreeSearch",
+    "FINISH_ID",
     "FinishSandwich",
     "MonteCarloTreeSearch",
+    "NUM_ACTIONS",
     "ROLLOUT_POLICIES",
     "RecipeState",
     "SelectCondiment",
     "SelectFilling",
     "SelectBaseRecipe",
     "State",
+    "TreeStore",
+    "action_table",
     "recipe_manager",
 ]
 
 from pokemon_gourmet.suggester.mcts.action import (
+    FINISH_ID,
+    NUM_ACTIONS,
     Action,
     FinishSandwich,
     SelectBaseRecipe,
     SelectCondiment,
     SelectFilling,
+    action_table,
 )
 from pokemon_gourmet.suggester.mcts.policies import ROLLOUT_POLICIES
 from pokemon_gourmet.suggester.mcts.search import MonteCarloTreeSearch
@@ -25,3 +33,7 @@ from pokemon_gourmet.suggester.mcts.state import (
     State,
     recipe_manager,
 )
+from pokemon_gourmet.suggester.mcts.tree import (
+    ArrayMonteCarloTreeSearch,
+    TreeStore,
+)
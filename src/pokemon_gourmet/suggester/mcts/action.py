@@ -1,21 +1,35 @@
 __all__ = [
     "Action",
+    "BASE_RECIPE_OFFSET",
+    "FINISH_ID",
     "FinishSandwich",
+    "NUM_ACTIONS",
     "SelectBaseRecipe",
     "SelectCondiment",
     "SelectFilling",
+    "action_table",
 ]
 
 from abc import ABCMeta, abstractmethod
 from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
 
 from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.singleton import Singleton
 
 if TYPE_CHECKING:
     from pokemon_gourmet.suggester.mcts.state import RecipeState, State
 
+# Actions are encoded as integers: ingredient selections by the index of the
+# ingredient, followed by the action to finish a recipe, followed by base
+# recipes by the indices of their condiment and filling
+FINISH_ID = len(ingredient_data)
+BASE_RECIPE_OFFSET = FINISH_ID + 1
+NUM_ACTIONS = BASE_RECIPE_OFFSET + len(ingredient_data) ** 2
+
 
 class Action(metaclass=ABCMeta):
     """A trigger for a state transition"""
@@ -28,6 +42,15 @@ class Action(metaclass=ABCMeta):
     def __hash__(self) -> int:
         ...
 
+    @property
+    @abstractmethod
+    def action_id(self) -> int:
+        """Integer encoding of this action"""
+
+    def undo(self, state: "State") -> None:
+        """Revert the state transition triggered by this action."""
+        raise NotImplementedError
+
 
 class FinishSandwich(Action):
     """Finalize a recipe"""
@@ -35,6 +58,13 @@ class FinishSandwich(Action):
     def __call__(self, state: "RecipeState") -> None:
         state.is_finished = True
 
+    def undo(self, state: "RecipeState") -> None:
+        state.is_finished = False
+
+    @property
+    def action_id(self) -> int:
+        return FINISH_ID
+
     def __eq__(self, other: "FinishSandwich") -> bool:
         return self.__class__ == other.__class__
 
@@ -56,6 +86,18 @@ class SelectBaseRecipe(Action, Iterable):
         for ingredient_idx in self:
             state.add_ingredient(ingredient_idx)
 
+    def undo(self, state: "RecipeState") -> None:
+        for ingredient_idx in self:
+            state.remove_ingredient(ingredient_idx)
+
+    @property
+    def action_id(self) -> int:
+        return (
+            BASE_RECIPE_OFFSET
+            + self.condiment_idx * len(ingredient_data)
+            + self.filling_idx
+        )
+
     def __eq__(self, other: "SelectBaseRecipe") -> bool:
         return (
             self.__class__ == other.__class__
@@ -81,6 +123,13 @@ class SelectIngredient(Action):
     def __call__(self, state: "RecipeState") -> None:
         state.add_ingredient(self.ingredient_idx)
 
+    def undo(self, state: "RecipeState") -> None:
+        state.remove_ingredient(self.ingredient_idx)
+
+    @property
+    def action_id(self) -> int:
+        return self.ingredient_idx
+
     def __eq__(self, other: "SelectIngredient") -> bool:
         return (
             self.__class__ == other.__class__
@@ -106,3 +155,53 @@ class SelectFilling(SelectIngredient):
 
     def __repr__(self) -> str:
         return super().__repr__()
+
+
+class ActionTable(metaclass=Singleton):
+    """Interned actions, built once from the ingredient data.
+
+    Actions are immutable, so every state shares the same instances instead
+    of creating new ones each time its possible actions are listed. Entries
+    are indexed by ingredient index and are None where the ingredient is not
+    of the right kind (e.g., `select_filling` of a condiment).
+
+    Indexing the table with an action ID returns the action it encodes.
+    """
+
+    def __init__(self) -> None:
+        is_condiment = ingredient_data.is_condiment.tolist()
+        is_filling = ingredient_data.is_filling.tolist()
+        self.finish = FinishSandwich()
+        self.select_condiment: tuple[Optional[SelectCondiment], ...] = tuple(
+            SelectCondiment(i) if is_condiment[i] else None
+            for i in range(len(ingredient_data))
+        )
+        self.select_filling: tuple[Optional[SelectFilling], ...] = tuple(
+            SelectFilling(i) if is_filling[i] else None
+            for i in range(len(ingredient_data))
+        )
+        # Indexed by condiment index, then by filling index
+        self.select_base_recipe: list[list[Optional[SelectBaseRecipe]]] = [
+            [None] * len(ingredient_data) for _ in range(len(ingredient_data))
+        ]
+        for c in np.flatnonzero(ingredient_data.is_condiment).tolist():
+            for f in np.flatnonzero(ingredient_data.is_filling).tolist():
+                self.select_base_recipe[c][f] = SelectBaseRecipe(c, f)
+
+        self.actions: list[Optional[Action]] = [None] * NUM_ACTIONS
+        for i in range(len(ingredient_data)):
+            self.actions[i] = self.select_condiment[i] or self.select_filling[i]
+        self.actions[FINISH_ID] = self.finish
+        for base_recipes in self.select_base_recipe:
+            for action in base_recipes:
+                if action is not None:
+                    self.actions[action.action_id] = action
+
+    def __getitem__(self, action_id: int) -> Action:
+        action = self.actions[action_id]
+        if action is None:
+            raise KeyError(f"Invalid action ID ({action_id}).")
+        return action
+
+
+action_table = ActionTable()
@@ -6,15 +6,17 @@ __all__ = [
 ]
 
 import random
-from collections import Counter
 from typing import Callable
 
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
 from pokemon_gourmet.suggester.mcts.action import (
+    BASE_RECIPE_OFFSET,
+    FINISH_ID,
     Action,
-    FinishSandwich,
-    SelectBaseRecipe,
-    SelectCondiment,
-    SelectFilling,
+    action_table,
 )
 from pokemon_gourmet.suggester.mcts.state import RecipeState, State
 
@@ -22,12 +24,22 @@ RolloutPolicy = Callable[..., Action]
 
 ROLLOUT_POLICIES: dict[str, RolloutPolicy] = {}
 
+# Whether each action ID below `BASE_RECIPE_OFFSET` selects a condiment
+_IS_CONDIMENT_ID = np.append(ingredient_data.is_condiment, False)
+
+
+def _choice(action_ids: NDArray[np.intp], weights: NDArray[np.float64]) -> Action:
+    """Draw an action from some action IDs with the given weights."""
+    cum_weights = np.cumsum(weights)
+    i = np.searchsorted(cum_weights, random.random() * cum_weights[-1], "right")
+    return action_table[action_ids[min(i, len(action_ids) - 1)]]
+
 
 def random_rollout_policy(state: State) -> Action:
     """A rollout policy that gives ingredients a uniform probability of being
     picked."""
-    possible_actions = state.get_possible_actions()
-    return random.choice(possible_actions)
+    action_ids = state.legal_action_ids()
+    return action_table[action_ids[random.randrange(len(action_ids))]]
 
 
 ROLLOUT_POLICIES["random"] = random_rollout_policy
@@ -47,18 +59,18 @@ def early_stopping_rollout_policy(state: State, stop_prob: float = 0.5) -> Actio
     Raises:
         ValueError: When `stop_prob` is not between 0 and 1.
     """
-    possible_actions = state.get_possible_actions()
-    try:
-        finish_idx = possible_actions.index(FinishSandwich())
-    except ValueError:
-        return random.choice(possible_actions)
+    action_ids = state.legal_action_ids()
+    if action_ids[-1] != FINISH_ID:  # IDs are sorted, so finishing is last
+        return action_table[action_ids[random.randrange(len(action_ids))]]
     if not 0.0 < stop_prob <= 1.0:
         raise ValueError(
             "Probability must be greater than zero and equal or lower than 1."
         )
-    weights = [1.0] * len(possible_actions)
-    weights[finish_idx] = stop_prob / (1 - stop_prob) * (len(possible_actions) - 1)
-    return random.choices(possible_actions, weights, k=1)[0]
+    weights = np.ones(len(action_ids))
+    weights[action_ids == FINISH_ID] = (
+        stop_prob / (1 - stop_prob) * (len(action_ids) - 1)
+    )
+    return _choice(action_ids, weights)
 
 
 ROLLOUT_POLICIES["early_stopping"] = early_stopping_rollout_policy
@@ -84,26 +96,30 @@ def weighted_allocation_rollout_policy(
     """
     if not 0.0 < stop_prob < 1.0:
         raise ValueError("Probability must be between 0 and 1 (exclusive).")
-    possible_actions = state.get_possible_actions()
-    action_types = Counter(map(type, state.get_possible_actions()))
-    if SelectBaseRecipe in action_types:
-        return random.choice(possible_actions)
+    action_ids = state.legal_action_ids()
+    if action_ids[-1] >= BASE_RECIPE_OFFSET:
+        return action_table[action_ids[random.randrange(len(action_ids))]]
+    is_finish = action_ids == FINISH_ID
+    is_condiment = _IS_CONDIMENT_ID[action_ids]
+    num_condiments = np.count_nonzero(is_condiment)
+    num_fillings = len(action_ids) - num_condiments - np.count_nonzero(is_finish)
     free_slots = 10 * state.num_players - len(state)
-    finish_weight = 100 * stop_prob * action_types[FinishSandwich]
+    finish_weight = 100 * stop_prob * np.count_nonzero(is_finish)
     add_ingredient_weight = 100 - finish_weight
     add_filling_weight = (
         add_ingredient_weight * (state.max_fillings - state.num_fillings) / free_slots
     )
     add_condiment_weight = add_ingredient_weight - add_filling_weight
-    weights = []
-    for action in possible_actions:
-        if isinstance(action, FinishSandwich):
-            weights.append(finish_weight)
-        elif isinstance(action, SelectCondiment):
-            weights.append(add_condiment_weight / action_types[SelectCondiment])
-        else:
-            weights.append(add_ingredient_weight / action_types[SelectFilling])
-    return random.choices(possible_actions, weights, k=1)[0]
+    weights = np.where(
+        is_finish,
+        finish_weight,
+        np.where(
+            is_condiment,
+            add_condiment_weight / max(num_condiments, 1),
+            add_ingredient_weight / max(num_fillings, 1),
+        ),
+    )
+    return _choice(action_ids, weights)
 
 
 ROLLOUT_POLICIES["weighted_allocation"] = weighted_allocation_rollout_policy
@@ -14,13 +14,15 @@ from typing import (
     overload,
 )
 
+import numpy as np
+
 from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
 from pokemon_gourmet.suggester.mcts.action import (
+    FINISH_ID,
     Action,
     FinishSandwich,
     SelectBaseRecipe,
-    SelectCondiment,
-    SelectFilling,
+    action_table,
 )
 from pokemon_gourmet.suggester.mcts.policies import (
     RolloutPolicy,
@@ -32,7 +34,16 @@ FilterFunction = Callable[["Node"], bool]
 
 
 class Node(Sequence):
-    """A node from a search tree"""
+    """A node from a search tree
+
+    Children and untried actions are stored by action ID (see
+    `pokemon_gourmet.suggester.mcts.action`).
+
+    If transpositions are merged (see `MonteCarloTreeSearch`), a node can be
+    the child of several nodes, in which case `parent` is the node it was
+    first reached from. The visits of each edge are then counted separately
+    from the visits of the child it leads to.
+    """
 
     @overload
     def __init__(self, state: State):
@@ -51,27 +62,24 @@ class Node(Sequence):
         self.state = state
         self.parent = parent
         self.parent_action = parent_action
-        self.children: dict[Action, Node] = {}
+        self.children: dict[int, Node] = {}
         self._num_visits = 0
         self._total_reward = 0.0
-        self._untried_actions = self.state.get_possible_actions()
+        self._edge_visits: dict[int, int] = {}
+        self._untried_actions: list[int] = self.state.legal_action_ids().tolist()
 
     def __getitem__(
         self, key: Union[int, str, tuple[str, str], Action, Type[FinishSandwich]]
     ) -> "Node":
         if isinstance(key, Action):
-            return self.children[key]
+            return self.children[key.action_id]
         if isinstance(key, type) and issubclass(key, FinishSandwich):
-            return self.children[FinishSandwich()]
+            return self.children[FINISH_ID]
         if isinstance(key, tuple):
             keys = [ingredient_data.index(name) for name in key]
-            return self.children[SelectBaseRecipe(*keys)]
+            return self.children[SelectBaseRecipe(*keys).action_id]
         if isinstance(key, str):
-            i = ingredient_data.index(key)
-            try:
-                return self.children[SelectCondiment(i)]
-            except KeyError:
-                return self.children[SelectFilling(i)]
+            return self.children[ingredient_data.index(key)]
         if isinstance(key, int):
             if key >= len(self):
                 raise IndexError()
@@ -107,7 +115,7 @@ class Node(Sequence):
 
     @property
     def untried_actions(self) -> list[Action]:
-        return self._untried_actions
+        return [action_table[action_id] for action_id in self._untried_actions]
 
     def backpropagate(self, reward: float) -> None:
         """Update the number of visits and total reward statistics until the
@@ -117,23 +125,51 @@ class Node(Sequence):
         if self.parent is not None:
             self.parent.backpropagate(reward)
 
-    def expand(self) -> "Node":
+    def expand(self, transpositions: Optional[dict[Hashable, "Node"]] = None) -> "Node":
         """From the present state, generate a next state based on a random
-        untried action."""
+        untried action.
+
+        Args:
+            transpositions: Nodes keyed by the transposition key of their
+                state. If given, a next state that is already in the search
+                tree is linked to its existing node rather than duplicated.
+        """
+        return self.add_child(self.pop_untried_action(), transpositions)
+
+    def pop_untried_action(self) -> int:
+        """Remove a random untried action and return its ID."""
         idx = random.randint(0, len(self._untried_actions) - 1)
-        action = self._untried_actions.pop(idx)
+        return self._untried_actions.pop(idx)
+
+    def add_child(
+        self, action_id: int, transpositions: Optional[dict[Hashable, "Node"]] = None
+    ) -> "Node":
+        """Generate the next state of an action and link its node as a child
+        (see `expand`)."""
+        action = action_table[action_id]
         next_state = self.state.move(action)
-        child_node = Node(next_state, self, action)
-        self.children[action] = child_node
+        if transpositions is None:
+            child_node = Node(next_state, self, action)
+        else:
+            key = next_state.transposition_key
+            child_node = transpositions.get(key)
+            if child_node is None:
+                child_node = transpositions[key] = Node(next_state, self, action)
+        self.children[action_id] = child_node
         return child_node
 
     def get_leaves(
         self, filter_func: Optional[FilterFunction] = None
     ) -> Iterator["Node"]:
-        """Yield all succesors that are terminal nodes."""
+        """Yield all succesors that are terminal nodes (once, even if they
+        are reached through several paths)."""
         stack = [self]
+        seen = set()
         while stack:
             node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
             if node.is_terminal_node and (filter_func is None or filter_func(node)):
                 yield node
             for child in node.children.values():
@@ -141,10 +177,17 @@ class Node(Sequence):
 
     def reset_node(self) -> None:
         """Clear a node's total reward and number of visits, but keep edges."""
-        self._total_reward = 1e-8
-        self._num_visits = 1
-        for child in self:
-            child.reset_node()
+        stack = [self]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            node._total_reward = 1e-8
+            node._num_visits = 1
+            node._edge_visits = dict.fromkeys(node.children, 1)
+            stack.extend(node.children.values())
 
 
 class MonteCarloTreeSearch:
@@ -166,12 +209,23 @@ class MonteCarloTreeSearch:
     4. Backpropagation. Update the parent nodes with the result from the
     rollout.
 
+    The same state can often be reached through several sequences of actions
+    (e.g., the same ingredients added in a different order). By default, the
+    search tree holds one node per sequence, and the state manager hides the
+    actions that would lead to a state already in the tree. If
+    `transpositions` is enabled, nodes are instead keyed by the transposition
+    key of their state, so every sequence leads to the same node and shares
+    its visits and rewards. The search tree becomes a directed acyclic graph:
+    rewards are backpropagated along the path taken from the searched node,
+    and UCT weighs each child by the visits of the edge leading to it.
+
     Args:
         initial_state: Initial state
         rollout_policy: Policy used to decide which actions to take
         exploration_constant: Bias towards exploration of untried actions
         max_walltime: Maximum time to perform the rollout step
         seed: Seed for the random number generator
+        transpositions: Whether to merge the nodes of identical states
     """
 
     def __init__(
@@ -183,13 +237,17 @@ class MonteCarloTreeSearch:
         exploration_constant: float = 1 / sqrt(2),
         max_walltime: int = 1000,
         seed: Optional[int] = None,
+        transpositions: bool = False,
     ) -> None:
         self.rollout_policy = rollout_policy
         self.exploration_constant = exploration_constant
         self.max_walltime = max_walltime
-        self.root = Node(initial_state)
         self.state_manager = state_manager
         self.state_manager.clear()
+        self.root = Node(initial_state)
+        self.transpositions: Optional[dict[Hashable, Node]] = None
+        if transpositions:
+            self.transpositions = {initial_state.transposition_key: self.root}
         if seed is not None:
             random.seed(seed)
 
@@ -197,45 +255,96 @@ class MonteCarloTreeSearch:
         return self.__class__.__name__
 
     def rollout(self, node: Node) -> float:
-        """Simulate a game until there is an outcome."""
-        current_rollout_state = node.state
-        while not current_rollout_state.is_terminal:
-            action = self.rollout_policy(current_rollout_state)
-            current_rollout_state = current_rollout_state.move(action)
-        return current_rollout_state.reward
+        """Simulate a game until there is an outcome.
+
+        Actions are applied to the node's state in place and undone once the
+        outcome is known, so no intermediate state is created.
+        """
+        state = node.state
+        actions = []
+        try:
+            while not state.is_terminal:
+                action = self.rollout_policy(state)
+                action(state)
+                actions.append(action)
+            return state.reward
+        finally:
+            for action in reversed(actions):
+                action.undo(state)
 
     def select_node(self, current_node: Node) -> Node:
         """Select node to rollout. If node is fully expanded, select a child
         according to UCT. Otherwise, expand current node (i.e., create a child
         based on a random untried action)."""
+        return self.select_path(current_node)[-1][1]
+
+    def select_path(self, current_node: Node) -> list[tuple[Optional[int], Node]]:
+        """Select node to rollout (see `select_node`) and return the path
+        taken to reach it, as pairs of action ID and node (starting with the
+        current node, which no action leads to)."""
+        path: list[tuple[Optional[int], Node]] = [(None, current_node)]
         while not current_node.is_terminal_node:
             if current_node.is_fully_expanded:
-                current_node = self.select_child(current_node)
+                action_id, current_node = self.select_edge(current_node)
+                path.append((action_id, current_node))
             else:
-                child = current_node.expand()
-                self.state_manager.add(child.state)
-                return child
-        return current_node
+                action_id = current_node.pop_untried_action()
+                child = current_node.add_child(action_id, self.transpositions)
+                if self.transpositions is None:
+                    self.state_manager.add(child.state)
+                path.append((action_id, child))
+                return path
+        return path
 
     def select_child(self, parent: Node) -> Node:
         """Draw child node sample according to UCT."""
-        children = [*parent.children.values()]
+        return self.select_edge(parent)[1]
+
+    def select_edge(self, parent: Node) -> tuple[int, Node]:
+        """Draw an action and the child it leads to according to UCT."""
+        edges = [*parent.children.items()]
         weights = []
-        for child in children:
+        for action_id, child in edges:
             score = child._total_reward / child._num_visits
+            if self.transpositions is None:
+                num_visits = child._num_visits
+            else:
+                num_visits = parent._edge_visits[action_id]
             uct = score + self.exploration_constant * sqrt(
-                2 * log(parent._num_visits) / child._num_visits
+                2 * log(parent._num_visits) / num_visits
             )
             weights.append(uct)
-        return random.choices(children, weights, k=1)[0]
+        return random.choices(edges, weights, k=1)[0]
+
+    def backpropagate(
+        self, path: list[tuple[Optional[int], Node]], reward: float
+    ) -> None:
+        """Update the statistics of the nodes and edges of a path.
+
+        Without transpositions, the statistics of the ancestors of the first
+        node are updated as well (see `Node.backpropagate`).
+        """
+        if self.transpositions is None:
+            path[-1][1].backpropagate(reward)
+            return
+        parent = None
+        for action_id, node in path:
+            node._num_visits += 1
+            node._total_reward += reward
+            if parent is not None:
+                assert action_id is not None
+                parent._edge_visits[action_id] = (
+                    parent._edge_visits.get(action_id, 0) + 1
+                )
+            parent = node
 
     def search(self, parent: Node) -> Node:
         """Return the node corresponding to the best possible move."""
         max_walltime = time() + self.max_walltime / 1000
         while time() < max_walltime:
-            node = self.select_node(parent)
-            reward = self.rollout(node)
-            node.backpropagate(reward)
+            path = self.select_path(parent)
+            reward = self.rollout(path[-1][1])
+            self.backpropagate(path, reward)
         best_child = self.select_best_child(parent)
         return best_child
 
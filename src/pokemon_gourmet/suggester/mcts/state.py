@@ -1,14 +1,19 @@
-__all__ = ["RecipeState", "State", "recipe_manager"]
+__all__ = ["compute_rewards", "RecipeState", "State", "recipe_manager"]
 
+import os
 from abc import ABCMeta, abstractmethod
-from copy import deepcopy
-from itertools import product
-from math import log2
 from typing import Generic, Hashable, Iterator, TypeVar, Union, cast
 
 import numpy as np
+from numpy.typing import NDArray
 
+from pokemon_gourmet.cache import LRUCache
 from pokemon_gourmet.enums import Power
+from pokemon_gourmet.sandwich.batch import (
+    REWARD_GROWTH_FACTOR,
+    compute_rewards,
+)
+from pokemon_gourmet.sandwich.contribution_index import contribution_index
 from pokemon_gourmet.sandwich.effect import EffectList
 from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
 from pokemon_gourmet.sandwich.recipe import (
@@ -20,23 +25,28 @@ from pokemon_gourmet.sandwich.recipe import (
 )
 from pokemon_gourmet.singleton import Singleton
 from pokemon_gourmet.suggester.mcts.action import (
+    BASE_RECIPE_OFFSET,
+    FINISH_ID,
+    NUM_ACTIONS,
     Action,
-    FinishSandwich,
-    SelectBaseRecipe,
-    SelectCondiment,
-    SelectFilling,
+    action_table,
 )
 
-REWARD_GROWTH_FACTOR = log2(300) / 2
-
 StateT = TypeVar("StateT", bound="State")
 State_co = TypeVar("State_co", bound="State", covariant=True)
 T_co = TypeVar("T_co", bound=Hashable, covariant=True)
+# IDs of the actions allowed by the rules and the slice of those IDs that are
+# ingredient selections possible unless they lead to an existing recipe
+RuleActions = tuple[NDArray[np.intp], slice]
+
+ACTION_CACHE_SIZE = int(os.environ.get("POKEMON_GOURMET_ACTION_CACHE_SIZE", 2**16))
 
 
 class State(metaclass=ABCMeta):
     """A description of a transitional situation (e.g., making a sandwich recipe)"""
 
+    __slots__ = ()
+
     @abstractmethod
     def __hash__(self) -> int:
         ...
@@ -50,10 +60,24 @@ class State(metaclass=ABCMeta):
     def get_possible_actions(self) -> list[Action]:
         ...
 
+    @abstractmethod
+    def legal_action_ids(self) -> NDArray[np.intp]:
+        ...
+
+    @abstractmethod
+    def legal_action_mask(self) -> NDArray[np.bool_]:
+        ...
+
     @abstractmethod
     def move(self: StateT, action: Action) -> StateT:
         ...
 
+    @property
+    def transposition_key(self) -> Hashable:
+        """A key shared by the states that are the same regardless of the
+        actions that led to them"""
+        return self
+
     @property
     @abstractmethod
     def reward(self) -> float:
@@ -70,14 +94,38 @@ class RecipeState(Recipe, State):
     True if their computed effects match their desired effects. Additionally,
     these recipes can be sorted by comparing the matching score and the number
     of condiments and fillings.
+
+    If `prune_actions` is enabled, the possible actions are restricted to the
+    ingredients that raise a target Power or Type, or the flavor combo that
+    grants a bonus to a target Power (see
+    `pokemon_gourmet.sandwich.contribution_index`). This shrinks the branching
+    factor of the search, at the risk of missing recipes that rely on other
+    ingredients to outrank competing effects.
+
+    The actions allowed by the rules only depend on the ingredients, targets,
+    and limits of a recipe, so they are cached (see `action_cache`). Actions
+    leading to recipes already in `recipe_manager` are filtered afterwards,
+    since the manager changes during a search.
     """
 
+    __slots__ = (
+        "targets",
+        "min_fillings",
+        "max_fillings",
+        "max_condiments",
+        "prune_actions",
+        "_action_key",
+        "_is_finished",
+        "_reward",
+    )
+
     def __init__(
         self,
         targets: EffectList,
         min_fillings: int = 1,
         max_fillings: int = MAX_FILLINGS,
         num_players: int = 1,
+        prune_actions: bool = False,
     ) -> None:
         super().__init__(num_players=num_players)
         if not 0 < len(targets) <= 3:
@@ -91,6 +139,16 @@ class RecipeState(Recipe, State):
         self.min_fillings = max(1, min_fillings) * num_players
         self.max_fillings = min(MAX_FILLINGS, max_fillings) * num_players
         self.max_condiments = MAX_CONDIMENTS * num_players
+        self.prune_actions = prune_actions
+        # Everything but the ingredients that determines the possible actions
+        self._action_key = (
+            tuple((target.power_idx, target.pokemon_type_idx) for target in targets),
+            self.min_fillings,
+            self.max_fillings,
+            self.max_condiments,
+            self.single_ingredient_limit,
+            prune_actions,
+        )
         self._is_finished = False
         self._reward = None
 
@@ -122,6 +180,11 @@ class RecipeState(Recipe, State):
     def is_finished(self, value: bool) -> None:
         self._is_finished = value
 
+    @property
+    def transposition_key(self) -> tuple[int, bool]:
+        """The recipe's key and whether it is finished"""
+        return self._key, self._is_finished
+
     @property
     def is_terminal(self) -> bool:
         """Whether this recipe is finished or it has no more room for any
@@ -146,17 +209,43 @@ class RecipeState(Recipe, State):
             self._reward = self.get_reward()
         return self._reward
 
+    def copy(self) -> "RecipeState":
+        """Return a copy of this recipe state that shares its targets and
+        limits (which are never modified) with the original."""
+        other = super().copy()
+        other.targets = self.targets
+        other.min_fillings = self.min_fillings
+        other.max_fillings = self.max_fillings
+        other.max_condiments = self.max_condiments
+        other.prune_actions = self.prune_actions
+        other._action_key = self._action_key
+        other._is_finished = self._is_finished
+        other._reward = self._reward
+        return other
+
     def add_ingredient(self, ingredient: Ingredient) -> None:
         self._reward = None  # Reset reward
         return super().add_ingredient(ingredient)
 
+    def remove_ingredient(self, ingredient: Ingredient) -> None:
+        self._reward = None  # Reset reward
+        return super().remove_ingredient(ingredient)
+
     def exists_with(self, ingredient: Ingredient) -> bool:
         """Check whether adding an ingredient would result in an existing
         recipe."""
         i = self._get_ingredient_index(ingredient)
-        list_ = self._ingredient_list.tolist()
-        list_[i] += 1
-        return tuple(list_) in recipe_manager
+        return bool(recipe_manager.get_children(self) >> i & 1)
+
+    def _prune(self, is_valid: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        """Restrict valid ingredients to those relevant to the targets, unless
+        pruning is disabled or would leave no ingredient."""
+        if not self.prune_actions:
+            return is_valid
+        is_relevant = is_valid & contribution_index.get_relevant_ingredients(
+            self.targets
+        )
+        return is_relevant if np.any(is_relevant) else is_valid
 
     def get_possible_actions(self) -> list[Action]:
         """Return a list of possible actions.
@@ -176,38 +265,77 @@ class RecipeState(Recipe, State):
         number of Herba Mystica: one if Title Power desired or two if Sparkling
         Power desired.
         """
+        actions = action_table.actions
+        return [actions[i] for i in self.legal_action_ids().tolist()]
+
+    def legal_action_ids(self) -> NDArray[np.intp]:
+        """Return the IDs of the possible actions (see
+        `pokemon_gourmet.suggester.mcts.action`) in increasing order, which is
+        the order of `get_possible_actions`. The returned array is read-only
+        and cached, so prefer it to `legal_action_mask` when only the IDs are
+        needed."""
+        key = (self._key, self._action_key)
+        rule_actions = action_cache.get(key)
+        if rule_actions is None:
+            rule_actions = self._get_rule_actions()
+            action_cache[key] = rule_actions
+        action_ids, candidates = rule_actions
+        if candidates.start < candidates.stop and len(recipe_manager) > 0:
+            # Skip ingredients that generate redundant recipes
+            children = recipe_manager.get_children(self)
+            if children:
+                keep = np.ones(len(action_ids), dtype=bool)
+                keep[candidates] = (children >> action_ids[candidates]) & 1 == 0
+                action_ids = action_ids[keep]
+                # Add stopping action if no other action possible
+                if len(action_ids) == 0:
+                    action_ids = np.array([FINISH_ID], dtype=np.intp)
+        return action_ids
+
+    def legal_action_mask(self) -> NDArray[np.bool_]:
+        """Return a mask of the possible actions, indexed by action ID."""
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        mask[self.legal_action_ids()] = True
+        return mask
+
+    def _get_rule_actions(self) -> RuleActions:
+        """Derive the possible actions from the rules of
+        `get_possible_actions`."""
         can_stop = False
-        possible_actions = []
+        fixed_ids = np.zeros(0, dtype=np.intp)
+        candidate_ids = np.zeros(0, dtype=np.intp)
         if len(self) == 0:
             # Force base recipe to include Herba Mystica if Title/Sparkling Power
             # Sparkling is always paired with Title, so only check Title
             title = Power.TITLE in self.targets
-            valid_condiments = np.flatnonzero(
-                ingredient_data.is_condiment
-                & ~(ingredient_data.is_herba_mystica ^ title)
+            is_valid_condiment = ingredient_data.is_condiment & ~(
+                ingredient_data.is_herba_mystica ^ title
             )
-            valid_fillings = np.flatnonzero(ingredient_data.is_filling)
-            for condiment, filling in product(valid_condiments, valid_fillings):
-                possible_actions.append(SelectBaseRecipe(condiment, filling))
+            if not title:
+                is_valid_condiment = self._prune(is_valid_condiment)
+            valid_condiments = np.flatnonzero(is_valid_condiment)
+            valid_fillings = np.flatnonzero(self._prune(ingredient_data.is_filling))
+            fixed_ids = (
+                BASE_RECIPE_OFFSET
+                + valid_condiments[:, np.newaxis] * len(ingredient_data)
+                + valid_fillings
+            ).ravel()
         else:
             # Force second condiment to be Herba Mystica if Sparkling Power
             if Power.SPARKLING in self.targets and self.num_condiments == 1:
-                for ingredient in np.flatnonzero(ingredient_data.is_herba_mystica):
-                    possible_actions.append(SelectCondiment(ingredient))
+                fixed_ids = np.flatnonzero(ingredient_data.is_herba_mystica)
             else:
                 # Add fillings if there is room
                 if self.num_fillings < self.max_fillings:
                     # Skip fillings that have reached max number of pieces
                     ingredient_counts = self._ingredient_list * ingredient_data.pieces
                     valid_fillings = np.flatnonzero(
-                        ingredient_data.is_filling
-                        & (ingredient_counts <= self.single_ingredient_limit)
+                        self._prune(
+                            ingredient_data.is_filling
+                            & (ingredient_counts <= self.single_ingredient_limit)
+                        )
                     )
-                    for ingredient in valid_fillings:
-                        # Skip ingredients that generate redundant recipes
-                        if self.exists_with(ingredient):
-                            continue
-                        possible_actions.append(SelectFilling(ingredient))
+                    candidate_ids = np.concatenate((candidate_ids, valid_fillings))
 
                 # If min # of fillings have been added, make it possible to stop
                 # or select condiments
@@ -217,18 +345,22 @@ class RecipeState(Recipe, State):
                     if self.num_condiments < self.max_condiments:
                         # Exclude Herba Mystica from recipe
                         valid_condiments = np.flatnonzero(
-                            ingredient_data.is_condiment
-                            & ~ingredient_data.is_herba_mystica
+                            self._prune(
+                                ingredient_data.is_condiment
+                                & ~ingredient_data.is_herba_mystica
+                            )
+                        )
+                        candidate_ids = np.concatenate(
+                            (candidate_ids, valid_condiments)
                         )
-                        for ingredient in valid_condiments:
-                            # Skip ingredients that generate redundant recipes
-                            if self.exists_with(ingredient):
-                                continue
-                            possible_actions.append(SelectCondiment(ingredient))
+        # Sorted like the nonzero entries of `legal_action_mask`
+        action_ids = np.concatenate((fixed_ids, np.sort(candidate_ids)))
+        candidates = slice(len(fixed_ids), len(action_ids))
         # Add stopping action if no other action possible
-        if can_stop or len(possible_actions) == 0:
-            possible_actions.append(FinishSandwich())
-        return possible_actions
+        if can_stop or len(action_ids) == 0:
+            action_ids = np.append(action_ids, FINISH_ID)
+        action_ids.flags.writeable = False
+        return action_ids, candidates
 
     def get_reward(self) -> float:
         """Calculate the score of this recipe by comparing its calculated
@@ -245,6 +377,7 @@ class RecipeState(Recipe, State):
         if self.is_legal:
             effects = self.effects
             levels = effects.remove_levels()  # Do not compare Levels
+            effects.remove_egg_type()  # Egg Power targets are typeless
             intersection = cast(EffectList, self.targets & effects)
             base_reward = len(intersection) / len(self.targets)
             if base_reward == 1.0:
@@ -267,7 +400,7 @@ class RecipeState(Recipe, State):
         Returns:
             The new recipe
         """
-        next_state = deepcopy(self)
+        next_state = self.copy()
         action(next_state)
         return next_state
 
@@ -298,22 +431,54 @@ class StateManager(Generic[State_co, T_co]):
         self._states.clear()
 
 
-class RecipeManager(StateManager[RecipeState, RecipeTuple], metaclass=Singleton):
-    """Manage generated recipes by keeping a list of unique entries"""
+class RecipeManager(StateManager[RecipeState, int], metaclass=Singleton):
+    """Manage generated recipes by keeping a list of unique entries.
+
+    Recipes are stored by key (see `pokemon_gourmet.sandwich.Recipe.key`).
+    Removing one ingredient from a recipe subtracts a fixed amount from its
+    key, so each recipe is also recorded as a child of the recipes one
+    ingredient smaller. The existing recipes one ingredient away from a
+    recipe are then found with a single lookup (see `get_children`).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Bitmask of the ingredients whose addition gives an existing recipe
+        self._children: dict[int, int] = {}
 
-    def __contains__(self, item: Union[RecipeState, RecipeTuple]) -> bool:
+    def __contains__(self, item: Union[RecipeState, RecipeTuple, int]) -> bool:
         if isinstance(item, RecipeState):
-            item = item.astuple()
-        if isinstance(item, tuple):
+            item = item.key
+        elif isinstance(item, tuple):
+            # Ingredient counts are the bytes of the key
+            item = int.from_bytes(bytes(item), "little")
+        if isinstance(item, int):
             return item in self._states
         raise TypeError()
 
     def add(self, item: RecipeState) -> None:
-        """Add a recipe (as a tuple) to the recipe manager."""
-        if isinstance(item, RecipeState):
-            tup = item.astuple()
-            return self._states.add(tup)
-        raise TypeError(f"Received {type(item)}, should be `State`")
+        """Add a recipe (by key) to the recipe manager."""
+        if not isinstance(item, RecipeState):
+            raise TypeError(f"Received {type(item)}, should be `State`")
+        key = item.key
+        if key in self._states:
+            return
+        self._states.add(key)
+        for i in np.flatnonzero(item._ingredient_list).tolist():
+            parent_key = key - (1 << (8 * i))
+            self._children[parent_key] = self._children.get(parent_key, 0) | 1 << i
+
+    def clear(self) -> None:
+        """Remove all items from the recipe manager."""
+        super().clear()
+        self._children.clear()
+
+    def get_children(self, item: RecipeState) -> int:
+        """Return a bitmask of the ingredients (by index) that, added to a
+        recipe, result in an existing recipe."""
+        return self._children.get(item.key, 0)
 
 
 recipe_manager = RecipeManager()
+# Actions allowed by the rules, keyed by recipe and targets/limits
+action_cache: LRUCache[Hashable, RuleActions] = LRUCache(ACTION_CACHE_SIZE)
@@ -0,0 +1,348 @@
+__all__ = ["ArrayMonteCarloTreeSearch", "NO_NODE", "TreeStore"]
+
+import random
+from math import sqrt
+from time import time
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.suggester.mcts.action import Action, action_table
+from pokemon_gourmet.suggester.mcts.policies import (
+    RolloutPolicy,
+    random_rollout_policy,
+)
+from pokemon_gourmet.suggester.mcts.state import RecipeState, StateManager
+
+# Index marking a missing parent, child, or sibling
+NO_NODE = -1
+# Names of the arrays of a tree store
+_COLUMNS = (
+    "parent",
+    "action_id",
+    "num_visits",
+    "total_reward",
+    "first_child",
+    "next_sibling",
+    "untried_start",
+    "num_untried",
+    "is_terminal",
+)
+
+
+class TreeStore:
+    """A search tree stored as columns: one entry per node in each array.
+
+    Children are kept as linked lists: each node points to its first child,
+    and each child to its next sibling. Nodes do not hold states, which are
+    rebuilt by replaying the actions on the path from the root (see
+    `path_actions`). The untried actions of each node are a range of a shared
+    pool of action IDs, recorded when the node is added. Arrays grow
+    (doubling their capacity) as nodes are added.
+
+    Args:
+        capacity: Number of nodes to allocate room for
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        capacity = max(1, capacity)
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.action_id = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.num_visits = np.zeros(capacity, dtype=np.int64)
+        self.total_reward = np.zeros(capacity, dtype=np.float64)
+        self.first_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.next_sibling = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.untried_start = np.zeros(capacity, dtype=np.int64)
+        self.num_untried = np.zeros(capacity, dtype=np.int32)
+        self.is_terminal = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        # Action IDs fit in 16 bits
+        self._untried = np.zeros(capacity, dtype=np.int16)
+        self._pool_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        s = "s" if len(self) != 1 else ""
+        return f"{self.__class__.__name__}({len(self)} node{s})"
+
+    @property
+    def capacity(self) -> int:
+        return len(self.parent)
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes taken by the arrays (including unused capacity)"""
+        return self._untried.nbytes + sum(
+            getattr(self, name).nbytes for name in _COLUMNS
+        )
+
+    def _grow(self) -> None:
+        capacity = 2 * self.capacity
+        for name in _COLUMNS:
+            array: NDArray = getattr(self, name)
+            fill_value = NO_NODE if array.dtype == np.int32 else 0
+            grown = np.full(capacity, fill_value, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    def add_node(
+        self,
+        parent: int = NO_NODE,
+        action_id: int = NO_NODE,
+        is_terminal: bool = False,
+        untried_actions: Optional[NDArray[np.intp]] = None,
+    ) -> int:
+        """Add a node as the first child of its parent.
+
+        Args:
+            parent: Index of the parent node (none for the root)
+            action_id: ID of the action leading from the parent to the node
+            is_terminal: Whether the state of the node is terminal
+            untried_actions: IDs of the actions possible from the node
+
+        Returns:
+            Index of the new node
+        """
+        if self._size == self.capacity:
+            self._grow()
+        node = self._size
+        self._size += 1
+        self.parent[node] = parent
+        self.action_id[node] = action_id
+        self.is_terminal[node] = is_terminal
+        num_untried = 0 if untried_actions is None else len(untried_actions)
+        start = self._pool_size
+        if start + num_untried > len(self._untried):
+            grown = np.zeros(2 * (start + num_untried), dtype=self._untried.dtype)
+            grown[:start] = self._untried[:start]
+            self._untried = grown
+        if num_untried > 0:
+            self._untried[start : start + num_untried] = untried_actions
+        self._pool_size += num_untried
+        self.untried_start[node] = start
+        self.num_untried[node] = num_untried
+        if parent != NO_NODE:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+        return node
+
+    def children(self, node: int) -> list[int]:
+        """Return the indices of the children of a node, in the order they
+        were added (like the children of
+        `pokemon_gourmet.suggester.mcts.search.Node`)."""
+        children = []
+        child = self.first_child[node].item()
+        # Indexing a memoryview returns Python integers, faster than NumPy's
+        next_sibling = memoryview(self.next_sibling)
+        while child != NO_NODE:
+            children.append(child)
+            child = next_sibling[child]
+        return children[::-1]
+
+    def pop_untried_action(self, node: int) -> int:
+        """Remove a random untried action of a node and return its ID (like
+        `pokemon_gourmet.suggester.mcts.search.Node.pop_untried_action`)."""
+        start = self.untried_start[node].item()
+        num_untried = self.num_untried[node].item()
+        i = start + random.randint(0, num_untried - 1)
+        stop = start + num_untried
+        action_id = self._untried[i].item()
+        self._untried[i : stop - 1] = self._untried[i + 1 : stop]
+        self.num_untried[node] = num_untried - 1
+        return action_id
+
+    def path_actions(self, node: int) -> list[int]:
+        """Return the IDs of the actions leading from the root to a node."""
+        action_ids = []
+        while self.parent[node] != NO_NODE:
+            action_ids.append(self.action_id[node].item())
+            node = self.parent[node].item()
+        return action_ids[::-1]
+
+    def backpropagate(self, node: int, reward: float) -> None:
+        """Update the number of visits and total reward statistics until the
+        root node is reached."""
+        while node != NO_NODE:
+            self.num_visits[node] += 1
+            self.total_reward[node] += reward
+            node = self.parent[node].item()
+
+    def reset(self) -> None:
+        """Clear the total reward and number of visits of every node, but keep
+        edges."""
+        self.total_reward[: len(self)] = 1e-8
+        self.num_visits[: len(self)] = 1
+
+    def get_leaves(
+        self, node: int = 0, filter_func: Optional[Callable[[int], bool]] = None
+    ) -> Iterator[int]:
+        """Yield the indices of all successors that are terminal nodes."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if self.is_terminal[node] and (filter_func is None or filter_func(node)):
+                yield node
+            stack.extend(self.children(node))
+
+
+class ArrayMonteCarloTreeSearch:
+    """A Monte Carlo tree search (see
+    `pokemon_gourmet.suggester.mcts.search.MonteCarloTreeSearch`) whose tree
+    is a `TreeStore`.
+
+    Nodes are integer indices and hold no state. A single working state is
+    moved along the selected path in place and restored afterwards, so the
+    tree itself creates no objects for the garbage collector to track. As
+    with `Node`, the possible actions of a node are recorded when it is
+    created, so both trees explore the same actions for the same seed.
+
+    As in `MonteCarloTreeSearch`, every expanded recipe is still recorded (by
+    key) in the state manager, so that other orders of the same ingredients
+    are skipped. With the recorded actions, a search takes a few hundred
+    bytes per node instead of about two kilobytes (see
+    `benchmarks/tree_memory.py`).
+
+    Args:
+        initial_state: Initial state
+        state_manager: Recorder of the expanded recipes
+        rollout_policy: Policy used to decide which actions to take
+        exploration_constant: Bias towards exploration of untried actions
+        max_walltime: Maximum time to perform the rollout step
+        seed: Seed for the random number generator
+        capacity: Number of nodes to allocate room for
+    """
+
+    def __init__(
+        self,
+        initial_state: RecipeState,
+        state_manager: StateManager[RecipeState, int],
+        *,
+        rollout_policy: RolloutPolicy = random_rollout_policy,
+        exploration_constant: float = 1 / sqrt(2),
+        max_walltime: int = 1000,
+        seed: Optional[int] = None,
+        capacity: int = 2**16,
+    ) -> None:
+        self.rollout_policy = rollout_policy
+        self.exploration_constant = exploration_constant
+        self.max_walltime = max_walltime
+        self.initial_state = initial_state
+        self.state = initial_state.copy()
+        self.state_manager = state_manager
+        self.state_manager.clear()
+        self.tree = TreeStore(capacity)
+        self.root = self._add_node(NO_NODE, NO_NODE)
+        if seed is not None:
+            random.seed(seed)
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__
+
+    def get_state(self, node: int) -> RecipeState:
+        """Return a new state reached by replaying the actions leading to a
+        node."""
+        state = self.initial_state.copy()
+        for action_id in self.tree.path_actions(node):
+            action_table[action_id](state)
+        return state
+
+    def _add_node(self, parent: int, action_id: int) -> int:
+        """Add a node for the working state, with its possible actions."""
+        is_terminal = self.state.is_terminal
+        untried_actions = None if is_terminal else self.state.legal_action_ids()
+        return self.tree.add_node(parent, action_id, is_terminal, untried_actions)
+
+    def _move(self, action_id: int, actions: list[Action]) -> None:
+        action = action_table[action_id]
+        action(self.state)
+        actions.append(action)
+
+    def rollout(self) -> float:
+        """Simulate a game from the working state until there is an outcome
+        (and restore the working state)."""
+        state = self.state
+        actions = []
+        try:
+            while not state.is_terminal:
+                action = self.rollout_policy(state)
+                action(state)
+                actions.append(action)
+            return state.reward
+        finally:
+            for action in reversed(actions):
+                action.undo(state)
+
+    def select_node(self, current_node: int, actions: list[Action]) -> int:
+        """Select node to rollout. If node is fully expanded, select a child
+        according to UCT. Otherwise, expand current node (i.e., create a child
+        based on a random untried action).
+
+        The working state must be the state of the current node. It is moved
+        to the state of the selected node, and the actions applied to it are
+        appended to `actions`.
+        """
+        tree = self.tree
+        while not tree.is_terminal[current_node]:
+            if tree.num_untried[current_node] > 0:
+                return self.expand(current_node, actions)
+            current_node = self.select_child(current_node)
+            self._move(tree.action_id[current_node].item(), actions)
+        return current_node
+
+    def expand(self, node: int, actions: list[Action]) -> int:
+        """Create a child of a node based on a random untried action and move
+        the working state to it.
+
+        Returns:
+            Index of the child
+        """
+        action_id = self.tree.pop_untried_action(node)
+        self._move(action_id, actions)
+        child = self._add_node(node, action_id)
+        self.state_manager.add(self.state)
+        return child
+
+    def select_child(self, parent: int) -> int:
+        """Draw child node sample according to UCT."""
+        children = np.array(self.tree.children(parent))
+        num_visits = self.tree.num_visits[children]
+        scores = self.tree.total_reward[children] / num_visits
+        weights = scores + self.exploration_constant * np.sqrt(
+            2 * np.log(self.tree.num_visits[parent]) / num_visits
+        )
+        cum_weights = np.cumsum(weights)
+        i = np.searchsorted(cum_weights, random.random() * cum_weights[-1], "right")
+        return children[min(i, len(children) - 1)].item()
+
+    def search(self, parent: int) -> int:
+        """Return the node corresponding to the best possible move."""
+        path_actions = [action_table[i] for i in self.tree.path_actions(parent)]
+        for action in path_actions:
+            action(self.state)
+        try:
+            max_walltime = time() + self.max_walltime / 1000
+            while time() < max_walltime:
+                actions: list[Action] = []
+                try:
+                    node = self.select_node(parent, actions)
+                    reward = self.rollout()
+                finally:
+                    for action in reversed(actions):
+                        action.undo(self.state)
+                self.tree.backpropagate(node, reward)
+        finally:
+            for action in reversed(path_actions):
+                action.undo(self.state)
+        return self.select_best_child(parent)
+
+    def select_best_child(self, parent: int) -> int:
+        """Select the node's best child."""
+        children = np.array(self.tree.children(parent))
+        scores = self.tree.total_reward[children] / self.tree.num_visits[children]
+        best_children = children[scores == scores.max()]
+        if len(best_children) > 1:
+            return random.choice(best_children.tolist())
+        return best_children[0].item()
@@ -0,0 +1,14 @@
+__all__ = [
+    "BranchAndBound",
+    "ExhaustiveSearch",
+    "MeetInTheMiddle",
+    "SOLVERS",
+    "Solver",
+]
+
+from pokemon_gourmet.suggester.solvers.base import SOLVERS, Solver
+from pokemon_gourmet.suggester.solvers.branch_and_bound import BranchAndBound
+from pokemon_gourmet.suggester.solvers.exhaustive import ExhaustiveSearch
+from pokemon_gourmet.suggester.solvers.meet_in_the_middle import (
+    MeetInTheMiddle,
+)
@@ -0,0 +1,203 @@
+__all__ = ["LEVEL_THRESHOLDS", "MAX_REWARD", "SOLVERS", "Solver"]
+
+from abc import ABCMeta, abstractmethod
+from itertools import chain, combinations_with_replacement
+from math import comb
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Power
+from pokemon_gourmet.sandwich.batch import REWARD_GROWTH_FACTOR
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.sandwich.recipe import MAX_FILLINGS
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+
+SOLVERS: dict[str, type["Solver"]] = {}
+# Minimum value of the highest Type to reach Levels 2 and 3
+LEVEL_THRESHOLDS = np.array([180, 380])
+# Reward of matching every target at Level 3
+MAX_REWARD = 2 ** (REWARD_GROWTH_FACTOR * 2)
+
+
+class Solver(metaclass=ABCMeta):
+    """An engine that generates the recipes that best match the target
+    effects of an initial (empty) recipe state.
+
+    Candidate recipes follow the same rules as
+    `pokemon_gourmet.suggester.mcts.state.RecipeState.get_possible_actions`:
+    recipes contain one Herba Mystica if Title Power is desired, two if
+    Sparkling Power is desired, and none otherwise.
+
+    Args:
+        initial_state: Empty recipe state holding the targets and limits
+        max_condiments: Maximum number of condiments (including Herba
+            Mystica) to include in recipe
+        min_level: Minimum (average) Level of the target effects. Recipes
+            below this Level are discarded.
+        max_results: Maximum number of recipes returned (further recipes tied
+            with the best reward are discarded), or None to return them all
+    """
+
+    name: str
+    # Largest number of fillings the engine handles with its default settings
+    default_max_fillings: int = MAX_FILLINGS
+
+    def __init__(
+        self,
+        initial_state: RecipeState,
+        max_condiments: Optional[int] = None,
+        min_level: int = 1,
+        max_results: Optional[int] = 100,
+    ) -> None:
+        if len(initial_state) > 0:
+            raise ValueError("Initial state should be an empty recipe.")
+        self.initial_state = initial_state
+        self.targets = initial_state.targets
+        self.min_fillings = initial_state.min_fillings
+        self.max_fillings = initial_state.max_fillings
+        if max_condiments is None:
+            max_condiments = initial_state.max_condiments
+        self.max_condiments = min(max_condiments, initial_state.max_condiments)
+        if Power.SPARKLING in self.targets:
+            self.num_herba_mystica = 2
+        elif Power.TITLE in self.targets:
+            self.num_herba_mystica = 1
+        else:
+            self.num_herba_mystica = 0
+        if self.max_condiments < max(1, self.num_herba_mystica):
+            raise ValueError("Not enough condiments to match the target effects.")
+        if not 1 <= min_level <= 3:
+            raise ValueError("Level should be between 1 and 3.")
+        self.min_level = min_level
+        if max_results is not None and max_results < 1:
+            raise ValueError("At least one recipe should be returned.")
+        self.max_results = max_results
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__
+
+    @property
+    def min_reward(self) -> float:
+        """Lowest reward of a recipe matching every target at the minimum
+        Level (zero if any recipe is accepted)"""
+        if self.min_level == 1:
+            return 0.0
+        return 2 ** (REWARD_GROWTH_FACTOR * (self.min_level - 1))
+
+    @property
+    def num_filling_lists(self) -> int:
+        """Upper bound of the number of legal multisets of fillings (before
+        discarding those exceeding the max number of pieces)"""
+        num_fillings = len(self.filling_ids)
+        return sum(
+            comb(num_fillings + k - 1, k)
+            for k in range(self.min_fillings, self.max_fillings + 1)
+        )
+
+    @property
+    def num_condiment_lists(self) -> int:
+        """Number of legal multisets of condiments (including the required
+        Herba Mystica)"""
+        num_condiments = len(self.condiment_ids)
+        min_condiments = 1 if self.num_herba_mystica == 0 else 0
+        max_condiments = self.max_condiments - self.num_herba_mystica
+        num_herba_mystica = len(self.herba_mystica_ids)
+        return comb(
+            num_herba_mystica + self.num_herba_mystica - 1, self.num_herba_mystica
+        ) * sum(
+            comb(num_condiments + k - 1, k)
+            for k in range(min_condiments, max_condiments + 1)
+        )
+
+    def is_acceptable(self, reward: float) -> bool:
+        """Return whether the recipes with the best reward should be returned
+        (recipes matching no target never are)."""
+        return reward > 0 and reward >= self.min_reward
+
+    def is_full(self, num_results: int) -> bool:
+        """Return whether enough recipes tied with the best reward were
+        found."""
+        return self.max_results is not None and num_results >= self.max_results
+
+    @property
+    def filling_ids(self) -> NDArray[np.intp]:
+        """Indices of the fillings that can be added to a recipe"""
+        return np.flatnonzero(ingredient_data.is_filling)
+
+    @property
+    def condiment_ids(self) -> NDArray[np.intp]:
+        """Indices of the condiments (excluding Herba Mystica) that can be
+        added to a recipe"""
+        return np.flatnonzero(
+            ingredient_data.is_condiment & ~ingredient_data.is_herba_mystica
+        )
+
+    @property
+    def herba_mystica_ids(self) -> NDArray[np.intp]:
+        """Indices of the Herba Mystica"""
+        return np.flatnonzero(ingredient_data.is_herba_mystica)
+
+    def get_filling_lists(self) -> NDArray[np.uint8]:
+        """Return every legal multiset of fillings as a matrix of ingredient
+        counts."""
+        filling_ids = self.filling_ids.tolist()
+        filling_lists = self.to_ingredient_lists(
+            [
+                fillings
+                for num_fillings in range(self.min_fillings, self.max_fillings + 1)
+                for fillings in combinations_with_replacement(filling_ids, num_fillings)
+            ]
+        )
+        # Skip fillings exceeding the max number of pieces
+        ingredient_counts = filling_lists * ingredient_data.pieces
+        is_legal = np.all(
+            ingredient_counts <= self.initial_state.single_ingredient_limit, axis=1
+        )
+        return filling_lists[is_legal]
+
+    def get_condiment_lists(self) -> NDArray[np.uint8]:
+        """Return every legal multiset of condiments (including the required
+        Herba Mystica) as a matrix of ingredient counts."""
+        herba_mystica_ids = self.herba_mystica_ids.tolist()
+        condiment_ids = self.condiment_ids.tolist()
+        min_condiments = 1 if self.num_herba_mystica == 0 else 0
+        max_condiments = self.max_condiments - self.num_herba_mystica
+        return self.to_ingredient_lists(
+            [
+                herba_mystica + condiments
+                for herba_mystica in combinations_with_replacement(
+                    herba_mystica_ids, self.num_herba_mystica
+                )
+                for num_condiments in range(min_condiments, max_condiments + 1)
+                for condiments in combinations_with_replacement(
+                    condiment_ids, num_condiments
+                )
+            ]
+        )
+
+    @staticmethod
+    def to_ingredient_lists(multisets: list[tuple[int, ...]]) -> NDArray[np.uint8]:
+        """Convert multisets of ingredient indices to a matrix of ingredient
+        counts."""
+        ingredient_lists = np.zeros(
+            (len(multisets), len(ingredient_data)), dtype=np.uint8
+        )
+        rows = np.repeat(np.arange(len(multisets)), [*map(len, multisets)])
+        columns = np.fromiter(chain.from_iterable(multisets), dtype=np.intp)
+        np.add.at(ingredient_lists, (rows, columns), 1)
+        return ingredient_lists
+
+    def make_state(self, ingredient_list: NDArray[np.intp]) -> RecipeState:
+        """Return a finished recipe state with the given ingredient counts."""
+        state = self.initial_state.copy()
+        for i in np.repeat(np.arange(len(ingredient_list)), ingredient_list):
+            state.add_ingredient(i.item())
+        state.is_finished = True
+        return state
+
+    @abstractmethod
+    def solve(self) -> list[RecipeState]:
+        """Return the recipes with the greatest reward."""
+        raise NotImplementedError
@@ -0,0 +1,371 @@
+__all__ = ["BranchAndBound"]
+
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Power
+from pokemon_gourmet.sandwich.batch import (
+    REWARD_GROWTH_FACTOR,
+    compute_rewards,
+)
+from pokemon_gourmet.sandwich.effect_calculation import (
+    BONUS_MAT,
+    calculate_batch_effects_from_sums,
+    compute_batch_levels,
+)
+from pokemon_gourmet.sandwich.ingredient_data import (
+    POWER_SLICE,
+    TYPE_SLICE,
+    ingredient_data,
+)
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+from pokemon_gourmet.suggester.solvers.base import MAX_REWARD, SOLVERS, Solver
+
+SPARKLING_IDX = Power.SPARKLING.value - 1
+
+
+def suffix_max(values: NDArray[np.intp]) -> NDArray[np.intp]:
+    """Return the maximum of each row and all the rows after it."""
+    return np.maximum.accumulate(values[::-1], axis=0)[::-1]
+
+
+class BranchAndBound(Solver):
+    """An exact engine that grows recipes one filling at a time and prunes
+    partial recipes that cannot match the best recipe found so far.
+
+    Effects are linear in ingredient counts until they are thresholded, so the
+    gap between two Power (or Type) sums reachable from a partial recipe is
+    bounded by its current gap plus the most negative gap contributed by any
+    filling that can still be added. If a target Power or Type is outranked by
+    three others in every completion, or the highest Types cannot reach the
+    Levels of the best recipe, the partial recipe and all its completions are
+    discarded. Once `max_results` recipes tie with the best reward, partial
+    recipes that can at most tie are discarded too.
+
+    Condiments (including Herba Mystica) are enumerated up front and fillings
+    are then added in index order, so every recipe is reached once. The search
+    is depth-first, but partial recipes are bounded, evaluated, and expanded in
+    batches.
+
+    Args:
+        initial_state: Empty recipe state holding the targets and limits
+        max_condiments: Maximum number of condiments (including Herba
+            Mystica) to include in recipe
+        min_level: Minimum (average) Level of the target effects
+        max_results: Maximum number of recipes returned, or None to return
+            them all (which prunes far fewer partial recipes)
+        max_expansions: Maximum number of partial recipes to expand. If the
+            best recipes found by then have the highest possible reward, they
+            are returned (without the remaining ties).
+        chunk_size: Number of partial recipes expanded at once
+    """
+
+    name = "branch_and_bound"
+
+    def __init__(
+        self,
+        initial_state: RecipeState,
+        max_condiments: Optional[int] = None,
+        min_level: int = 1,
+        max_results: Optional[int] = 100,
+        max_expansions: int = 2 * 10**5,
+        chunk_size: int = 2**14,
+    ) -> None:
+        super().__init__(initial_state, max_condiments, min_level, max_results)
+        self.max_expansions = max_expansions
+        self.chunk_size = chunk_size
+
+        self._fillings = self.filling_ids
+        self._max_counts = (
+            initial_state.single_ingredient_limit
+            // ingredient_data.pieces[self._fillings]
+        )
+        contributions = ingredient_data.contribution_mat[self._fillings]
+        self._contributions = contributions
+        # Largest Type contribution among the k-th filling and the next
+        self._type_max = suffix_max(contributions[:, TYPE_SLICE])
+        # Largest flavor bonus each Power can receive
+        self._max_bonus = BONUS_MAT.max(axis=(0, 1))
+
+        self._target_powers = np.array([target.power_idx for target in self.targets])
+        # Typeless targets (Egg Power) match any Type, so their Type gaps
+        # (computed for a placeholder Type) are ignored
+        self._is_typed = np.array(
+            [target.pokemon_type_idx is not None for target in self.targets]
+        )
+        self._target_types = np.array(
+            [
+                0 if target.pokemon_type_idx is None else target.pokemon_type_idx
+                for target in self.targets
+            ]
+        )
+        self._typed_types = self._target_types[self._is_typed]
+        # Smallest gap between every Power (or Type) and each target Power
+        # (or Type) contributed by the k-th filling and the next
+        power_contributions = contributions[:, POWER_SLICE]
+        type_contributions = contributions[:, TYPE_SLICE]
+        self._power_gap_min = -suffix_max(
+            power_contributions[:, self._target_powers, np.newaxis]
+            - power_contributions[:, np.newaxis, :]
+        )
+        self._type_gap_min = -suffix_max(
+            type_contributions[:, self._target_types, np.newaxis]
+            - type_contributions[:, np.newaxis, :]
+        )
+
+        self._best_reward = float("-inf")
+        self._best_recipes: list[NDArray[np.uint8]] = []
+        self._num_expanded = 0
+
+    @property
+    def threshold(self) -> float:
+        """Minimum upper bound of the reward of a partial recipe worth
+        expanding."""
+        return max(self._best_reward, self.min_reward)
+
+    def is_promising(self, bounds: NDArray[np.float64]) -> NDArray[np.bool_]:
+        """Return which partial recipes are worth expanding given an upper
+        bound of their reward."""
+        if self.is_full(len(self._best_recipes)):
+            # Ties with the best reward would be discarded anyway
+            return (bounds > self._best_reward) & (bounds >= self.min_reward)
+        return bounds >= self.threshold
+
+    def upper_bounds(
+        self, sums: NDArray[np.intp], start: NDArray[np.intp], num_fillings: int
+    ) -> NDArray[np.float64]:
+        """Return an upper bound of the reward of any recipe that completes
+        each partial recipe.
+
+        Args:
+            sums: Flavor, Power, and Type sums of the partial recipes
+            start: Position of the first filling that can still be added to
+                each partial recipe
+            num_fillings: Number of fillings in the partial recipes
+
+        Returns:
+            Upper bound of the reward of each partial recipe
+        """
+        remaining = self.max_fillings - num_fillings
+        required = max(0, self.min_fillings - num_fillings)
+
+        def extend(values, smallest_or_largest, is_favorable):
+            # Add the most favorable (or least unfavorable) fillings
+            if remaining == 0:
+                return values
+            return values + np.where(
+                is_favorable,
+                remaining * smallest_or_largest,
+                required * smallest_or_largest,
+            )
+
+        # No reward can exceed that of matching every target at the highest
+        # Levels the Type sums can reach. Levels only grow with the three
+        # highest Types, which are at most the three highest Type bounds.
+        type_max = self._type_max[start]
+        type_high = extend(sums[:, TYPE_SLICE], type_max, type_max > 0)
+        top_types = -np.partition(-type_high, 2, axis=1)[:, :3]
+        top_types.sort(axis=1)
+        max_levels = compute_batch_levels(top_types[:, ::-1])
+        level_sum = max_levels[:, : len(self.targets)].mean(axis=1) - 1
+        bounds = 2 ** (REWARD_GROWTH_FACTOR * level_sum)
+
+        # Refine the bound of the partial recipes that could still qualify
+        candidates = np.flatnonzero(self.is_promising(bounds))
+        sums = sums[candidates]
+        start = start[candidates]
+        power_sums = sums[:, POWER_SLICE]
+        type_sums = sums[:, TYPE_SLICE]
+        power_gap_min = self._power_gap_min[start]
+        type_gap_min = self._type_gap_min[start]
+        power_gaps = extend(
+            power_sums[:, np.newaxis, :]
+            - power_sums[:, self._target_powers, np.newaxis]
+            - self._max_bonus[self._target_powers, np.newaxis],
+            power_gap_min,
+            power_gap_min < 0,
+        )
+        type_gaps = extend(
+            type_sums[:, np.newaxis, :] - type_sums[:, self._target_types, np.newaxis],
+            type_gap_min,
+            type_gap_min < 0,
+        )
+        # Sparkling Power is forced to zero if it is below 2000, so it is never
+        # assumed to outrank a target Power
+        power_gaps[:, :, SPARKLING_IDX] = -1
+        # A target is reachable unless three Powers (or Types) are guaranteed
+        # to outrank it
+        num_reachable = np.sum(
+            (np.sum(power_gaps > 0, axis=2) < 3)
+            & ((np.sum(type_gaps > 0, axis=2) < 3) | ~self._is_typed),
+            axis=1,
+        )
+        bounds[candidates] = np.where(
+            num_reachable == len(self.targets),
+            bounds[candidates],
+            num_reachable / len(self.targets),
+        )
+        return bounds
+
+    def expand(
+        self,
+        sums: NDArray[np.intp],
+        start: NDArray[np.intp],
+        counts: NDArray[np.intp],
+        num_fillings: int,
+    ) -> tuple[NDArray, ...]:
+        """Add one more filling to each partial recipe, discarding the new
+        recipes that cannot match the best recipe found so far.
+
+        Args:
+            sums: Flavor, Power, and Type sums of the partial recipes
+            start: Position of the last filling added to each partial recipe
+            counts: Number of times the last filling was added
+            num_fillings: Number of fillings in the partial recipes
+
+        Returns:
+            Tuple of parent indices, last filling positions, repeat counts,
+            sums, and reward upper bounds of the new partial recipes
+        """
+        # Fillings are added in order, so only the last one can repeat
+        num_children = len(self._fillings) - start
+        parents = np.repeat(np.arange(len(sums)), num_children)
+        offsets = np.arange(len(parents)) - np.repeat(
+            np.cumsum(num_children) - num_children, num_children
+        )
+        positions = start[parents] + offsets
+        child_counts = np.where(
+            (offsets == 0) & (num_fillings > 0), counts[parents] + 1, 1
+        )
+        is_legal = child_counts <= self._max_counts[positions]
+        parents = parents[is_legal]
+        positions = positions[is_legal]
+        child_counts = child_counts[is_legal]
+
+        child_sums = sums[parents] + self._contributions[positions]
+        if num_fillings + 1 < self.max_fillings:
+            bounds = self.upper_bounds(child_sums, positions, num_fillings + 1)
+        else:
+            # Complete recipes are cheaper to evaluate than to bound
+            bounds = np.full(len(child_sums), np.inf)
+        keep = self.is_promising(bounds)
+        return (
+            parents[keep],
+            positions[keep],
+            child_counts[keep],
+            child_sums[keep],
+            bounds[keep],
+        )
+
+    def add_fillings(
+        self,
+        ingredient_lists: NDArray[np.uint8],
+        parents: NDArray[np.intp],
+        positions: NDArray[np.intp],
+    ) -> NDArray[np.uint8]:
+        """Return the ingredient lists of the given parents with one more
+        filling each."""
+        child_lists = ingredient_lists[parents]
+        child_lists[np.arange(len(parents)), self._fillings[positions]] += 1
+        return child_lists
+
+    def evaluate(self, sums: NDArray[np.intp]) -> NDArray[np.intp]:
+        """Compute the reward of a batch of recipes and return the indices of
+        those to keep among the best found so far."""
+        effects = calculate_batch_effects_from_sums(sums)
+        rewards = compute_rewards(effects, self.targets)
+        max_reward = rewards.max()
+        if max_reward > self._best_reward:
+            self._best_reward = max_reward
+            self._best_recipes = []
+        best_ids = np.flatnonzero(rewards == self._best_reward)
+        if self.max_results is not None:
+            best_ids = best_ids[: self.max_results - len(self._best_recipes)]
+        return best_ids
+
+    def search(
+        self,
+        ingredient_lists: NDArray[np.uint8],
+        sums: NDArray[np.intp],
+        start: NDArray[np.intp],
+        counts: NDArray[np.intp],
+        bounds: NDArray[np.float64],
+        num_fillings: int,
+    ) -> None:
+        """Search the completions of a batch of partial recipes, most
+        promising first."""
+        # Break ties between bounds with the target Power and Type sums, so
+        # that good recipes are found (and prune the others) early
+        closeness = sums[:, POWER_SLICE][:, self._target_powers].sum(axis=1)
+        closeness += sums[:, TYPE_SLICE][:, self._typed_types].sum(axis=1)
+        order = np.lexsort((-closeness, -bounds))
+        step = max(1, self.chunk_size // len(self._fillings))
+        for i in range(0, len(order), step):
+            if self._num_expanded >= self.max_expansions:
+                if self._best_reward >= MAX_REWARD:
+                    return  # Only ties with the best reward can be left
+                raise_level = "the minimum Level or " if self.min_level < 3 else ""
+                raise ValueError(
+                    f"Too many partial recipes (over {self.max_expansions:,}). "
+                    f"Raise {raise_level}`max_expansions`, or lower the maximum "
+                    "number of fillings."
+                )
+            chunk = order[i : i + step]
+            chunk = chunk[self.is_promising(bounds[chunk])]
+            if len(chunk) == 0:
+                # Bounds are sorted, so no other partial recipe can qualify
+                break
+            self._num_expanded += len(chunk)
+            parents, positions, child_counts, child_sums, child_bounds = self.expand(
+                sums[chunk], start[chunk], counts[chunk], num_fillings
+            )
+            if len(parents) == 0:
+                continue
+            # Ingredient lists are only built for recipes that are kept
+            parent_lists = ingredient_lists[chunk]
+            if num_fillings + 1 >= self.min_fillings:
+                best_ids = self.evaluate(child_sums)
+                self._best_recipes.extend(
+                    self.add_fillings(
+                        parent_lists, parents[best_ids], positions[best_ids]
+                    )
+                )
+            if num_fillings + 1 < self.max_fillings:
+                child_lists = self.add_fillings(parent_lists, parents, positions)
+                self.search(
+                    child_lists,
+                    child_sums,
+                    positions,
+                    child_counts,
+                    child_bounds,
+                    num_fillings + 1,
+                )
+
+    def solve(self) -> list[RecipeState]:
+        """Return the recipes with the greatest reward (the first
+        `max_results` found).
+
+        Raises:
+            ValueError: If more partial recipes than permitted must be
+                expanded to prove the best reward.
+        """
+        self._best_reward = float("-inf")
+        self._best_recipes = []
+        self._num_expanded = 0
+
+        condiments = self.get_condiment_lists()
+        sums = condiments @ ingredient_data.contribution_mat
+        start = np.zeros(len(condiments), dtype=int)
+        bounds = self.upper_bounds(sums, start, 0)
+        self.search(condiments, sums, start, start, bounds, 0)
+
+        if not self.is_acceptable(self._best_reward):
+            return []
+        return [
+            self.make_state(ingredient_list) for ingredient_list in self._best_recipes
+        ]
+
+
+SOLVERS[BranchAndBound.name] = BranchAndBound
@@ -0,0 +1,108 @@
+__all__ = ["ExhaustiveSearch"]
+
+from typing import Optional
+
+import numpy as np
+
+from pokemon_gourmet.sandwich.batch import compute_rewards
+from pokemon_gourmet.sandwich.effect_calculation import (
+    calculate_batch_effects_from_sums,
+)
+from pokemon_gourmet.sandwich.ingredient_data import ingredient_data
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+from pokemon_gourmet.suggester.solvers.base import SOLVERS, Solver
+
+
+class ExhaustiveSearch(Solver):
+    """An exact engine that enumerates every legal combination of fillings and
+    condiments and evaluates them in batches.
+
+    Unlike Monte Carlo tree search, results are deterministic and guaranteed to
+    be optimal, but the number of combinations grows quickly with the recipe
+    size, so this engine is only practical for small recipes.
+
+    Args:
+        initial_state: Empty recipe state holding the targets and limits
+        max_condiments: Maximum number of condiments (including Herba
+            Mystica) to include in recipe
+        min_level: Minimum (average) Level of the target effects
+        max_results: Maximum number of recipes returned, or None to return
+            them all
+        max_candidates: Maximum number of recipes to evaluate
+        chunk_size: Number of recipes evaluated at once
+
+    Raises:
+        ValueError: If there are more candidate recipes than permitted
+    """
+
+    name = "exhaustive"
+    default_max_fillings = 2
+
+    def __init__(
+        self,
+        initial_state: RecipeState,
+        max_condiments: Optional[int] = None,
+        min_level: int = 1,
+        max_results: Optional[int] = 100,
+        max_candidates: int = 10**7,
+        chunk_size: int = 2**16,
+    ) -> None:
+        super().__init__(initial_state, max_condiments, min_level, max_results)
+        # Count candidates up front, since building them takes as much memory
+        num_candidates = self.num_filling_lists * self.num_condiment_lists
+        if num_candidates > max_candidates:
+            raise ValueError(
+                f"Too many candidate recipes ({num_candidates:,}). Lower the "
+                "maximum number of fillings or condiments."
+            )
+        self.max_candidates = max_candidates
+        self.chunk_size = chunk_size
+
+    def solve(self) -> list[RecipeState]:
+        """Return the recipes with the greatest reward (the first
+        `max_results` found)."""
+        fillings = self.get_filling_lists()
+        condiments = self.get_condiment_lists()
+
+        # Effects are linear in ingredient counts until thresholding, so the
+        # sums of a recipe are the sums of its fillings plus its condiments
+        filling_sums = fillings @ ingredient_data.contribution_mat
+        condiment_sums = condiments @ ingredient_data.contribution_mat
+
+        best_reward = float("-inf")
+        best_recipes = []
+        filling_step = min(len(fillings), self.chunk_size)
+        condiment_step = max(1, self.chunk_size // filling_step)
+        for i in range(0, len(condiments), condiment_step):
+            for j in range(0, len(fillings), filling_step):
+                sums = (
+                    condiment_sums[i : i + condiment_step, np.newaxis, :]
+                    + filling_sums[np.newaxis, j : j + filling_step, :]
+                )
+                num_fillings = sums.shape[1]
+                effects = calculate_batch_effects_from_sums(
+                    sums.reshape(-1, sums.shape[2])
+                )
+                rewards = compute_rewards(effects, self.targets)
+                max_reward = rewards.max()
+                if max_reward < best_reward:
+                    continue
+                if max_reward > best_reward:
+                    best_reward = max_reward
+                    best_recipes = []
+                elif self.is_full(len(best_recipes)):
+                    continue
+                best_ids = np.flatnonzero(rewards == max_reward)
+                if self.max_results is not None:
+                    best_ids = best_ids[: self.max_results - len(best_recipes)]
+                for k in best_ids.tolist():
+                    condiment_idx, filling_idx = divmod(k, num_fillings)
+                    best_recipes.append(
+                        condiments[i + condiment_idx] + fillings[j + filling_idx]
+                    )
+        if not self.is_acceptable(best_reward):
+            return []
+        return [self.make_state(ingredient_list) for ingredient_list in best_recipes]
+
+
+SOLVERS[ExhaustiveSearch.name] = ExhaustiveSearch
@@ -0,0 +1,335 @@
+__all__ = ["MeetInTheMiddle"]
+
+from typing import Iterator, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pokemon_gourmet.enums import Power
+from pokemon_gourmet.sandwich.batch import (
+    REWARD_GROWTH_FACTOR,
+    compute_rewards,
+)
+from pokemon_gourmet.sandwich.effect_calculation import (
+    BONUS_MAT,
+    calculate_batch_effects_from_sums,
+)
+from pokemon_gourmet.sandwich.ingredient_data import (
+    POWER_SLICE,
+    TYPE_SLICE,
+    ingredient_data,
+)
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+from pokemon_gourmet.suggester.solvers.base import (
+    LEVEL_THRESHOLDS,
+    MAX_REWARD,
+    SOLVERS,
+    Solver,
+)
+
+SPARKLING_IDX = Power.SPARKLING.value - 1
+
+
+class MeetInTheMiddle(Solver):
+    """An exact engine that splits recipes into a filling half and a
+    condiment half and joins them on the Level they can reach.
+
+    Fillings and condiments have separate limits and their contributions add
+    up, so the sums of every filling multiset and every condiment multiset are
+    computed once, on the first query (see `build`). Filling sums are sorted
+    per Type, so the fillings that lift any Type of a condiment multiset over
+    a Level threshold are found by binary search. Recipes are then evaluated
+    one Level at a time, highest first, and the search stops as soon as no
+    lower Level can match the best recipe found so far.
+
+    Both halves are held in memory (about 350 bytes per filling multiset), so
+    their size is checked when the solver is created, before they are built.
+
+    Args:
+        initial_state: Empty recipe state holding the targets and limits
+        max_condiments: Maximum number of condiments (including Herba
+            Mystica) to include in recipe
+        min_level: Minimum (average) Level of the target effects
+        max_results: Maximum number of recipes returned, or None to return
+            them all
+        max_half_size: Maximum number of filling (or condiment) multisets
+        max_candidates: Maximum number of recipes to evaluate. If the best
+            recipes found by then have the highest possible reward, they are
+            returned (without the remaining ties).
+        chunk_size: Number of recipes evaluated at once
+
+    Raises:
+        ValueError: If there are more multisets than permitted
+    """
+
+    name = "meet_in_the_middle"
+    default_max_fillings = 5
+
+    def __init__(
+        self,
+        initial_state: RecipeState,
+        max_condiments: Optional[int] = None,
+        min_level: int = 1,
+        max_results: Optional[int] = 100,
+        max_half_size: int = 10**6,
+        max_candidates: int = 10**7,
+        chunk_size: int = 2**16,
+    ) -> None:
+        super().__init__(initial_state, max_condiments, min_level, max_results)
+        # Count multisets up front, since building them takes far more memory
+        num_multisets = max(self.num_filling_lists, self.num_condiment_lists)
+        if num_multisets > max_half_size:
+            raise ValueError(
+                f"Too many ingredient multisets ({num_multisets:,}). Lower the "
+                "maximum number of fillings or condiments."
+            )
+        self.max_half_size = max_half_size
+        self.max_candidates = max_candidates
+        self.chunk_size = chunk_size
+
+        # Both halves are built on the first query
+        num_ingredients, num_sums = ingredient_data.contribution_mat.shape
+        self.filling_lists = np.zeros((0, num_ingredients), dtype=np.uint8)
+        self.condiment_lists = np.zeros((0, num_ingredients), dtype=np.uint8)
+        self.filling_sums = np.zeros((0, num_sums), dtype=np.int32)
+        self.condiment_sums = np.zeros((0, num_sums), dtype=np.int32)
+        self._type_order = np.zeros((0, 0), dtype=np.int32)
+        self._sorted_types = np.zeros((0, 0), dtype=np.int32)
+        self._condiment_order = np.zeros(0, dtype=int)
+        self._is_built = False
+
+        self._target_powers = np.array([target.power_idx for target in self.targets])
+        # Typeless targets (Egg Power) match any Type, so only Powers are
+        # checked for them
+        self._typed_types = np.array(
+            [
+                target.pokemon_type_idx
+                for target in self.targets
+                if target.pokemon_type_idx is not None
+            ],
+            dtype=int,
+        )
+        self._max_bonus = BONUS_MAT.max(axis=(0, 1))
+
+        self._best_reward = float("-inf")
+        self._best_pairs: list[tuple[NDArray[np.intp], NDArray[np.intp]]] = []
+        self._num_best = 0
+        self._num_evaluated = 0
+
+    def build(self) -> None:
+        """Enumerate the filling and condiment multisets, compute their sums,
+        and sort the filling sums by each Type (only once)."""
+        if self._is_built:
+            return
+        # Sums fit in 32 bits, which halves the memory taken by the halves
+        contribution_mat = ingredient_data.contribution_mat.astype(np.int32)
+        self.filling_lists = self.get_filling_lists()
+        self.condiment_lists = self.get_condiment_lists()
+        self.filling_sums = self.filling_lists @ contribution_mat
+        self.condiment_sums = self.condiment_lists @ contribution_mat
+        # Filling multisets sorted by each Type sum
+        filling_types = self.filling_sums[:, TYPE_SLICE]
+        type_order = np.argsort(filling_types, axis=0, kind="stable")
+        self._type_order = type_order.T.astype(np.int32)
+        self._sorted_types = np.take_along_axis(
+            filling_types, self._type_order.T, axis=0
+        ).T
+        # Condiment multisets closest to the targets are joined first, so
+        # that good recipes are found (and end the search) early
+        power_sums = self.condiment_sums[:, POWER_SLICE][:, self._target_powers]
+        type_sums = self.condiment_sums[:, TYPE_SLICE][:, self._typed_types]
+        closeness = power_sums.sum(axis=1) + type_sums.sum(axis=1)
+        self._condiment_order = np.argsort(-closeness, kind="stable")
+        self._is_built = True
+
+    def join(self, min_type: float) -> Iterator[tuple[int, NDArray[np.intp]]]:
+        """Yield each condiment multiset with the filling multisets that lift
+        at least one Type sum to a minimum value.
+
+        Args:
+            min_type: Minimum value of the highest Type sum
+
+        Yields:
+            Index of the condiment multiset and indices of the filling
+            multisets
+        """
+        if min_type == -np.inf:
+            all_fillings = np.arange(len(self.filling_sums))
+            for condiment_idx in self._condiment_order.tolist():
+                yield condiment_idx, all_fillings
+            return
+        condiment_types = self.condiment_sums[:, TYPE_SLICE]
+        start = np.stack(
+            [
+                np.searchsorted(sorted_types, min_type - condiment_types[:, u])
+                for u, sorted_types in enumerate(self._sorted_types)
+            ],
+            axis=1,
+        )
+        for condiment_idx in self._condiment_order.tolist():
+            type_start = start[condiment_idx]
+            is_joined = np.zeros(len(self.filling_sums), dtype=bool)
+            for order, i in zip(self._type_order, type_start):
+                is_joined[order[i:]] = True
+            filling_ids = np.flatnonzero(is_joined)
+            if len(filling_ids) > 0:
+                yield condiment_idx, filling_ids
+
+    def can_match_targets(self, sums: NDArray[np.intp]) -> NDArray[np.bool_]:
+        """Return which recipes could match every target, which is necessary
+        for them to score at least one.
+
+        A target Power (or Type) cannot be matched if three other Powers (or
+        Types) have greater sums, even after adding the flavor bonus, that is
+        if its sum is below the third highest.
+        """
+        powers = np.unique(self._target_powers)
+        types = np.unique(self._typed_types)
+        power_sums = sums[:, POWER_SLICE].copy()
+        sparkling = power_sums[:, SPARKLING_IDX]
+        sparkling[sparkling < 2000] = 0
+        type_sums = sums[:, TYPE_SLICE]
+        third_power = np.partition(power_sums, -3, axis=1)[:, -3:-2]
+        third_type = np.partition(type_sums, -3, axis=1)[:, -3:-2]
+        return np.all(
+            power_sums[:, powers] + self._max_bonus[powers] >= third_power, axis=1
+        ) & np.all(type_sums[:, types] >= third_type, axis=1)
+
+    def evaluate(
+        self,
+        condiment_ids: NDArray[np.intp],
+        filling_ids: NDArray[np.intp],
+        min_type: float = -np.inf,
+        max_type: float = np.inf,
+        match_all: bool = False,
+    ) -> None:
+        """Evaluate pairs of condiment and filling multisets and keep the
+        best ones.
+
+        Args:
+            condiment_ids: Indices of the condiment multisets
+            filling_ids: Indices of the filling multisets
+            min_type: Minimum value of the highest Type sum
+            max_type: Maximum value (exclusive) of the highest Type sum
+            match_all: Whether to skip recipes that cannot match every target
+        """
+        sums = self.condiment_sums[condiment_ids] + self.filling_sums[filling_ids]
+        type_max = sums[:, TYPE_SLICE].max(axis=1)
+        keep = (type_max >= min_type) & (type_max < max_type)
+        if match_all:
+            keep &= self.can_match_targets(sums)
+        if not np.any(keep):
+            return
+        effects = calculate_batch_effects_from_sums(sums[keep])
+        rewards = compute_rewards(effects, self.targets)
+        max_reward = rewards.max()
+        if max_reward < self._best_reward:
+            return
+        if max_reward > self._best_reward:
+            self._best_reward = max_reward
+            self._best_pairs = []
+            self._num_best = 0
+        best_ids = np.flatnonzero(rewards == max_reward)
+        if self.max_results is not None:
+            best_ids = best_ids[: self.max_results - self._num_best]
+        self._best_pairs.append(
+            (condiment_ids[keep][best_ids], filling_ids[keep][best_ids])
+        )
+        self._num_best += len(best_ids)
+
+    def is_done(self, max_reward: float) -> bool:
+        """Return whether no recipe left to evaluate (scoring at most a given
+        reward) can be kept."""
+        if self.is_full(self._num_best):
+            return max_reward <= self._best_reward
+        return max_reward < max(self._best_reward, self.min_reward)
+
+    def spend(self, num_pairs: int) -> bool:
+        """Count pairs about to be evaluated and return whether there are
+        candidates left to evaluate them.
+
+        Raises:
+            ValueError: If there are no candidates left and the best reward
+                is not proven.
+        """
+        if self._num_evaluated + num_pairs > self.max_candidates:
+            if self._best_reward >= MAX_REWARD:
+                return False  # Only ties with the best reward can be left
+            raise_level = "the minimum Level or " if self.min_level < 3 else ""
+            raise ValueError(
+                f"Too many candidate recipes (over {self.max_candidates:,}). "
+                f"Raise {raise_level}`max_candidates`, or lower the maximum "
+                "number of fillings or condiments."
+            )
+        self._num_evaluated += num_pairs
+        return True
+
+    def evaluate_join(
+        self, min_type: float = -np.inf, max_reward: float = np.inf, **kwargs
+    ) -> None:
+        """Evaluate the pairs of condiment and filling multisets that lift at
+        least one Type sum to a minimum value, in batches, until no recipe
+        scoring at most `max_reward` can be kept."""
+        pairs, num_pairs = [], 0
+        for condiment_idx, filling_ids in self.join(min_type):
+            pairs.append((np.full(len(filling_ids), condiment_idx), filling_ids))
+            num_pairs += len(filling_ids)
+            if num_pairs >= self.chunk_size:
+                if not self.spend(num_pairs):
+                    return
+                self.evaluate(*map(np.concatenate, zip(*pairs)), min_type, **kwargs)
+                pairs, num_pairs = [], 0
+                if self.is_done(max_reward):
+                    return
+        if pairs and self.spend(num_pairs):
+            self.evaluate(*map(np.concatenate, zip(*pairs)), min_type, **kwargs)
+
+    def solve(self) -> list[RecipeState]:
+        """Return the recipes with the greatest reward (the first
+        `max_results` found).
+
+        Raises:
+            ValueError: If there are more ingredient multisets than permitted,
+                or if more candidate recipes than permitted must be evaluated
+                to prove the best reward.
+        """
+        self.build()
+        self._best_reward = float("-inf")
+        self._best_pairs = []
+        self._num_best = 0
+        self._num_evaluated = 0
+
+        # Matching every target scores at least one, more than any partial
+        # match, so look for those recipes first, one Level at a time
+        levels = (-np.inf, *LEVEL_THRESHOLDS.tolist(), np.inf)
+        for level in range(3, 0, -1):
+            max_reward = 2 ** (REWARD_GROWTH_FACTOR * (level - 1))
+            if self.is_done(max_reward):
+                break
+            self.evaluate_join(
+                levels[level - 1],
+                max_reward,
+                max_type=levels[level],
+                match_all=True,
+            )
+        if self._best_reward < 1 and self.min_reward < 1:
+            # Otherwise, fall back to every recipe
+            self._best_reward = float("-inf")
+            self._best_pairs = []
+            self._num_best = 0
+            self.evaluate_join()
+
+        if not self.is_acceptable(self._best_reward):
+            return []
+        return [
+            self.make_state(
+                self.condiment_lists[condiment_idx] + self.filling_lists[filling_idx]
+            )
+            for condiment_ids, filling_ids in self._best_pairs
+            for condiment_idx, filling_idx in zip(
+                condiment_ids.tolist(), filling_ids.tolist()
+            )
+        ]
+
+
+SOLVERS[MeetInTheMiddle.name] = MeetInTheMiddle
@@ -0,0 +1,62 @@
+import pytest
+
+from pokemon_gourmet.enums import Power
+from pokemon_gourmet.suggester.atlas import (
+    TargetAtlas,
+    build_atlas,
+    iter_target_combinations,
+    search_params,
+    target_key,
+)
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.solvers.base import MAX_REWARD
+
+
+def test_target_key():
+    targets = [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+    key = target_key(parse_targets(targets))
+    assert key == target_key(parse_targets(targets[::-1]))
+    assert key != target_key(parse_targets(targets[:2]))
+
+    combinations = list(iter_target_combinations(2))
+    assert len({target_key(targets) for targets in combinations}) == len(combinations)
+    assert any(Power.EGG in targets for targets in combinations)
+    assert all(
+        Power.TITLE in targets for targets in combinations if Power.SPARKLING in targets
+    )
+
+
+def test_atlas(tmp_path):
+    path = tmp_path / "atlas.npz"
+    targets = [("egg", None), ("catching", "fire")]
+    atlas = build_atlas(
+        path,
+        [targets],
+        top_k=3,
+        max_fillings=1,
+        engine="exhaustive",
+        max_condiments=2,
+    )
+    assert len(atlas) == 1
+
+    atlas = TargetAtlas.load(path)
+    recipes = atlas.lookup(targets[::-1])
+    assert recipes is not None and len(recipes) == 3
+    assert all(
+        recipe.is_finished and recipe.targets == parse_targets(targets)
+        for recipe in recipes
+    )
+    assert recipes[0].reward == max(recipe.reward for recipe in recipes)
+    # Every target, including typeless Egg Power, is matched
+    assert all(recipe.reward >= 1 for recipe in recipes)
+    assert targets in atlas
+    assert atlas.lookup([("egg", None)]) is None
+
+    # The search parameters are saved, and lookups respect tighter limits
+    assert atlas.params == search_params("exhaustive", 1, 2)
+    recipes = atlas.lookup(targets, max_condiments=1)
+    assert all(recipe.num_condiments <= 1 for recipe in recipes)
+    recipes = atlas.lookup(targets, min_level=3)
+    assert all(recipe.reward >= MAX_REWARD for recipe in recipes)
+    with pytest.raises(ValueError):
+        build_atlas(path, [targets], max_fillings=2, engine="exhaustive")
@@ -0,0 +1,28 @@
+from pokemon_gourmet.cache import CacheInfo, LRUCache
+from pokemon_gourmet.sandwich import Recipe, effect_cache
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1  # "b" becomes least recently used
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.info() == CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+
+    cache.resize(1)
+    assert len(cache) == 1 and "c" in cache
+
+
+def test_effect_cache_shared_across_recipes():
+    effect_cache.clear()
+    recipe = Recipe(*["Rice"] * 5, "Bitter Herba Mystica")
+    effects = recipe.effects
+    assert effect_cache.info().misses == 1
+
+    same_recipe = Recipe("Bitter Herba Mystica", *["Rice"] * 5)
+    assert same_recipe.key == recipe.key
+    assert same_recipe.effects.tuples == effects.tuples
+    assert effect_cache.info().hits == 1
@@ -0,0 +1,48 @@
+import numpy as np
+
+from pokemon_gourmet.enums import Flavor, Power, Type
+from pokemon_gourmet.sandwich import ingredient_data
+from pokemon_gourmet.sandwich.contribution_index import contribution_index
+from pokemon_gourmet.suggester import mcts
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts.action import FinishSandwich
+
+
+def test_contribution_index():
+    tofu = ingredient_data.index("Tofu")
+    assert tofu in contribution_index.positive(Power.ENCOUNTER)
+    assert tofu not in contribution_index.negative(Type.NORMAL)
+    for i, power in enumerate(Power):
+        assert np.array_equal(
+            contribution_index.positive(power),
+            np.flatnonzero(ingredient_data.power_mat[:, i] > 0),
+        )
+    # Flavor combos are ordered, so an ingredient favors at most one of a pair
+    i, j = Flavor.SWEET.value - 1, Flavor.BITTER.value - 1
+    assert not np.any(
+        contribution_index.flavor_combo_positive[i, j]
+        & contribution_index.flavor_combo_positive[j, i]
+    )
+
+
+def test_pruned_actions():
+    targets = parse_targets([("title", "normal"), ("humungo", "normal")])
+    full_state = mcts.RecipeState(targets)
+    pruned_state = mcts.RecipeState(targets, prune_actions=True)
+    full_actions = full_state.get_possible_actions()
+    pruned_actions = pruned_state.get_possible_actions()
+    assert 0 < len(pruned_actions) < len(full_actions)
+    assert set(pruned_actions) <= set(full_actions)
+
+    is_relevant = contribution_index.get_relevant_ingredients(targets)
+    for action in pruned_actions:
+        # Herba Mystica is forced by Title Power, regardless of relevance
+        assert is_relevant[action.filling_idx]
+        assert ingredient_data.is_herba_mystica[action.condiment_idx]
+
+    state = pruned_state.move(pruned_actions[0])
+    actions = state.get_possible_actions()
+    assert any(isinstance(action, FinishSandwich) for action in actions)
+    for action in actions:
+        if not isinstance(action, FinishSandwich):
+            assert is_relevant[action.ingredient_idx]
@@ -1,5 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
 from pokemon_gourmet.enums import Power, Type
-from pokemon_gourmet.sandwich import Effect, Recipe
+from pokemon_gourmet.sandwich import (
+    Effect,
+    EffectList,
+    Recipe,
+    calculate_batch_effects,
+    calculate_effects,
+    compute_effects,
+    effect_cache,
+    ingredient_data,
+)
+from pokemon_gourmet.sandwich.effect_backends import EFFECT_BACKENDS
 
 
 def test_herba_mystica_recipes():
@@ -484,3 +499,49 @@ def test_split_types():
     assert effects[0] == Effect.from_enums(Power.ENCOUNTER, Type.STEEL, 1)
     assert effects[1] == Effect.from_enums(Power.EXP_POINT, Type.STEEL, 1)
     assert effects[2] == Effect.from_enums(Power.CATCHING, Type.ROCK, 1)
+
+
+def test_batch_effects():
+    recipes = [
+        Recipe(*["Rice"] * 5, "Bitter Herba Mystica"),
+        Recipe(*["Rice"] * 6, *["Wasabi"] * 2, *["Curry Powder"] * 2),
+        Recipe(*["Hamburger"] * 5, "Butter"),
+        Recipe(*["Prosciutto"] * 4, "Watercress", "Salt"),
+        Recipe("Onion", "Onion", "Onion", "Onion", "Strawberry", "Salt"),
+    ]
+    ingredient_lists = np.stack([recipe._ingredient_list for recipe in recipes])
+    batch_effects = calculate_batch_effects(ingredient_lists)
+    assert batch_effects.shape == (len(recipes), 3, 3)
+    for recipe, effects in zip(recipes, batch_effects):
+        assert EffectList(effects).tuples == recipe.effects.tuples
+
+
+@pytest.mark.parametrize("backend_name", EFFECT_BACKENDS)
+def test_effect_backends(backend_name: str):
+    rng = np.random.default_rng(0)
+    backend = EFFECT_BACKENDS[backend_name]()
+    reference = EFFECT_BACKENDS["numpy"]()
+    for _ in range(500):
+        ingredients = rng.integers(0, len(ingredient_data), rng.integers(1, 11))
+        recipe = Recipe(*ingredients.tolist())
+        assert np.array_equal(backend(recipe), reference(recipe))
+
+
+def test_concurrent_effects():
+    rng = np.random.default_rng(0)
+    recipes = [
+        Recipe(*rng.integers(0, len(ingredient_data), rng.integers(1, 11)).tolist())
+        for _ in range(2000)
+    ]
+    expected = calculate_batch_effects(
+        np.stack([recipe._ingredient_list for recipe in recipes])
+    )
+    effect_cache.clear()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        computed = list(executor.map(calculate_effects, recipes))
+        cached = list(executor.map(lambda recipe: recipe.effects.tuples, recipes))
+    assert calculate_effects.recipe is None
+    for recipe, effects, tuples, reference in zip(recipes, computed, cached, expected):
+        assert np.array_equal(effects, reference)
+        assert np.array_equal(compute_effects(recipe), reference)
+        assert tuples == EffectList(reference).tuples
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pokemon_gourmet.enums import Power, Type
+from pokemon_gourmet.sandwich import (
+    Recipe,
+    calculate_effects,
+    set_effect_database,
+)
+from pokemon_gourmet.sandwich.effect_database import (
+    MAX_DATABASE_INGREDIENTS,
+    build_effect_database,
+    pack_ingredients,
+    unpack_key,
+)
+
+
+def make_recipe(key):
+    ingredient_list = unpack_key(key)
+    return Recipe(*np.repeat(np.arange(len(ingredient_list)), ingredient_list).tolist())
+
+
+def test_pack_ingredients():
+    recipe = Recipe("Jam", "Rice", "Rice", "Banana")
+    key = pack_ingredients(recipe._ingredient_list)
+    assert key == pack_ingredients(
+        Recipe("Rice", "Banana", "Jam", "Rice")._ingredient_list
+    )
+    assert np.array_equal(unpack_key(key), recipe._ingredient_list)
+    assert pack_ingredients(recipe._ingredient_list[np.newaxis])[0] == key
+
+
+def test_effect_database(tmp_path):
+    path = tmp_path / "effects.db"
+    database = build_effect_database(path, max_ingredients=3)
+    assert np.all(database.keys[1:] > database.keys[:-1])
+
+    rng = np.random.default_rng(0)
+    for key in rng.choice(database.keys, 100):
+        recipe = make_recipe(key)
+        assert recipe.is_legal
+        expected = calculate_effects.compute_effects_from_sums(recipe._sums)
+        assert np.array_equal(database.get(recipe), expected)
+    assert database.get(Recipe("Rice", "Rice", "Jam", "Jam")) is None
+
+    keys = database.find(Power.TITLE, Type.NORMAL)
+    assert len(keys) > 0
+    assert len(keys) == sum(
+        len(database.find(Power.TITLE, Type.NORMAL, level)) for level in range(1, 4)
+    )
+    for key in keys[:20]:
+        assert any(
+            effect.power == Power.TITLE and effect.pokemon_type == Type.NORMAL
+            for effect in make_recipe(key).effects
+        )
+
+    try:
+        set_effect_database(path)
+        recipe = Recipe("Rice", "Jam")
+        assert np.array_equal(
+            calculate_effects(recipe),
+            calculate_effects.compute_effects_from_sums(recipe._sums),
+        )
+    finally:
+        calculate_effects.database.close()
+        calculate_effects.database = None
+
+    database.close()
+    assert database.closed
+    assert database.get(Recipe("Rice", "Jam")) is None
+    with build_effect_database(path, max_ingredients=2) as database:
+        assert len(database.keys) > 0
+    assert database.closed
+    with pytest.raises(ValueError):
+        build_effect_database(path, max_ingredients=MAX_DATABASE_INGREDIENTS + 1)
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Import time budgets (in seconds), scaled on slow machines through the
+# `POKEMON_GOURMET_IMPORT_BUDGET_SCALE` environment variable
+IMPORT_BUDGETS = {
+    "pokemon_gourmet.sandwich": 0.5,
+    "pokemon_gourmet.suggester.cli": 0.75,
+}
+BUDGET_SCALE = float(os.environ.get("POKEMON_GOURMET_IMPORT_BUDGET_SCALE", 1))
+# Dependencies that should only be imported when needed
+DEFERRED_MODULES = ["griffe", "numba", "pandas", "streamlit"]
+# Subsystems the CLI only imports to run a command
+CLI_DEFERRED_MODULES = [
+    "pokemon_gourmet.suggester.atlas",
+    "pokemon_gourmet.suggester.generator",
+    "pokemon_gourmet.suggester.solvers",
+]
+
+
+def measure_import(module: str) -> tuple[float, set[str]]:
+    """Return the cumulative import time (in seconds) of a module in a fresh
+    interpreter, as reported by `python -X importtime`, and the names of
+    every module it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, us, name = line.split("|")
+        imported.add(name.strip())
+        if name.strip() == module:
+            cumulative = int(us) / 1e6
+    assert cumulative is not None
+    return cumulative, imported
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGETS)
+def test_import_time(module: str):
+    # The first run warms up the bytecode cache
+    timings = [measure_import(module) for _ in range(3)]
+    imported = timings[-1][1]
+    assert not {name.split(".")[0] for name in imported}.intersection(DEFERRED_MODULES)
+    if module == "pokemon_gourmet.suggester.cli":
+        assert not imported.intersection(CLI_DEFERRED_MODULES)
+    elapsed = min(cumulative for cumulative, _ in timings)
+    assert elapsed < IMPORT_BUDGETS[module] * BUDGET_SCALE
+
+
+def test_cli_engines():
+    from pokemon_gourmet.suggester.cli import ENGINES
+    from pokemon_gourmet.suggester.solvers import SOLVERS
+
+    assert ENGINES == ["mcts", *SOLVERS]
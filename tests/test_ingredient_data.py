@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from pokemon_gourmet.sandwich import ingredient_data
+from pokemon_gourmet.sandwich.ingredient_data import (
+    DATA_PATH,
+    _load_tables,
+    build_ingredient_cache,
+)
+
+
+def test_ingredient_cache(tmp_path):
+    data_path = tmp_path / "ingredient_data.csv"
+    cache_path = tmp_path / "ingredient_data.npz"
+    data_path.write_text(DATA_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+
+    tables = _load_tables(data_path, cache_path)
+    assert cache_path.exists()
+    assert tables["names"].tolist() == ingredient_data.names
+    assert np.array_equal(tables["type_mat"], ingredient_data.type_mat)
+    assert np.array_equal(tables["is_condiment"], ingredient_data.is_condiment)
+
+    # Editing the CSV file invalidates the cache
+    lines = data_path.read_text(encoding="utf-8").splitlines()
+    lines[1] = lines[1].replace("Mayonnaise", "Mayo")
+    data_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert _load_tables(data_path, cache_path)["names"][0] == "Mayo"
+    with np.load(cache_path) as data:
+        assert data["names"][0] == "Mayo"
+
+    build_ingredient_cache(data_path, cache_path)
+    assert _load_tables(data_path, cache_path)["names"][0] == "Mayo"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "ingredient_data.csv",
+        "ingredient_data.npz",
+    ]
+
+    # A partially written cache is rebuilt
+    cache_path.write_bytes(cache_path.read_bytes()[:100])
+    assert _load_tables(data_path, cache_path)["names"][0] == "Mayo"
+    with np.load(cache_path) as data:
+        assert data["names"][0] == "Mayo"
+
+
+def test_effects_without_pandas():
+    code = (
+        "import sys\n"
+        "from pokemon_gourmet.sandwich import Recipe\n"
+        "Recipe('Tofu', 'Salt').effects\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert 'pokemon_gourmet.suggester' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -140,3 +140,57 @@ def test_min_fillings_recipe(min_fillings: int):
         possible_actions = state.get_possible_actions()
 
     assert len(possible_actions) == 1
+
+
+def test_cached_actions():
+    targets = parse_targets([("humungo", "normal"), ("item_drop", "flying")])
+    state = mcts.RecipeState(targets)
+    state.add_ingredient("Ketchup")
+    state.add_ingredient("Tofu")
+    recipe_manager = mcts.recipe_manager
+    recipe_manager.clear()
+
+    first_actions = state.get_possible_actions()
+    # Actions are interned and listed from the cache for an equal state
+    other_actions = state.copy().get_possible_actions()
+    assert first_actions == other_actions
+    assert all(a is b for a, b in zip(first_actions, other_actions))
+
+    # Recipes added to the manager are still filtered out
+    next_state = state.move(mcts.SelectFilling(ingredient_data.index("Tofu")))
+    recipe_manager.add(next_state)
+    try:
+        actions = state.get_possible_actions()
+        assert len(actions) == len(first_actions) - 1
+        assert mcts.SelectFilling(ingredient_data.index("Tofu")) not in actions
+    finally:
+        recipe_manager.clear()
+
+
+def test_action_ids():
+    targets = parse_targets([("title", "normal"), ("humungo", "normal")])
+    state = mcts.RecipeState(targets)
+    for _ in range(4):
+        actions = state.get_possible_actions()
+        mask = state.legal_action_mask()
+        assert mask.shape == (mcts.NUM_ACTIONS,)
+        assert np.count_nonzero(mask) == len(actions)
+        assert np.array_equal(state.legal_action_ids(), np.flatnonzero(mask))
+        for action in actions:
+            assert mask[action.action_id]
+            assert mcts.action_table[action.action_id] is action
+        state = state.move(actions[-2])
+
+    assert mcts.FinishSandwich().action_id == mcts.FINISH_ID
+    with pytest.raises(KeyError):
+        mcts.action_table[mcts.FINISH_ID + 1]  # Ingredient paired with itself
+
+
+@pytest.mark.parametrize("policy", mcts.ROLLOUT_POLICIES.values())
+def test_rollout_policies(policy):
+    targets = parse_targets([("humungo", "normal"), ("item_drop", "flying")])
+    state = mcts.RecipeState(targets)
+    while not state.is_terminal:
+        action = policy(state)
+        assert action in state.get_possible_actions()
+        state = state.move(action)
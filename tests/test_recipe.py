@@ -0,0 +1,129 @@
+import pickle
+import random
+from copy import deepcopy
+
+import numpy as np
+
+from pokemon_gourmet.sandwich import Recipe, ingredient_data
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts import MonteCarloTreeSearch, RecipeState
+from pokemon_gourmet.suggester.mcts.state import RecipeManager
+
+
+def test_recipe_key():
+    recipe = Recipe("Tofu", "Salt", "Tofu")
+    other = Recipe("Salt", "Tofu", "Tofu")
+    assert recipe.key == other.key
+    assert recipe.key == int.from_bytes(recipe._ingredient_list.tobytes(), "little")
+    assert recipe == other and hash(recipe) == hash(other)
+    assert not hasattr(recipe, "__dict__")
+
+    other.add_ingredient("Salt")
+    assert recipe != other and hash(recipe) != hash(other)
+    assert other.count("Salt") == 2
+
+    copied = deepcopy(other)
+    assert copied == other and copied._ingredient_list is not other._ingredient_list
+    assert pickle.loads(pickle.dumps(other)) == other
+
+
+def test_recipe_counts_dtype():
+    last = len(ingredient_data) - 1
+    recipe = Recipe(last, last)
+    assert recipe._ingredient_list.dtype == np.uint8
+    assert recipe.key == 2 << (8 * last)
+
+
+def test_recipe_counters():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        ingredients = rng.integers(0, len(ingredient_data), rng.integers(0, 13))
+        recipe = Recipe(*ingredients.tolist())
+        counts = recipe._ingredient_list.astype(int)
+        pieces = counts * ingredient_data.pieces
+        assert len(recipe) == counts.sum()
+        assert recipe.num_condiments == counts[ingredient_data.is_condiment].sum()
+        assert recipe.num_fillings == counts[ingredient_data.is_filling].sum()
+        assert (
+            recipe.num_herba_mystica == counts[ingredient_data.is_herba_mystica].sum()
+        )
+        assert recipe.total_pieces == pieces[ingredient_data.is_filling].sum()
+        assert recipe.is_legal == (
+            1 <= recipe.num_fillings <= 6
+            and 1 <= recipe.num_condiments <= 4
+            and np.all(pieces[ingredient_data.is_filling] <= 12)
+        )
+
+
+def test_state_copy():
+    targets = parse_targets([("egg", None), ("raid", "fire")])
+    state = RecipeState(targets, max_fillings=4)
+    state.add_ingredient("Tofu")
+    state.add_ingredient("Salt")
+    copied = state.copy()
+    assert copied == state and copied.reward == state.reward
+    assert copied.targets is state.targets and copied.max_fillings == 4
+
+    copied.add_ingredient("Salt")
+    assert copied != state
+    assert state.num_condiments == 1 and copied.num_condiments == 2
+    assert not np.array_equal(copied._sums, state._sums)
+    assert copied.effects.tuples == Recipe("Tofu", "Salt", "Salt").effects.tuples
+
+
+def test_action_undo():
+    targets = parse_targets([("title", "normal"), ("humungo", "normal")])
+    rng = random.Random(0)
+    for _ in range(50):
+        state = RecipeState(targets)
+        snapshots, actions = [], []
+        while not state.is_terminal:
+            snapshots.append(state.copy())
+            action = rng.choice(state.get_possible_actions())
+            action(state)
+            actions.append(action)
+        for action, snapshot in zip(reversed(actions), reversed(snapshots)):
+            action.undo(state)
+            assert state == snapshot and state.is_finished == snapshot.is_finished
+            assert np.array_equal(state._sums, snapshot._sums)
+            assert state.num_fillings == snapshot.num_fillings
+            assert state.total_pieces == snapshot.total_pieces
+            assert state.is_legal == snapshot.is_legal
+
+
+def test_rollout_in_place():
+    targets = parse_targets([("title", "normal"), ("humungo", "normal")])
+    mcts = MonteCarloTreeSearch(RecipeState(targets), RecipeManager(), seed=0)
+    node = mcts.select_node(mcts.root)
+    before = node.state.copy()
+    for _ in range(20):
+        assert 0 <= mcts.rollout(node) <= 300
+        assert node.state == before and not node.state.is_finished
+
+
+def test_recipe_manager_children():
+    targets = parse_targets([("humungo", "normal"), ("item_drop", "flying")])
+    recipe_manager = RecipeManager()
+    recipe_manager.clear()
+    state = RecipeState(targets)
+    for name in ["Salt", "Tofu"]:
+        state.add_ingredient(name)
+    child = state.copy()
+    child.add_ingredient("Ketchup")
+    recipe_manager.add(child)
+    try:
+        assert child in recipe_manager
+        assert child.astuple() in recipe_manager
+        assert child.key in recipe_manager
+        assert state not in recipe_manager
+
+        ketchup = ingredient_data.index("Ketchup")
+        assert recipe_manager.get_children(state) == 1 << ketchup
+        assert state.exists_with("Ketchup")
+        assert not state.exists_with("Tofu")
+        for name in ["Salt", "Tofu"]:
+            parent = child.copy()
+            parent.remove_ingredient(name)
+            assert parent.exists_with(name)
+    finally:
+        recipe_manager.clear()
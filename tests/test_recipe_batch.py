@@ -0,0 +1,52 @@
+import numpy as np
+
+from pokemon_gourmet.sandwich import (
+    EffectList,
+    Recipe,
+    RecipeBatch,
+    ingredient_data,
+)
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts import RecipeState
+
+
+def test_recipe_batch():
+    targets = parse_targets([("title", "normal"), ("humungo", "normal")])
+    rng = np.random.default_rng(0)
+    states = []
+    for _ in range(200):
+        state = RecipeState(targets)
+        for ingredient in rng.integers(0, len(ingredient_data), rng.integers(1, 11)):
+            state.add_ingredient(ingredient)
+        states.append(state)
+    states.append(Recipe(*["Rice"] * 5, "Bitter Herba Mystica"))
+
+    batch = RecipeBatch.from_recipes(states)
+    assert len(batch) == len(states)
+    rewards = batch.rewards(targets)
+    for i, state in enumerate(states):
+        assert batch.is_legal[i] == state.is_legal
+        assert batch.num_fillings[i] == state.num_fillings
+        assert batch.num_condiments[i] == state.num_condiments
+        assert batch.num_herba_mystica[i] == state.num_herba_mystica
+        assert batch.total_pieces[i] == state.total_pieces
+        assert batch.fillings[i] == state.fillings
+        assert batch.condiments[i] == state.condiments
+        assert batch.effect_lists[i].tuples == state.effects.tuples
+        assert batch[i] == Recipe(*state.ingredients)
+        if isinstance(state, RecipeState):
+            assert np.isclose(rewards[i], state.reward)
+    assert np.isclose(rewards[-1], 300)
+
+    order = batch.rank(targets)
+    assert order[0] == len(states) - 1
+    assert np.all(np.diff(rewards[order]) <= 0)
+
+
+def test_recipe_batch_unique():
+    recipes = [Recipe("Tofu", "Salt"), Recipe("Salt", "Tofu"), Recipe("Rice", "Salt")]
+    batch = RecipeBatch.from_recipes(recipes).unique()
+    assert len(batch) == 2
+    assert list(batch) == [recipes[0], recipes[2]]
+    assert isinstance(batch.effect_lists[0], EffectList)
+    assert len(RecipeBatch.from_recipes([]).unique()) == 0
@@ -1,6 +1,19 @@
+import numpy as np
+
 from pokemon_gourmet.enums import Power, Type
-from pokemon_gourmet.sandwich import Effect, EffectList, Recipe
-from pokemon_gourmet.suggester.mcts.state import REWARD_GROWTH_FACTOR, RecipeState
+from pokemon_gourmet.sandwich import (
+    Effect,
+    EffectList,
+    Recipe,
+    calculate_batch_effects,
+    ingredient_data,
+)
+from pokemon_gourmet.suggester.mcts.state import (
+    REWARD_GROWTH_FACTOR,
+    RecipeState,
+    compute_rewards,
+)
+
 
 def test_1target_reward():
     desired_effects = EffectList(
@@ -72,3 +85,42 @@ def test_3target_reward():
     # every Meal Power has Level 3
     state.add_ingredient("Potato Salad")
     assert abs(state.reward - 300.0) < 1e-3
+
+
+def test_egg_reward():
+    # Egg Power is typeless, so it matches on Power alone
+    desired_effects = EffectList([(Power.EGG, None)])
+
+    state = RecipeState(desired_effects)
+    for ingredient in ["Tofu", "Ketchup"]:
+        state.add_ingredient(ingredient)
+    assert (Power.EGG, Type.NORMAL, 1) in state.effects
+    assert state.reward == 1.0
+
+    effects = calculate_batch_effects(state._ingredient_list)
+    assert compute_rewards(effects, desired_effects)[0] == 1.0
+
+
+def test_batch_reward():
+    rng = np.random.default_rng(0)
+    targets = [
+        EffectList([(Power.CATCHING, Type.DRAGON)]),
+        EffectList([(Power.TITLE, Type.NORMAL), (Power.TEENSY, Type.NORMAL)]),
+        EffectList(
+            [
+                (Power.TITLE, Type.FAIRY),
+                (Power.HUMUNGO, Type.FAIRY),
+                (Power.ENCOUNTER, Type.GHOST),
+            ]
+        ),
+        EffectList([(Power.EGG, None), (Power.CATCHING, Type.FIRE)]),
+    ]
+    for desired_effects in targets:
+        for _ in range(100):
+            state = RecipeState(desired_effects)
+            for ingredient in rng.integers(0, len(ingredient_data), 6).tolist():
+                state.add_ingredient(ingredient)
+            effects = calculate_batch_effects(state._ingredient_list)
+            reward = compute_rewards(effects, desired_effects)[0]
+            expected_reward = state.reward if state.is_legal else reward
+            assert abs(reward - expected_reward) < 1e-9
@@ -0,0 +1,134 @@
+import random
+
+import numpy as np
+
+from pokemon_gourmet.sandwich import ingredient_data
+from pokemon_gourmet.suggester.generator import parse_targets
+from pokemon_gourmet.suggester.mcts import (
+    ArrayMonteCarloTreeSearch,
+    MonteCarloTreeSearch,
+    RecipeState,
+    TreeStore,
+)
+from pokemon_gourmet.suggester.mcts.action import SelectBaseRecipe
+from pokemon_gourmet.suggester.mcts.state import RecipeManager
+
+TARGETS = parse_targets([("humungo", "normal"), ("item_drop", "flying")])
+
+
+def run_search(mcts: MonteCarloTreeSearch, num_rollouts: int) -> None:
+    for _ in range(num_rollouts):
+        path = mcts.select_path(mcts.root)
+        reward = mcts.rollout(path[-1][1])
+        mcts.backpropagate(path, reward)
+
+
+def test_transpositions():
+    mcts = MonteCarloTreeSearch(
+        RecipeState(TARGETS), RecipeManager(), seed=0, transpositions=True
+    )
+    salt, tofu, basil = (
+        ingredient_data.index(name) for name in ["Salt", "Tofu", "Basil"]
+    )
+    # Salt, Tofu, and Basil in two different orders
+    first = mcts.root.add_child(
+        SelectBaseRecipe(salt, tofu).action_id, mcts.transpositions
+    )
+    second = mcts.root.add_child(
+        SelectBaseRecipe(salt, basil).action_id, mcts.transpositions
+    )
+    child = first.add_child(basil, mcts.transpositions)
+    assert second.add_child(tofu, mcts.transpositions) is child
+    assert child.parent is first
+
+    mcts = MonteCarloTreeSearch(
+        RecipeState(TARGETS), RecipeManager(), seed=0, transpositions=True
+    )
+    run_search(mcts, 200)
+    assert len(mcts.state_manager) == 0  # Not needed to skip transpositions
+    nodes = list(mcts.transpositions.values())
+    keys = {node.state.transposition_key for node in nodes}
+    assert len(keys) == len(nodes)
+    for node in nodes:
+        # Every visit but the ones ending at the node goes through an edge
+        assert sum(node._edge_visits.values()) <= node._num_visits
+        assert set(node._edge_visits) <= set(node.children)
+
+
+def test_search_without_transpositions():
+    mcts = MonteCarloTreeSearch(RecipeState(TARGETS), RecipeManager(), seed=0)
+    random.seed(0)
+    run_search(mcts, 200)
+    assert mcts.root._num_visits == 200
+    assert sum(child._num_visits for child in mcts.root) == 200
+    assert len(mcts.state_manager) > 0
+    mcts.state_manager.clear()
+
+
+def test_tree_store():
+    tree = TreeStore(capacity=2)
+    root = tree.add_node(untried_actions=np.array([3, 5, 9]))
+    first = tree.add_node(root, 3)
+    second = tree.add_node(root, 5)
+    grandchild = tree.add_node(second, 7, is_terminal=True)
+    assert len(tree) == 4 and tree.capacity == 4
+    assert sorted(tree.children(root)) == [first, second]
+    assert tree.children(first) == []
+    assert tree.path_actions(grandchild) == [5, 7]
+
+    tree.backpropagate(grandchild, 2.0)
+    tree.backpropagate(first, 1.0)
+    assert tree.num_visits[:4].tolist() == [2, 1, 1, 1]
+    assert tree.total_reward[:4].tolist() == [3.0, 1.0, 2.0, 2.0]
+    assert list(tree.get_leaves()) == [grandchild]
+
+    tree.reset()
+    assert tree.num_visits[:4].tolist() == [1, 1, 1, 1]
+
+    random.seed(0)
+    untried = {tree.pop_untried_action(root) for _ in range(3)}
+    assert untried == {3, 5, 9} and tree.num_untried[root] == 0
+
+
+def test_array_search():
+    mcts = ArrayMonteCarloTreeSearch(
+        RecipeState(TARGETS), RecipeManager(), seed=0, max_walltime=200
+    )
+    best_child = mcts.search(mcts.root)
+    tree = mcts.tree
+    children = tree.children(mcts.root)
+    assert best_child in children
+    assert tree.num_visits[mcts.root] == tree.num_visits[children].sum()
+    # The working state is restored after searching
+    assert mcts.state.key == 0 and not mcts.state.is_finished
+
+    for node in range(1, len(tree)):
+        state = mcts.get_state(node)
+        assert state.is_terminal == tree.is_terminal[node]
+        assert state.key in mcts.state_manager
+    mcts.state_manager.clear()
+
+
+def test_array_search_matches_nodes():
+    # Both trees record the possible actions of a node when creating it, so
+    # they make the same choices for the same seed
+    initial_state = RecipeState(TARGETS, prune_actions=True)
+    mcts = MonteCarloTreeSearch(initial_state, RecipeManager(), seed=0)
+    run_search(mcts, 1000)
+    stack, keys = [mcts.root], []
+    while stack:
+        node = stack.pop()
+        keys.append((node.state.key, node.state.is_finished))
+        stack.extend(node)
+
+    array_mcts = ArrayMonteCarloTreeSearch(initial_state, RecipeManager(), seed=0)
+    for _ in range(1000):
+        actions = []
+        node = array_mcts.select_node(array_mcts.root, actions)
+        reward = array_mcts.rollout()
+        for action in reversed(actions):
+            action.undo(array_mcts.state)
+        array_mcts.tree.backpropagate(node, reward)
+    states = map(array_mcts.get_state, range(len(array_mcts.tree)))
+    assert sorted(keys) == sorted((state.key, state.is_finished) for state in states)
+    array_mcts.state_manager.clear()
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from pokemon_gourmet.sandwich.ingredient_data import TYPE_SLICE
+from pokemon_gourmet.suggester.generator import RecipeGenerator, parse_targets
+from pokemon_gourmet.suggester.mcts.state import RecipeState
+from pokemon_gourmet.suggester.solvers import (
+    BranchAndBound,
+    ExhaustiveSearch,
+    MeetInTheMiddle,
+)
+
+
+def test_exhaustive_search():
+    targets = parse_targets(
+        [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+    )
+    initial_state = RecipeState(targets, max_fillings=2)
+    solver = ExhaustiveSearch(initial_state, max_condiments=2, max_results=None)
+    recipes = solver.solve()
+    assert len(recipes) > 0
+    best_reward = recipes[0].reward
+    assert all(recipe.is_legal and recipe.is_finished for recipe in recipes)
+    assert all(recipe.reward == best_reward for recipe in recipes)
+    assert all(recipe.num_herba_mystica == 1 for recipe in recipes)
+
+    # No candidate recipe should beat the solver's recipes
+    fillings = solver.get_filling_lists()
+    condiments = solver.get_condiment_lists()
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        state = solver.make_state(
+            fillings[rng.integers(len(fillings))]
+            + condiments[rng.integers(len(condiments))]
+        )
+        assert state.reward <= best_reward
+
+    # Ties are capped, and candidates are counted before they are built
+    capped = ExhaustiveSearch(initial_state, max_condiments=2, max_results=5)
+    assert len(capped.solve()) == min(5, len(recipes))
+    assert solver.num_filling_lists == len(fillings)
+    assert solver.num_condiment_lists == len(condiments)
+    with pytest.raises(ValueError):
+        ExhaustiveSearch(initial_state, max_candidates=10)
+
+
+def test_exhaustive_generator():
+    targets = [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+    recipe_gen = RecipeGenerator(
+        targets, 5, max_fillings=2, engine="exhaustive", max_condiments=2
+    )
+    results = [recipes for recipes in recipe_gen]
+    assert len(results) == 1 and len(results[0]) > 0
+
+
+def test_branch_and_bound():
+    for targets in (
+        [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")],
+        [("egg", None), ("catching", "fire")],
+    ):
+        initial_state = RecipeState(parse_targets(targets), max_fillings=2)
+        expected = ExhaustiveSearch(
+            initial_state, max_condiments=2, max_results=None
+        ).solve()
+        recipes = BranchAndBound(
+            initial_state, max_condiments=2, max_results=None
+        ).solve()
+        # Every target is matched (Egg Power on its Power alone)
+        assert recipes[0].reward >= 1
+        assert recipes[0].reward == expected[0].reward
+        assert set(recipes) == set(expected)
+        capped = BranchAndBound(initial_state, max_condiments=2, max_results=5)
+        assert set(capped.solve()) <= set(expected)
+
+    # No recipe reaches the minimum Level
+    targets = parse_targets([("egg", None), ("catching", "fire")])
+    initial_state = RecipeState(targets, max_fillings=2)
+    assert BranchAndBound(initial_state, max_condiments=2, min_level=2).solve() == []
+
+    # Searches that cannot prove the best reward in time are rejected
+    with pytest.raises(ValueError, match="Raise the minimum Level"):
+        BranchAndBound(initial_state, max_condiments=2, max_expansions=1).solve()
+    targets = parse_targets(
+        [("title", "fairy"), ("humungo", "fire"), ("teensy", "poison")]
+    )
+    initial_state = RecipeState(targets, max_fillings=4)
+    with pytest.raises(ValueError, match="Raise `max_expansions`"):
+        BranchAndBound(initial_state, min_level=3, max_expansions=1).solve()
+
+
+def test_meet_in_the_middle():
+    for targets in (
+        [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")],
+        [("egg", None), ("catching", "fire")],
+    ):
+        initial_state = RecipeState(parse_targets(targets), max_fillings=2)
+        expected = ExhaustiveSearch(
+            initial_state, max_condiments=2, max_results=None
+        ).solve()
+        solver = MeetInTheMiddle(initial_state, max_condiments=2, max_results=None)
+        recipes = solver.solve()
+        assert recipes[0].reward == expected[0].reward
+        assert len(recipes) == len(expected) and set(recipes) == set(expected)
+        capped = MeetInTheMiddle(initial_state, max_condiments=2, max_results=5)
+        assert set(capped.solve()) <= set(expected)
+
+    # Every joined filling lifts a Type sum to the threshold
+    for condiment_idx, filling_ids in solver.join(180):
+        sums = solver.condiment_sums[condiment_idx] + solver.filling_sums[filling_ids]
+        assert np.all(sums[:, TYPE_SLICE].max(axis=1) >= 180)
+
+    # Halves are counted before they are built
+    with pytest.raises(ValueError):
+        MeetInTheMiddle(RecipeState(initial_state.targets))
+    solver = MeetInTheMiddle(
+        RecipeState(
+            initial_state.targets, max_fillings=MeetInTheMiddle.default_max_fillings
+        )
+    )
+    assert max(solver.num_filling_lists, solver.num_condiment_lists) <= 10**6
+
+    # Searches that cannot prove the best reward in time are rejected
+    initial_state = RecipeState(
+        parse_targets(
+            [("title", "normal"), ("humungo", "normal"), ("item_drop", "flying")]
+        ),
+        max_fillings=4,
+    )
+    with pytest.raises(ValueError, match="Raise `max_candidates`"):
+        MeetInTheMiddle(initial_state, min_level=3, max_candidates=1).solve()
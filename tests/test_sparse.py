@@ -0,0 +1,33 @@
+import numpy as np
+
+from pokemon_gourmet.sandwich import (
+    Recipe,
+    calculate_batch_effects,
+    ingredient_data,
+)
+from pokemon_gourmet.sandwich.effect_calculation import (
+    compute_batch_effects_from_sparse,
+    compute_effects_from_sparse,
+)
+from pokemon_gourmet.sandwich.sparse import to_dense, to_sparse
+
+
+def test_sparse_recipes():
+    rng = np.random.default_rng(0)
+    recipes = [
+        Recipe(*rng.integers(0, len(ingredient_data), rng.integers(1, 11)).tolist())
+        for _ in range(100)
+    ]
+    ingredient_lists = np.stack([recipe._ingredient_list for recipe in recipes])
+    expected = calculate_batch_effects(ingredient_lists)
+
+    indices, counts = to_sparse(ingredient_lists)
+    assert indices.shape == counts.shape and indices.shape[1] <= 10
+    assert np.array_equal(to_dense(indices, counts), ingredient_lists)
+    assert np.array_equal(compute_batch_effects_from_sparse(indices, counts), expected)
+
+    for recipe, effects in zip(recipes, expected):
+        indices, counts = recipe.to_sparse()
+        assert np.array_equal(to_dense(indices, counts), recipe._ingredient_list)
+        assert np.array_equal(compute_effects_from_sparse(indices, counts), effects)
+        assert Recipe.from_sparse(indices, counts) == recipe